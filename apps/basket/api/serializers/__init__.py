@@ -1,3 +1,6 @@
 from .pack_cart import PackCartSerializer
 from .cart import CartSerializer
-from .order import OrderSerializer
+from .order import (
+    OrderSerializer,
+    OrderHistorySerializer
+)
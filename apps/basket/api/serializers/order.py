@@ -1,3 +1,5 @@
+from django.core.files.storage import default_storage
+
 from rest_framework import serializers
 
 from basket.models import Order
@@ -25,3 +27,29 @@ class OrderSerializer(serializers.ModelSerializer):
             'quantity',
             'packs',
         )
+
+
+class OrderHistorySerializer(serializers.ModelSerializer):
+    line_count = serializers.IntegerField()
+    quantity = serializers.IntegerField()
+    thumbnail = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Order
+        fields = (
+            'transaction_number',
+            'status',
+            'created',
+            'total_cost',
+            'total_shipping_cost',
+            'total_discount',
+            'total_cost_without_discount',
+            'line_count',
+            'quantity',
+            'thumbnail',
+        )
+
+    def get_thumbnail(self, order):
+        if not order.thumbnail:
+            return None
+        return default_storage.url(order.thumbnail)
@@ -3,13 +3,18 @@ from django.http import Http404
 from django.conf import settings
 
 from rest_framework.viewsets import GenericViewSet
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from rest_framework import exceptions
 from rest_framework import status
 from rest_framework.filters import (
     SearchFilter,
     OrderingFilter
 )
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.permissions import (
+    IsAuthenticated,
+    IsAuthenticatedOrReadOnly
+)
 from rest_framework.mixins import (
     ListModelMixin,
     RetrieveModelMixin,
@@ -22,9 +27,13 @@ from rest_framework.renderers import (
 
 from django_filters.rest_framework import DjangoFilterBackend
 
+from painless.api.pagination import KeysetPagination
+
 from basket.models import Order
+from basket.services import OrderHistoryServices
 from basket.api.serializers import (
     OrderSerializer,
+    OrderHistorySerializer,
 )
 
 
@@ -36,9 +45,41 @@ class OrderViewSet(
         IsAuthenticatedOrReadOnly,
     )
     serializer_class = OrderSerializer
+    pagination_class = KeysetPagination
+
+    # Filter | Search | Order
+    filter_backends = [
+        OrderingFilter,
+    ]
+    ordering_fields = [
+        'created',
+    ]
+    ordering = [
+        '-created'
+    ]
+
     def get_queryset(self):
         queryset = Order.dal\
             .get_order_related()\
             .get_all_orders_of_user(self.request.user)\
             .get_order_total_quantity()
-        return queryset
\ No newline at end of file
+        return queryset
+
+    # Action
+    @action(methods=['GET'], detail=False,
+            permission_classes=[IsAuthenticated])
+    def history(self, request):
+        """
+        Orders of the user with their totals, line count, quantity and
+        thumbnail, plus the per status counters. Takes two queries at most,
+        one when the counters are cached.
+        """
+        services = OrderHistoryServices()
+        status_count = services.get_status_count(request.user)
+        queryset = services.get_orders(request.user)
+
+        page = self.paginate_queryset(queryset)
+        serializer = OrderHistorySerializer(page, many=True)
+        response = self.get_paginated_response(serializer.data)
+        response.data['status_count'] = status_count
+        return response
@@ -5,3 +5,6 @@ class BasketConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'basket'
     label = 'basket'
+
+    def ready(self):
+        from . import signals  # noqa: F401
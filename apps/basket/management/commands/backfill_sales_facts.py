@@ -0,0 +1,34 @@
+import logging
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from basket.models import SalesFact
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Backfill Sales Facts
+    Rebuild the daily sales facts from the pack orders.
+    """
+    help = 'Rebuild the daily sales facts from the pack orders.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start',
+                            type=date.fromisoformat,
+                            help='Specify the first day to rebuild as YYYY-MM-DD, the first order day by default.')  # noqa
+        parser.add_argument('--end',
+                            type=date.fromisoformat,
+                            help='Specify the last day to rebuild as YYYY-MM-DD, the last order day by default.')  # noqa
+        parser.add_argument('--batch-days',
+                            type=int,
+                            default=7,
+                            help='Specify the number of days to rebuild per transaction.')  # noqa
+
+    def handle(self, *args, **kwargs):
+        logger.debug('Prepare to backfill sales facts ...')
+        total = SalesFact.bll.backfill(kwargs['start'],
+                                       kwargs['end'],
+                                       batch_days=kwargs['batch_days'])
+        self.stdout.write(self.style.SUCCESS(f'{total} sales facts have been saved.'))  # noqa
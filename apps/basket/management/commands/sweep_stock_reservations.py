@@ -0,0 +1,27 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from basket.services import StockReservationServices
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Sweep Stock Reservations
+    Release the expired stock holds and expire or cancel their orders.
+    """
+    help = 'Release the expired stock holds and expire or cancel their orders.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size',
+                            type=int,
+                            default=None,
+                            help='Specify the number of holds to delete per transaction.')  # noqa
+
+    def handle(self, *args, **kwargs):
+        logger.debug('Prepare to sweep stock reservations ...')
+        swept = StockReservationServices().sweep(batch_size=kwargs['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{swept['expiring']} orders are expiring and "
+            f"{swept['cancelled']} orders are cancelled."))  # noqa
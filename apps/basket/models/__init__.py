@@ -4,3 +4,4 @@ from .order_address import OrderAddress
 from .pack_cart import PackCart
 from .pack_order import PackOrder
 from .refund import Refund
+from .sales_fact import SalesFact
@@ -0,0 +1,109 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from basket.repository.business_logic.manager import SalesFactBusinessLogicLayer
+
+
+class SalesFact(models.Model):
+    """Sales fact
+    Daily sales of a pack per destination, pre-aggregated from the pack
+    orders so sold count, profit and per country reports read a few rows
+    per product instead of joining packs, pack orders, orders and their
+    addresses. Rows of a (day, pack) are recomputed whenever one of its
+    orders changes status, cancelled and expiring orders are left out.
+
+    PARAMS
+    ------
+    `lines` : number of pack orders aggregated in the row.
+    `revenue` : sum of `quantity * cost` of the pack orders.
+    `cost` : sum of `quantity * buy_price` of the pack orders.
+    """
+    day = models.DateField(
+        _("day"),
+        help_text=_("Day the orders were placed"),
+    )
+    country = models.CharField(
+        _("country"),
+        max_length=255,
+        null=True,
+        help_text=_("Country the orders are shipped to"),
+    )
+    province = models.CharField(
+        _("province"),
+        max_length=255,
+        null=True,
+        help_text=_("Province the orders are shipped to"),
+    )
+    lines = models.PositiveIntegerField(
+        _("lines"),
+        help_text=_("Number of pack orders"),
+    )
+    quantity = models.PositiveBigIntegerField(
+        _("quantity"),
+        help_text=_("Number of packs sold"),
+    )
+    revenue = models.DecimalField(
+        _("revenue"),
+        max_digits=24,
+        decimal_places=2,
+        help_text=_("Amount paid for the packs"),
+    )
+    cost = models.DecimalField(
+        _("cost"),
+        max_digits=24,
+        decimal_places=2,
+        help_text=_("Amount the packs were bought for"),
+    )
+    profit = models.DecimalField(
+        _("profit"),
+        max_digits=24,
+        decimal_places=2,
+        help_text=_("Revenue minus cost"),
+    )
+    refreshed = models.DateTimeField(
+        _("refreshed"),
+        auto_now=True,
+        help_text=_("Last time the row was aggregated"),
+    )
+    # ############################### #
+    #                 Fks             #
+    # ############################### #
+    product = models.ForeignKey(
+        "warehouse.Product",
+        verbose_name=_("product"),
+        related_name="sales_facts",
+        on_delete=models.CASCADE,
+        help_text=_("Access to the related product of a sales fact"),
+    )
+    pack = models.ForeignKey(
+        "warehouse.Pack",
+        verbose_name=_("pack"),
+        related_name="sales_facts",
+        on_delete=models.CASCADE,
+        help_text=_("Access to the related pack of a sales fact"),
+    )
+
+    bll = SalesFactBusinessLogicLayer()
+    objects = models.Manager()
+
+    class Meta:
+        verbose_name = _("Sales Fact")
+        verbose_name_plural = _("Sales Facts")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "pack", "country", "province"],
+                name="sales_fact_unique_key",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["product", "day"],
+                         name="sales_fact_product_day_idx"),
+            models.Index(fields=["pack", "day"],
+                         name="sales_fact_pack_day_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} {self.day}"
+
+    def __repr__(self):
+        return f"{self.product_id} {self.day}"
@@ -4,3 +4,4 @@ from .basket import OrderBusinessLogicLayer
 from .basket import PackOrderBusinessLogicLayer
 from .basket import RefundBusinessLogicLayer
 from .basket import CartBusinessLogicLayer
+from .basket import SalesFactBusinessLogicLayer
@@ -1,13 +1,43 @@
 import logging
+from collections import defaultdict
+from datetime import (
+    datetime,
+    time,
+    timedelta
+)
+from typing import (
+    Dict,
+    List
+)
 
+from django.conf import settings
+from django.db import (
+    connections,
+    transaction
+)
 from django.db.models import Manager
 from django.apps import apps
-from django.db.models import F, Sum
+from django.db.models import (
+    F,
+    Sum,
+    Min,
+    Max,
+    Count,
+    Value,
+    DecimalField,
+    IntegerField,
+    Case,
+    When
+)
+from django.db.models.functions import (
+    Coalesce,
+    TruncDate
+)
 from django.core.exceptions import ObjectDoesNotExist
+from django.utils import timezone
 
 from basket.helper.enums import OrderStatus
 from basket.helper.exceptions import (PackNotInPackCart,
-                                      DuplicatePackCartInCart,
                                       )
 from basket.helper.enums import OrderStatus
 
@@ -22,6 +52,21 @@ class PackCartBusinessLogicLayer(Manager):
     something to it or checking the state of it.
     """
 
+    def get_unit_prices(self, pack_cart: 'PackCart'):
+        """
+        `(price, buy_price)` amounts of the pack's expense. read from the
+        pack and expense already loaded on `pack_cart`, e.g. with
+        `select_related('pack__expense')`, without any query; otherwise
+        both are read with a single query.
+        """
+        if self.model._meta.get_field('pack').is_cached(pack_cart):
+            pack = pack_cart.pack
+            if pack._meta.get_field('expense').is_cached(pack):
+                return pack.expense.price.amount, pack.expense.buy_price.amount
+        return self.filter(id=pack_cart.id) \
+            .values_list('pack__expense__price', 'pack__expense__buy_price') \
+            .get()
+
     def get_total_price(
             self,
             pack_cart: 'PackCart'
@@ -29,9 +74,7 @@ class PackCartBusinessLogicLayer(Manager):
         """
         calculates the total price of the pack.
         """
-        price = self.filter(id=pack_cart.id) \
-            .annotate(total_price=Sum('pack__expense__price')) \
-            .first().total_price
+        price, _ = self.get_unit_prices(pack_cart)
         return price * pack_cart.quantity
 
     def get_total_buy_price(
@@ -41,9 +84,7 @@ class PackCartBusinessLogicLayer(Manager):
         """
         calculates the total `buy_price` of the pack.
         """
-        buy_price = self.filter(id=pack_cart.id) \
-            .annotate(total_buy_price=Sum('pack__expense__buy_price')) \
-            .first().total_buy_price
+        _, buy_price = self.get_unit_prices(pack_cart)
         return buy_price * pack_cart.quantity
 
 
@@ -67,34 +108,77 @@ class CartBusinessLogicLayer(Manager):
         """
         return self.filter(id=cart.id, packs=pack).exists()
 
+    def upsert_pack_carts(self,
+                          cart: 'Cart',
+                          packs_with_quantity: Dict[int, int]) -> List['PackCart']:
+        """
+        Adds the quantities, keyed by pack id, to the cart with a constant
+        number of queries: missing pack carts are created in bulk, existing
+        ones get the quantity added in the database by a single `UPDATE`.
+        The cart row is locked first, so concurrent adds to the same cart
+        run one after the other and never lose a unit nor create a
+        duplicate pack cart.
+        returns the resulting pack carts ordered by pack.
+        """
+        from basket.services import CartSnapshotServices
+
+        PackCart = apps.get_model('basket', 'PackCart')
+        if not packs_with_quantity:
+            return []
+        pack_ids = sorted(packs_with_quantity)
+        with transaction.atomic():
+            list(self.select_for_update().filter(id=cart.id).values_list('id', flat=True))
+            pack_carts = PackCart.objects.filter(cart=cart, pack_id__in=pack_ids)
+            existing = set(pack_carts.values_list('pack_id', flat=True))
+            if existing:
+                # `update` skips `auto_now`, they are set as a save would
+                now = {field.attname: timezone.now()
+                       for field in PackCart._meta.concrete_fields
+                       if getattr(field, 'auto_now', False)}
+                pack_carts.filter(pack_id__in=existing).update(
+                    quantity=F('quantity') + Case(
+                        *[When(pack_id=pack_id, then=Value(packs_with_quantity[pack_id]))
+                          for pack_id in sorted(existing)],
+                        output_field=IntegerField()),
+                    **now)
+            PackCart.objects.bulk_create(
+                [PackCart(cart=cart, pack_id=pack_id, quantity=packs_with_quantity[pack_id])
+                 for pack_id in pack_ids if pack_id not in existing])
+            # neither `update` nor `bulk_create` sends a signal
+            CartSnapshotServices().bump_cart_version(cart.id)
+            return list(pack_carts.order_by('pack_id'))
+
     def add_pack_to_cart(
             self,
             cart: 'Cart',
             given_pack: 'Pack',
             quantity: int):
         """
-        Add the given `pack` to the given user's `cart` with given quantity.
+        Add the given `pack` to the given user's `cart` with given quantity,
+        safe against concurrent adds to the same cart.
         """
         if quantity < 1:
             raise ValueError('quantity should be greater than or equal 1 however'
                              f' {quantity} was given')
-        PackCart = apps.get_model('basket', 'PackCart')
-        if self.is_pack_in_the_cart(cart, given_pack):
-            PackCart.bll.filter(cart=cart, pack=given_pack) \
-                .update(quantity=F('quantity') + quantity)
-            if PackCart.bll.filter(cart=cart, pack=given_pack).count() == 1:
-                pack_cart = PackCart.bll.get(cart=cart, pack=given_pack)
-            else:
-                raise DuplicatePackCartInCart('there\'s more than one pack_cart'
-                                              'with with pack in this cart')
-        else:
-            pack_cart = PackCart.bll.create(
-                quantity=quantity,
-                cart=cart,
-                pack=given_pack,
-            )
+        pack_cart, = self.upsert_pack_carts(cart, {given_pack.id: quantity})
         return pack_cart
 
+    def bulk_add_packs_to_cart(
+            self,
+            cart: 'Cart',
+            packs_with_quantity: Dict['Pack', int]):
+        """
+        Same as `add_pack_to_cart` for many packs at once, with the same
+        number of queries whatever the number of packs.
+        """
+        quantities = defaultdict(int)
+        for pack, quantity in packs_with_quantity.items():
+            if quantity < 1:
+                raise ValueError('quantity should be greater than or equal 1 however'
+                                 f' {quantity} was given for pack {pack}')
+            quantities[pack.id] += quantity
+        return self.upsert_pack_carts(cart, quantities)
+
     def del_pack_cart_from_cart(self,
                                 cart: 'Cart',
                                 pack_sku: str):
@@ -122,6 +206,73 @@ class CartBusinessLogicLayer(Manager):
             raise PackNotInPackCart(f'PackCart {pack_cart.slug}'
                                     f' does not exist in cart {cart.slug}')
 
+    def apply_pack_cart_deltas(self,
+                               cart: 'Cart',
+                               deltas: Dict,
+                               key: str = 'pack_id') -> Dict:
+        """
+        Adds each delta to the quantity of the matching pack cart of the
+        cart, deleting the pack carts whose quantity drops to zero or
+        below. `deltas` are keyed by pack id, or by pack sku with
+        `key='sku'`. packs not in the cart are ignored, use
+        `add_pack_to_cart` to add them.
+
+        Every matching row is updated by one unconditional `UPDATE`, so a
+        change waiting on a concurrent one is applied to the row as that
+        one left it, then the rows at zero are deleted in the same
+        transaction. concurrent changes never overwrite each other.
+        returns the new quantity of every changed pack cart, `0` for the
+        deleted ones, keyed like `deltas`.
+        """
+        from basket.services import CartSnapshotServices
+
+        PackCart = apps.get_model('basket', 'PackCart')
+        Pack = apps.get_model('warehouse', 'Pack')
+        if not deltas:
+            return dict()
+        connection = connections[self.db]
+        quote_name = connection.ops.quote_name
+        table = quote_name(PackCart._meta.db_table)
+        quantity = quote_name('quantity')
+
+        if key == 'sku':
+            targets = (f'SELECT pack.{quote_name("id")} AS pack_id, diff.key, diff.delta '
+                       f'FROM diff JOIN {quote_name(Pack._meta.db_table)} pack '
+                       f'ON pack.{quote_name("sku")} = diff.key')
+        else:
+            targets = 'SELECT diff.key AS pack_id, diff.key, diff.delta FROM diff'
+        # quantities are floored at 0, the column can not hold a negative
+        sql = (
+            f"WITH diff (key, delta) AS (VALUES {', '.join(['(%s, %s)'] * len(deltas))}), "
+            f"targets AS ({targets}) "
+            f"UPDATE {table} pack_cart SET {quantity} = "
+            f"GREATEST(pack_cart.{quantity} + targets.delta, 0) FROM targets "
+            f"WHERE pack_cart.{quote_name('cart_id')} = %s "
+            f"AND pack_cart.{quote_name('pack_id')} = targets.pack_id "
+            f"RETURNING targets.key, pack_cart.{quote_name('pack_id')}, pack_cart.{quantity}"
+        )
+        params = [value for item in deltas.items() for value in item]
+        with transaction.atomic(using=self.db):
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [*params, cart.id])
+                rows = cursor.fetchall()
+            emptied = [pack_id for _, pack_id, new_quantity in rows if new_quantity <= 0]
+            if emptied:
+                PackCart.objects.filter(cart_id=cart.id, pack_id__in=emptied,
+                                        quantity__lte=0).delete()
+            # a raw statement sends no signal
+            CartSnapshotServices().bump_cart_version(cart.id)
+        return {row_key: max(new_quantity, 0) for row_key, _, new_quantity in rows}
+
+    def apply_cart_diff(self,
+                        cart: 'Cart',
+                        deltas: Dict[str, int]) -> Dict[str, int]:
+        """
+        Applies a whole cart diff, `{sku: delta}`, at once. see
+        `apply_pack_cart_deltas`.
+        """
+        return self.apply_pack_cart_deltas(cart, deltas, key='sku')
+
     def update_pack_cart_quantity(
             self,
             cart: 'Cart',
@@ -129,22 +280,152 @@ class CartBusinessLogicLayer(Manager):
             increment: bool
     ):
         """
-        adds or subtracts 1 from given `pack_cart`'s quantity.
-        raises ValueError if given increment isn't in list if accepted increments.
-        calling '-' on a `PackCart` with quantity 1 will remove it.
+        adds or subtracts 1 from given `pack_cart`'s quantity in a single
+        statement. calling '-' on a `PackCart` with quantity 1 will remove it.
+        returns the new quantity, `0` when the pack cart is removed.
         """
         # todo change name of this function to increment...
-        PackCart = apps.get_model('basket', 'PackCart')
-        if self.is_pack_cart_in_cart(cart, pack_cart):
-            if increment:
-                PackCart.bll.filter(id=pack_cart.id) \
-                    .update(quantity=(pack_cart.quantity + 1))
-            else:
-                if pack_cart.quantity > 1:
-                    PackCart.bll.filter(id=pack_cart.id) \
-                        .update(quantity=(pack_cart.quantity - 1))
-                else:
-                    self.del_pack_cart_from_cart(cart, pack_cart.pack.sku)
-        else:
+        if pack_cart.cart_id != cart.id:
+            raise PackNotInPackCart(f"Given pack with sku: {pack_cart.slug}"
+                                    f"doesn't exist in pack cart.")
+        quantities = self.apply_pack_cart_deltas(
+            cart, {pack_cart.pack_id: 1 if increment else -1})
+        if not quantities:
             raise PackNotInPackCart(f"Given pack with sku: {pack_cart.slug}"
                                     f"doesn't exist in pack cart.")
+        return quantities[pack_cart.pack_id]
+
+
+class SalesFactBusinessLogicLayer(Manager):
+    """
+    handles functions affecting SalesFact model, such as aggregating the
+    pack orders of some days into facts.
+    """
+
+    def get_day_range(self, day):
+        """aware bounds of `day` in the current time zone, end excluded."""
+        start = timezone.make_aware(datetime.combine(day, time.min))
+        return start, timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+
+    def aggregate_pack_orders(self, pack_orders):
+        """
+        rows of (day, pack, country, province) with their totals, orders
+        with a status in `SALES_FACT_EXCLUDED_STATUSES` are left out.
+        """
+        money = DecimalField(max_digits=24, decimal_places=2)
+        zero = Value(0, output_field=money)
+        return pack_orders \
+            .exclude(order__status__in=settings.SALES_FACT_EXCLUDED_STATUSES) \
+            .order_by() \
+            .values('pack_id',
+                    day=TruncDate('order__created'),
+                    product_id=F('pack__product_id'),
+                    country=F('order__order_address__country'),
+                    province=F('order__order_address__province')) \
+            .annotate(lines=Count('id'),
+                      total_quantity=Sum('quantity'),
+                      revenue=Coalesce(Sum(F('quantity') * F('cost'), output_field=money), zero),
+                      total_cost=Coalesce(Sum(F('quantity') * F('buy_price'), output_field=money), zero))
+
+    def build_facts(self, rows):
+        # pack order fields can not be annotated, so totals are renamed back
+        facts = list()
+        for row in rows:
+            row['quantity'] = row.pop('total_quantity')
+            row['cost'] = row.pop('total_cost')
+            facts.append(self.model(profit=row['revenue'] - row['cost'], **row))
+        return facts
+
+    def refresh(self, keys) -> int:
+        """
+        recomputes the facts of the given (day, pack id) `keys` in one
+        transaction, one delete and one aggregate query per day.
+        returns the number of saved facts.
+        """
+        PackOrder = apps.get_model('basket', 'PackOrder')
+        pack_ids_per_day = defaultdict(set)
+        for day, pack_id in keys:
+            pack_ids_per_day[day].add(pack_id)
+
+        total = 0
+        with transaction.atomic():
+            for day, pack_ids in pack_ids_per_day.items():
+                start, end = self.get_day_range(day)
+                self.filter(day=day, pack_id__in=pack_ids).delete()
+                rows = self.aggregate_pack_orders(
+                    PackOrder.objects.filter(pack_id__in=pack_ids,
+                                             order__created__gte=start,
+                                             order__created__lt=end))
+                total += len(self.bulk_create(self.build_facts(rows)))
+        return total
+
+    def backfill(self, start=None, end=None, batch_days=7) -> int:
+        """
+        rebuilds the facts of the days from `start` to `end`, both
+        included, `batch_days` days per transaction. defaults to the days
+        of the first and the last order.
+        returns the number of saved facts.
+        """
+        Order = apps.get_model('basket', 'Order')
+        PackOrder = apps.get_model('basket', 'PackOrder')
+        if start is None or end is None:
+            days = Order.objects.aggregate(first=TruncDate(Min('created')),
+                                           last=TruncDate(Max('created')))
+            start = start or days['first']
+            end = end or days['last']
+        if start is None or end is None:
+            return 0
+
+        total = 0
+        day = start
+        while day <= end:
+            last_day = min(day + timedelta(days=batch_days - 1), end)
+            lower, _ = self.get_day_range(day)
+            _, upper = self.get_day_range(last_day)
+            with transaction.atomic():
+                self.filter(day__gte=day, day__lte=last_day).delete()
+                rows = self.aggregate_pack_orders(
+                    PackOrder.objects.filter(order__created__gte=lower,
+                                             order__created__lt=upper))
+                total += len(self.bulk_create(self.build_facts(rows)))
+            logger.info(f"sales facts from {day} to {last_day} are rebuilt")
+            day = last_day + timedelta(days=1)
+        return total
+
+    def get_order_keys(self, order_ids):
+        """(day, pack id) keys of the pack orders of the given orders."""
+        PackOrder = apps.get_model('basket', 'PackOrder')
+        return set(PackOrder.objects
+                   .filter(order_id__in=list(order_ids))
+                   .values_list(TruncDate('order__created'), 'pack_id')
+                   .distinct())
+
+    def schedule_refresh(self, keys) -> None:
+        """
+        refreshes the facts of the (day, pack id) `keys` once the current
+        transaction commits. keys scheduled in one transaction are
+        refreshed together, by a single callback.
+        """
+        keys = set(keys)
+        if not keys:
+            return
+        connection = transaction.get_connection()
+        pending = getattr(connection, 'sales_fact_pending', None)
+        # a rolled back transaction drops its callbacks but not the attribute
+        if pending is not None and any(item[1] is pending['callback']
+                                       for item in connection.run_on_commit):
+            pending['keys'].update(keys)
+            return
+
+        pending = {'keys': keys}
+
+        def refresh():
+            connection.sales_fact_pending = None
+            try:
+                self.refresh(pending['keys'])
+            except Exception as e:
+                logger.error(f"failed to refresh sales facts: {e}", exc_info=True)
+
+        pending['callback'] = refresh
+        connection.sales_fact_pending = pending
+        transaction.on_commit(refresh)
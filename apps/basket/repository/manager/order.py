@@ -48,6 +48,13 @@ class OrderDataAccessLayerManager(Manager):
         """
         return self.get_queryset().get_order_total_quantity()
 
+    def get_order_history(self, user):
+        """
+        Orders of the given user with `line_count`, `quantity` and
+        `thumbnail` in a single query, newest first.
+        """
+        return self.get_queryset().get_order_history(user)
+
     def get_order_by_transaction(self, transaction_number: str):
         """
         returns an order matching given transaction number
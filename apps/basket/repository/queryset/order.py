@@ -1,8 +1,11 @@
+from django.apps import apps
 from django.contrib.auth import get_user_model
 from django.db.models import (
     DateTimeField,
     CharField,
     QuerySet,
+    Subquery,
+    OuterRef,
     Count,
     Case,
     When,
@@ -10,6 +13,7 @@ from django.db.models import (
     Q,
     F
 )
+from django.db.models.functions import Coalesce
 
 from azbankgateways.models import Bank
 
@@ -120,3 +124,27 @@ class OrderQuerySet(QuerySet):
             'pack__product',
             'pack__color'
         )
+
+    def get_order_history(self, user):
+        """
+        Orders of the given user with everything the order history needs
+        in a single query, newest first.
+        you can get the values with:
+
+        `line_count` : number of pack orders.
+        `quantity` : number of packs.
+        `thumbnail` : default picture of the product of the first pack.
+        """
+        ProductGallery = apps.get_model('warehouse', 'ProductGallery')
+        thumbnail = ProductGallery.objects \
+            .filter(is_default=True,
+                    product__packs__pack_orders__order_id=OuterRef('pk')) \
+            .order_by('product__packs__pack_orders__id') \
+            .values('picture')[:1]
+        return self.filter(user=user) \
+            .annotate(
+                line_count=Count('pack_orders'),
+                quantity=Coalesce(Sum('pack_orders__quantity'), 0),
+                thumbnail=Subquery(thumbnail, output_field=CharField())
+            ) \
+            .order_by('-created')
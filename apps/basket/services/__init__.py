@@ -1,3 +1,7 @@
 from .refund import RefundServices
 from .pre_payment import PrePaymentServices
 from .post_payment import PostPaymentServices
+from .order_history import OrderHistoryServices
+from .cart_snapshot import CartSnapshotServices
+from .session_cart import SessionCartServices
+from .stock_reservation import StockReservationServices
@@ -0,0 +1,104 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from djmoney.money import Money
+
+from painless.api.cache import get_generations
+from warehouse.services.currency import (
+    convert_amount,
+    rate_provider
+)
+from basket.models import PackCart
+
+
+class CartSnapshotServices:
+    """
+    Builds what the cart and checkout pages show: every pack cart of a
+    cart with its pack, product, color and expense in one query, with the
+    line totals and the cart total computed in Python.
+
+    The snapshot is cached under the cart version, which every cart
+    mutation bumps, and the generations of packs, products and expenses
+    and the rate version, so a price change is seen as well. Repeated
+    renders of an unchanged cart run no query.
+    """
+    VERSION_KEY = 'basket:cart-version:{cart_id}'
+    SNAPSHOT_KEY = 'basket:cart-snapshot:{cart_id}:{version}:{generations}:{rate_version}'
+    GENERATION_MODELS = ('warehouse.Pack', 'warehouse.Product', 'warehouse.Expense')
+
+    def get_currency(self):
+        return settings.DEFAULT_CURRENCY_SHOW_ON_SITE
+
+    def get_version_key(self, cart_id):
+        return self.VERSION_KEY.format(cart_id=cart_id)
+
+    def get_cart_version(self, cart_id):
+        return cache.get(self.get_version_key(cart_id), 1)
+
+    def bump_cart_version(self, cart_id):
+        """
+        Invalidates the cached snapshot of the cart once the current
+        transaction commits.
+        """
+        key = self.get_version_key(cart_id)
+
+        def bump():
+            cache.add(key, 1, timeout=None)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, 2, timeout=None)
+
+        transaction.on_commit(bump)
+
+    def get_snapshot_key(self, cart_id):
+        generations = '-'.join(map(str, get_generations(self.GENERATION_MODELS)))
+        return self.SNAPSHOT_KEY.format(cart_id=cart_id,
+                                        version=self.get_cart_version(cart_id),
+                                        generations=generations,
+                                        rate_version=rate_provider.get_matrix().version)
+
+    def load_snapshot(self, cart):
+        """
+        Pack carts of the cart with `unit_price` and `total_price` in the
+        site currency, and the cart `total_cost`, from a single query.
+        """
+        pack_carts = list(PackCart.objects.filter(cart=cart)
+                          .select_related('pack__expense',
+                                          'pack__product',
+                                          'pack__color')
+                          .order_by('id'))
+        return pack_carts, self.price_pack_carts(pack_carts)
+
+    def price_pack_carts(self, pack_carts):
+        """
+        sets `unit_price` and `total_price` of pack carts whose pack and
+        expense are loaded, returns their total cost. no query is run.
+        """
+        currency = self.get_currency()
+        total_cost = Money(0, currency)
+        for pack_cart in pack_carts:
+            expense = pack_cart.pack.expense
+            pack_cart.unit_price = Money(convert_amount(expense.price.amount,
+                                                        expense.price_currency,
+                                                        currency), currency)
+            pack_cart.total_price = pack_cart.unit_price * pack_cart.quantity
+            total_cost += pack_cart.total_price
+        return total_cost
+
+    def get_snapshot(self, cart):
+        """
+        `(pack_carts, total_cost)` like
+        `Cart.dal.get_all_pack_carts_with_total_cart_cost`, from the cache.
+        """
+        key = self.get_snapshot_key(cart.pk)
+        snapshot = cache.get(key)
+        if snapshot is None:
+            snapshot = self.load_snapshot(cart)
+            cache.set(key, snapshot, timeout=settings.CART_SNAPSHOT_TIMEOUT)
+        return snapshot
+
+    def get_packs_with_quantity(self, cart):
+        """quantity of each pack sku in the cart, read from the snapshot."""
+        pack_carts, _ = self.get_snapshot(cart)
+        return {pack_cart.pack.sku: pack_cart.quantity for pack_cart in pack_carts}
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from basket.models import Order
+
+
+class OrderHistoryServices:
+    """
+    Builds the order history of a user: one query for the orders and the
+    per status counters, cached per user until one of the user's orders
+    changes.
+    """
+    STATUS_COUNT_KEY = 'basket:order-status-count:{user_id}'
+
+    def get_status_count_key(self, user_id):
+        return self.STATUS_COUNT_KEY.format(user_id=user_id)
+
+    def get_status_count(self, user):
+        """
+        Same counters as `OrderQuerySet.get_all_orders_with_status_count`.
+        """
+        key = self.get_status_count_key(user.pk)
+        status_count = cache.get(key)
+        if status_count is None:
+            status_count = Order.dal.get_all_orders_with_status_count(user)
+            cache.set(key, status_count, timeout=settings.ORDER_STATUS_COUNT_TIMEOUT)
+        return status_count
+
+    def invalidate_status_count(self, user_id):
+        cache.delete(self.get_status_count_key(user_id))
+
+    def get_orders(self, user):
+        return Order.dal.get_order_history(user)
@@ -1,11 +1,13 @@
 import logging
+from collections import defaultdict
 
 from django.db import transaction
 
 from basket.models import Order
-from warehouse.models import Expense
+from warehouse.models import Expense, StockReservation
 
 from basket.helper.exceptions import OrderFailedToFinalize
+from warehouse.helper.exceptions import PackOutOfStock
 
 logger = logging.getLogger(__name__)
 
@@ -21,19 +23,22 @@ class PostPaymentServices:
         """
         After receiving a success payment from bank the following should happen:
             1- change order status to `processing`
-            2- update count stock and actual count stock
+            2- update count stock and actual count stock of all packs at once
+            3- release the stock held for the order, the stock is taken now
         """
         user = order.user
         transaction_number = order.transaction_number
         with transaction.atomic():
             try:
                 Order.bll.update_order_status(order, 'processing')
-                pack_orders = order.pack_orders.select_related('pack').all()
-                for pack_order in pack_orders:
-                    pack = pack_order.pack
-                    quantity = pack_order.quantity
-                    Expense.bll.update_count_stock(pack.sku, quantity, increase=False)
-                    Expense.bll.update_actual_count_stock(pack.sku, quantity, increase=False)
+                skus_with_quantity = defaultdict(int)
+                for sku, quantity in order.pack_orders.values_list('pack__sku', 'quantity'):
+                    skus_with_quantity[sku] += quantity
+                result = Expense.bll.bulk_update_stock(skus_with_quantity, increase=False)
+                if not result.is_successful:
+                    raise PackOutOfStock(f"Insufficient stock for packs "
+                                         f"{', '.join(sorted(result.out_of_stock))}")
+                StockReservation.bll.release([order.id])
             except Exception as e:
                 logger.critical(f'user: `{user}`, transaction number: '
                                 f'`{transaction_number}`, action: `finalize '
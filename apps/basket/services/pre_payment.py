@@ -2,19 +2,26 @@ import logging
 from typing import Dict
 
 from django.db import transaction
+from django.utils import timezone
+from djmoney.money import Money
 
 from basket.models import (
     Cart,
+    PackCart,
     PackOrder,
     Order,
-    OrderAddress
+    OrderAddress,
+    SalesFact
 )
 from warehouse.models import Pack
+from warehouse.services.currency import convert_amount
+from basket.services.cart_snapshot import CartSnapshotServices
 from logistic.models import Logistic
 from voucher.models import Voucher
 from account.models import User
 from basket.helper.exceptions import (FailedAddToCart,
                                       OrderFailedToCreate,
+                                      PackNotInPackCart,
                                       )
 
 logger = logging.getLogger(__name__)
@@ -37,21 +44,37 @@ class PrePaymentServices:
         else:
             return False
 
-    def update_cart(self, cart: Cart, packs_with_quantity: Dict[str, int]) -> bool:
-        pack_carts = list()
-        for pack, quantity in packs_with_quantity.items():
-            if self.check_conditions(
-                cart=cart,
-                pack=pack,
-                quantity=quantity):
+    def check_conditions_many(self,
+                              cart: Cart,
+                              packs_with_quantity: Dict[str, int]) -> bool:
+        """
+        Same as `check_conditions` for many packs at once, keyed by pack sku.
+        """
+        if not User.bll.is_active(cart.user):
+            return False
+        verdicts = Pack.bll.is_available_many(packs_with_quantity.keys(),
+                                              packs_with_quantity.values())
+        unavailable = [verdict for verdict in verdicts.values()
+                       if not verdict.is_available]
+        for verdict in unavailable:
+            logger.info(f'cart: `{cart}`, pack: `{verdict.sku}`, '
+                        f'is not available: `{verdict.reason}`')
+        return not unavailable
 
-                obj = cart.pack_carts.get(pack=pack)
-                obj.quantity = quantity
-                pack_carts.append(obj)
+    def update_cart(self, cart: Cart, packs_with_quantity: Dict[Pack, int]) -> bool:
+        skus_with_quantity = {pack.sku: quantity
+                              for pack, quantity in packs_with_quantity.items()}
+        if not self.check_conditions_many(cart, skus_with_quantity):
+            return False
 
-            else:
-                return False
+        pack_carts = list(cart.pack_carts.filter(pack__sku__in=skus_with_quantity.keys())
+                          .select_related('pack'))
+        if len(pack_carts) != len(skus_with_quantity):
+            raise PackNotInPackCart(f'Given packs are not all in cart {cart}')
+        for pack_cart in pack_carts:
+            pack_cart.quantity = skus_with_quantity[pack_cart.pack.sku]
         Cart.bll.bulk_update_pack_carts_quantity(pack_carts)
+        CartSnapshotServices().bump_cart_version(cart.id)
         return True
 
     def add_pack_to_cart(
@@ -80,12 +103,16 @@ class PrePaymentServices:
             logistic: Logistic,
             voucher: Voucher,
             order_address: OrderAddress,
+            bulk: bool = True,
     ):
         """
         After user tries to pay for the cart, the following should happen:
             1- create an order
             2- transform each pack_cart to pack_order
             3- empty the cart by deleting all pack_carts
+
+        with `bulk` all pack_orders and their voucher rows are created with
+        a constant number of queries instead of a few queries per pack_cart.
         """
         cart = user.cart
         with transaction.atomic():
@@ -100,11 +127,62 @@ class PrePaymentServices:
                     order_address=order_address,
                 )
                 # Order.bll.add_order_many_to_many_rels(order)
-                pack_carts = cart.pack_carts.all()
-                for pack_cart in pack_carts:
-                    PackOrder.bll.add_to_pack_order(pack_cart, order, voucher)
-                Cart.bll.del_all_pack_carts(cart)
+                if bulk:
+                    self.bulk_transform_pack_carts(cart, order, voucher)
+                else:
+                    pack_carts = cart.pack_carts.all()
+                    for pack_cart in pack_carts:
+                        PackOrder.bll.add_to_pack_order(pack_cart, order, voucher)
+                    Cart.bll.del_all_pack_carts(cart)
             except Exception as e:
                 logger.warning(f'transaction number: `{transaction_number}` '
                                f'action: `transform cart to order`, error: `{e}`', exc_info=True)
                 raise OrderFailedToCreate(e)
+
+    def bulk_transform_pack_carts(self,
+                                  cart: Cart,
+                                  order: Order,
+                                  voucher: Voucher = None):
+        """
+        Transforms all pack_carts of the cart to pack_orders of the order:
+            1- fetch every pack_cart with its pack and expense in one query
+            2- compute costs in the order currency in Python
+            3- create the pack_orders and their voucher rows in bulk
+            4- empty the cart with a single delete
+        `bulk_create` sends no `post_save`, so the sales facts of the
+        created pack_orders are scheduled here.
+        """
+        currency = PackOrder.DEFAULT_CURRENCY_SHOW_ON_SITE
+        pack_carts = PackCart.objects.filter(cart=cart) \
+            .select_related('pack__expense')
+
+        pack_orders = list()
+        for pack_cart in pack_carts:
+            expense = pack_cart.pack.expense
+            price = Money(convert_amount(expense.price.amount,
+                                         expense.price_currency,
+                                         currency), currency)
+            buy_price = Money(convert_amount(expense.buy_price.amount,
+                                             expense.buy_price_currency,
+                                             currency), currency)
+            pack_orders.append(PackOrder(
+                order=order,
+                pack=pack_cart.pack,
+                quantity=pack_cart.quantity,
+                cost=price,
+                cost_without_discount=price,
+                buy_price=buy_price,
+            ))
+        pack_orders = PackOrder.objects.bulk_create(pack_orders)
+        if voucher is not None:
+            PackOrderVoucher = PackOrder.vouchers.through
+            PackOrderVoucher.objects.bulk_create([
+                PackOrderVoucher(packorder_id=pack_order.id, voucher_id=voucher.id)
+                for pack_order in pack_orders
+            ])
+        SalesFact.bll.schedule_refresh(
+            {(timezone.localdate(order.created), pack_order.pack_id)
+             for pack_order in pack_orders})
+
+        PackCart.objects.filter(cart=cart).delete()
+        return pack_orders
@@ -0,0 +1,133 @@
+import logging
+from typing import Dict
+
+from django.conf import settings
+
+from basket.helper.exceptions import PackNotInPackCart
+from basket.models import (
+    Cart,
+    PackCart
+)
+from basket.services.cart_snapshot import CartSnapshotServices
+from warehouse.models import Pack
+
+logger = logging.getLogger(__name__)
+
+
+class SessionCartServices:
+    """
+    Cart of an anonymous visitor, kept in the session as a compact
+    `{sku: quantity}` map so browsing visitors write nothing to the cart
+    tables. Offers the operations of `Cart.bll` without the `cart`
+    argument, and the snapshot of `CartSnapshotServices` read with one
+    query. On login the map is merged into the user's cart with a single
+    upsert, see `merge_into`.
+    """
+    SESSION_KEY = 'basket:session-cart'
+
+    def __init__(self, session):
+        self.session = session
+
+    def __bool__(self):
+        return bool(self.get_items())
+
+    def get_items(self) -> Dict[str, int]:
+        return dict(self.session.get(self.SESSION_KEY, dict()))
+
+    def save_items(self, items: Dict[str, int]):
+        if len(items) > settings.SESSION_CART_MAX_LINES:
+            raise ValueError(f'session cart cannot hold more than '
+                             f'{settings.SESSION_CART_MAX_LINES} packs')
+        self.session[self.SESSION_KEY] = items
+
+    def clear(self):
+        self.session.pop(self.SESSION_KEY, None)
+
+    def is_pack_in_the_cart(self, pack: Pack) -> bool:
+        return pack.sku in self.get_items()
+
+    def add_pack_to_cart(self, given_pack: Pack, quantity: int) -> int:
+        """
+        Add the given `pack` to the cart with given quantity, returns the
+        quantity of the pack in the cart.
+        """
+        if quantity < 1:
+            raise ValueError('quantity should be greater than or equal 1 however'
+                             f' {quantity} was given')
+        items = self.get_items()
+        items[given_pack.sku] = items.get(given_pack.sku, 0) + quantity
+        self.save_items(items)
+        return items[given_pack.sku]
+
+    def del_pack_cart_from_cart(self, pack_sku: str):
+        items = self.get_items()
+        if pack_sku not in items:
+            raise PackNotInPackCart(f'Pack {pack_sku} does not exist in the session cart')
+        del items[pack_sku]
+        self.save_items(items)
+
+    def apply_cart_diff(self, deltas: Dict[str, int]) -> Dict[str, int]:
+        """
+        Same as `Cart.bll.apply_cart_diff`: packs whose quantity drops to
+        zero are removed, packs not in the cart are ignored.
+        """
+        items = self.get_items()
+        quantities = dict()
+        for sku, delta in deltas.items():
+            if sku not in items:
+                continue
+            quantities[sku] = max(items[sku] + delta, 0)
+            if quantities[sku]:
+                items[sku] = quantities[sku]
+            else:
+                del items[sku]
+        self.save_items(items)
+        return quantities
+
+    def update_pack_cart_quantity(self, pack_sku: str, increment: bool) -> int:
+        """
+        adds or subtracts 1 from the quantity of the pack, removing it
+        when it reaches 0. returns the new quantity.
+        """
+        quantities = self.apply_cart_diff({pack_sku: 1 if increment else -1})
+        if not quantities:
+            raise PackNotInPackCart(f'Pack {pack_sku} does not exist in the session cart')
+        return quantities[pack_sku]
+
+    def get_snapshot(self):
+        """
+        `(pack_carts, total_cost)` like `CartSnapshotServices.get_snapshot`.
+        pack carts are unsaved, built from the packs read in one query;
+        skus no longer in the warehouse are dropped from the session.
+        """
+        items = self.get_items()
+        packs = {pack.sku: pack for pack in Pack.objects
+                 .filter(sku__in=items.keys())
+                 .select_related('expense', 'product', 'color')}
+        if len(packs) != len(items):
+            self.save_items({sku: quantity for sku, quantity in items.items()
+                             if sku in packs})
+        pack_carts = [PackCart(pack=packs[sku], quantity=quantity)
+                      for sku, quantity in items.items() if sku in packs]
+        return pack_carts, CartSnapshotServices().price_pack_carts(pack_carts)
+
+    def get_packs_with_quantity(self) -> Dict[str, int]:
+        return self.get_items()
+
+    def merge_into(self, cart: Cart):
+        """
+        Adds every pack of the session cart to the persistent `cart` with
+        one upsert, quantities of packs already in it are summed, then
+        empties the session cart.
+        """
+        items = self.get_items()
+        if not items:
+            return []
+        pack_ids = dict(Pack.objects.filter(sku__in=items.keys())
+                        .values_list('sku', 'id'))
+        pack_carts = Cart.bll.upsert_pack_carts(
+            cart, {pack_ids[sku]: quantity for sku, quantity in items.items()
+                   if sku in pack_ids})
+        self.clear()
+        logger.debug(f'{len(pack_carts)} packs of the session cart are merged into cart {cart}')
+        return pack_carts
@@ -0,0 +1,81 @@
+import logging
+from datetime import timedelta
+from typing import Dict, Iterable
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from basket.models import Order, SalesFact
+from basket.helper.enums import OrderStatus
+from basket.services.order_history import OrderHistoryServices
+from warehouse.models import StockReservation
+
+logger = logging.getLogger(__name__)
+
+
+class StockReservationServices:
+    """
+    Holds the stock of an order from checkout until the bank gateway
+    returns, and sweeps the holds of the orders that never came back:
+        1- a `waiting` order whose holds expired becomes `expiring`, its
+           stock is free again from the moment the holds expired.
+        2- an `expiring` order whose holds expired more than
+           `STOCK_RESERVATION_CANCEL_AFTER` seconds ago is `cancelled` and
+           its holds are deleted.
+    """
+    def hold_order(self, order: Order, skus_with_quantity: Dict[str, int]):
+        """raises `PackOutOfStock` when the free stock is not enough."""
+        return StockReservation.bll.reserve(order, skus_with_quantity)
+
+    def release_order(self, order: Order) -> int:
+        return StockReservation.bll.release([order.id])
+
+    def change_orders_status(self,
+                             order_ids: Iterable[int],
+                             status: str,
+                             from_status: str) -> int:
+        """
+        Moves the given orders still in `from_status` to `status` with one
+        update. `update` sends no signal, so the caches the order signals
+        keep fresh are refreshed here.
+        """
+        order_ids = list(order_ids)
+        if not order_ids:
+            return 0
+        with transaction.atomic():
+            orders = list(Order.objects.select_for_update(skip_locked=True)
+                          .filter(id__in=order_ids, status=from_status)
+                          .values_list('id', 'user_id'))
+            if not orders:
+                return 0
+            Order.objects.filter(id__in=[order_id for order_id, _ in orders]) \
+                .update(status=status)
+            SalesFact.bll.schedule_refresh(
+                SalesFact.bll.get_order_keys(order_id for order_id, _ in orders))
+            user_ids = {user_id for _, user_id in orders if user_id is not None}
+
+            def invalidate_status_counts():
+                for user_id in user_ids:
+                    OrderHistoryServices().invalidate_status_count(user_id)
+
+            transaction.on_commit(invalidate_status_counts)
+        logger.info(f"{len(orders)} orders are moved from `{from_status}` to `{status}`")
+        return len(orders)
+
+    def sweep(self, batch_size: int = None) -> Dict[str, int]:
+        """returns how many orders became `expiring` and `cancelled`."""
+        batch_size = batch_size or settings.STOCK_RESERVATION_SWEEP_BATCH_SIZE
+        now = timezone.now()
+        expiring = self.change_orders_status(
+            StockReservation.bll.get_expired_order_ids(now),
+            OrderStatus.Expiring,
+            from_status=OrderStatus.Waiting,
+        )
+        expired_before = now - timedelta(seconds=settings.STOCK_RESERVATION_CANCEL_AFTER)
+        cancelled = self.change_orders_status(
+            StockReservation.bll.release_expired(expired_before, batch_size=batch_size),
+            OrderStatus.Cancelled,
+            from_status=OrderStatus.Expiring,
+        )
+        return {'expiring': expiring, 'cancelled': cancelled}
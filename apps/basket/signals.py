@@ -0,0 +1,101 @@
+from django.contrib.auth.signals import user_logged_in
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models.signals import (
+    pre_save,
+    post_save,
+    pre_delete,
+    post_delete
+)
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils import timezone
+
+from basket.models import (
+    Order,
+    PackCart,
+    PackOrder,
+    SalesFact
+)
+from basket.services import (
+    OrderHistoryServices,
+    CartSnapshotServices,
+    SessionCartServices
+)
+
+
+# ############################### #
+#       ORDER STATUS COUNTS       #
+# ############################### #
+@receiver([post_save, post_delete], sender=Order,
+          dispatch_uid='order_status_count_order')
+def invalidate_status_count_on_order_change(sender, instance, **kwargs):
+    user_id = instance.user_id
+    transaction.on_commit(
+        lambda: OrderHistoryServices().invalidate_status_count(user_id))
+
+
+# ############################### #
+#           SALES FACTS           #
+# ############################### #
+@receiver(pre_save, sender=Order, dispatch_uid='sales_fact_order_previous_status')
+def remember_previous_status(sender, instance, **kwargs):
+    if instance._state.adding:
+        instance._previous_status = None
+        return
+    instance._previous_status = Order.objects.filter(pk=instance.pk) \
+        .values_list('status', flat=True).first()
+
+
+@receiver(post_save, sender=Order, dispatch_uid='sales_fact_order_status')
+def refresh_sales_facts_on_status_change(sender, instance, created, **kwargs):
+    # a new order has no pack order yet, they refresh the facts themselves
+    if created or getattr(instance, '_previous_status', None) == instance.status:
+        return
+    SalesFact.bll.schedule_refresh(SalesFact.bll.get_order_keys([instance.pk]))
+
+
+@receiver(pre_delete, sender=Order, dispatch_uid='sales_fact_order_keys')
+def remember_sales_fact_keys(sender, instance, **kwargs):
+    # pack orders are deleted with the order, their keys are read before
+    instance._sales_fact_keys = SalesFact.bll.get_order_keys([instance.pk])
+
+
+@receiver(post_delete, sender=Order, dispatch_uid='sales_fact_order_delete')
+def refresh_sales_facts_on_order_delete(sender, instance, **kwargs):
+    SalesFact.bll.schedule_refresh(getattr(instance, '_sales_fact_keys', ()))
+
+
+@receiver([post_save, post_delete], sender=PackOrder,
+          dispatch_uid='sales_fact_pack_order')
+def refresh_sales_facts_on_pack_order_change(sender, instance, **kwargs):
+    created = Order.objects.filter(pk=instance.order_id) \
+        .values_list('created', flat=True).first()
+    if created is None:
+        return
+    SalesFact.bll.schedule_refresh(
+        [(timezone.localdate(created), instance.pack_id)])
+
+
+# ############################### #
+#          CART SNAPSHOTS         #
+# ############################### #
+@receiver([post_save, post_delete], sender=PackCart,
+          dispatch_uid='cart_snapshot_pack_cart')
+def bump_cart_version_on_pack_cart_change(sender, instance, **kwargs):
+    CartSnapshotServices().bump_cart_version(instance.cart_id)
+
+
+# ############################### #
+#          SESSION CARTS          #
+# ############################### #
+@receiver(user_logged_in, dispatch_uid='session_cart_merge')
+def merge_session_cart_on_login(sender, request, user, **kwargs):
+    session_cart = SessionCartServices(request.session)
+    if not session_cart:
+        return
+    try:
+        cart = user.cart
+    except ObjectDoesNotExist:
+        # kept in the session until the user has a cart
+        return
+    session_cart.merge_into(cart)
@@ -0,0 +1,128 @@
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from azbankgateways.models import Bank
+
+from painless.utils.benchmark import QuerysetBenchmarkMixin
+from painless.utils.decorators import disable_logging
+
+from warehouse.repository.generator_layer import WarehouseDataGenerator
+from basket.repository.generator_layer import BasketDataGenerator
+from account.repository.generator_layer import AccountDataGenerator
+from logistic.repository.generator_layer import LogisticDataGenerator
+
+from basket.repository.queryset.order import OrderQuerySet
+from basket.models import Order
+from warehouse.models import Product
+
+User = get_user_model()
+
+
+class OrderQuerysetBenchmark(QuerysetBenchmarkMixin, TestCase):
+    """
+    Query count, SQL time, Python time and peak memory of every public
+    `OrderQuerySet` method on a fixed size order history, compared with
+    `order_queryset_baseline.json`.
+
+    Run with `BENCHMARK_UPDATE_BASELINE=1` to record a new baseline.
+    """
+    TOTAL_PRODUCTS = 100
+    TOTAL_PACKS = 300
+    baseline_path = Path(__file__).with_name('order_queryset_baseline.json')
+    queryset_classes = (OrderQuerySet, )
+
+    @classmethod
+    @disable_logging
+    def setUpClass(cls) -> None:
+        super(OrderQuerysetBenchmark, cls).setUpClass()
+
+        # Account Data Generator
+        account_dgl = AccountDataGenerator()
+        account_dgl.create_user(10)
+        account_dgl.create_profile()
+        # Warehouse Data Generator
+        warehouse_dgl = WarehouseDataGenerator()
+        brands = warehouse_dgl.create_brands(5)
+        categories = warehouse_dgl.create_categories(20)
+        colors = warehouse_dgl.create_colors(10)
+        warranties = warehouse_dgl.create_warranties(10)
+        tags = warehouse_dgl.create_tags(5)
+        products = warehouse_dgl.create_products(
+            brands, categories, tags, cls.TOTAL_PRODUCTS)
+        warehouse_dgl.create_physical_info()
+        warehouse_dgl.create_packs(colors, warranties, products, cls.TOTAL_PACKS)
+        warehouse_dgl.create_expenses()
+        warehouse_dgl.create_product_gallery(
+            products,
+            lower_boundary=3,
+            upper_boundary=5
+        )
+
+        # Logistic Data Generator
+        logistic_dgl = LogisticDataGenerator()
+        logistic_dgl.create_address(5)
+        logistic_dgl.create_logistic(total=10)
+
+        # Basket Data Generator
+        basket_dgl = BasketDataGenerator()
+        basket_dgl.create_order_addresses(10)
+        orders = basket_dgl.create_orders()
+        basket_dgl.create_pack_order(orders)
+
+        order = Order.objects.last()
+        Bank.objects.create(
+            status='Complete',
+            bank_type='ZARINPAL',
+            tracking_code=order.transaction_number,
+            amount='1000',
+            reference_number=order.transaction_number
+        )
+
+    def get_cases(self):
+        """(method, args) of every benchmark, arguments taken from the data."""
+        user = User.objects.filter(orders__isnull=False).first()
+        order = Order.objects.last()
+        product = Product.objects.filter(packs__orders__isnull=False).first()
+        return (
+            ('get_all_orders_with_status_count', (user, )),
+            ('get_all_virtual_downloadable_products', (user, )),
+            ('get_all_orders_for_given_product', (product.title, )),
+            ('get_all_orders_of_user', (user, )),
+            ('get_order_total_quantity', ()),
+            ('get_order_by_transaction', (order.transaction_number, )),
+            ('get_order_related', ()),
+            ('get_order_detail', (order.transaction_number, )),
+            ('get_order_with_bank_record', (order.transaction_number, )),
+            ('get_all_pack_orders', (order, )),
+            ('get_order_history', (user, )),
+        )
+
+    @staticmethod
+    def get_call(method, args):
+        # a new queryset per round, so no round reads a cached result
+        return lambda: getattr(Order.dal.get_queryset(), method)(*args)
+
+    def test_baseline_is_recorded(self):
+        missing = self.baseline.get_missing(method for method, _ in self.get_cases())
+        self.assertFalse(
+            missing,
+            msg=f"Benchmarks without a baseline in {self.baseline.path.name}, "
+                f"run with BENCHMARK_UPDATE_BASELINE=1 to record them: {sorted(missing)}"
+        )
+
+    @disable_logging
+    def test_order_queryset_benchmark(self):
+        for method, args in self.get_cases():
+            # arguments are model instances, so names only use the method
+            with self.subTest(method):
+                self.benchmark(method, self.get_call(method, args))
+
+    def test_every_public_method_is_benchmarked(self):
+        benchmarked = {method for method, _ in self.get_cases()}
+        missing = self.get_public_methods() - benchmarked
+        self.assertFalse(
+            missing,
+            msg=f"Public queryset methods without a benchmark: {sorted(missing)}"
+        )
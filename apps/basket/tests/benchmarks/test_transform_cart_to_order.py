@@ -0,0 +1,101 @@
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from painless.utils.decorators import disable_logging
+
+from warehouse.repository.generator_layer import WarehouseDataGenerator
+from basket.repository.generator_layer import BasketDataGenerator
+from account.repository.generator_layer import AccountDataGenerator
+from logistic.repository.generator_layer import LogisticDataGenerator
+
+from basket.services import PrePaymentServices
+from basket.models import (
+    Cart,
+    OrderAddress,
+    PackCart,
+)
+from warehouse.models import Pack
+from logistic.models import Logistic
+
+
+class TransformCartToOrderBenchmark(TransactionTestCase):
+    """
+    Compares the query counts of the per pack cart and the bulk
+    `transform_cart_to_order` paths on carts of 1, 10 and 100 lines.
+    """
+    CART_SIZES = (1, 10, 100)
+
+    @classmethod
+    @disable_logging
+    def setUpClass(cls) -> None:
+        super(TransformCartToOrderBenchmark, cls).setUpClass()
+
+        # Account Data Generator
+        account_dgl = AccountDataGenerator()
+        account_dgl.create_user(2)
+        account_dgl.create_profile()
+        # Warehouse Data Generator
+        warehouse_dgl = WarehouseDataGenerator()
+        brands = warehouse_dgl.create_brands(5)
+        categories = warehouse_dgl.create_categories(20)
+        colors = warehouse_dgl.create_colors(10)
+        warranties = warehouse_dgl.create_warranties(10)
+        tags = warehouse_dgl.create_tags(5)
+        products = warehouse_dgl.create_products(brands, categories, tags, 50)
+        warehouse_dgl.create_physical_info()
+        warehouse_dgl.create_packs(colors, warranties, products, 250)
+        warehouse_dgl.create_expenses()
+
+        # Logistic Data Generator
+        logistic_dgl = LogisticDataGenerator()
+        logistic_dgl.create_address(2)
+        logistic_dgl.create_logistic(total=2)
+
+        # Basket Data Generator
+        basket_dgl = BasketDataGenerator()
+        basket_dgl.create_cart()
+        basket_dgl.create_order_addresses(2)
+
+    def fill_cart(self, cart, size):
+        PackCart.objects.filter(cart=cart).delete()
+        for pack in Pack.objects.all()[:size]:
+            Cart.bll.add_pack_to_cart(cart, pack, 1)
+
+    def run_transform(self, size, bulk, transaction_number):
+        cart = Cart.objects.select_related('user').first()
+        self.fill_cart(cart, size)
+        with CaptureQueriesContext(connection) as queries:
+            PrePaymentServices().transform_cart_to_order(
+                footnote='benchmark',
+                transaction_number=transaction_number,
+                user=cart.user,
+                logistic=Logistic.objects.first(),
+                voucher=None,
+                order_address=OrderAddress.objects.first(),
+                bulk=bulk,
+            )
+        return len(queries)
+
+    @disable_logging
+    def test_transform_cart_to_order_benchmark(self):
+        results = dict()
+        transaction_number = 0
+        for size in self.CART_SIZES:
+            for bulk in (False, True):
+                transaction_number += 1
+                results[(size, bulk)] = self.run_transform(
+                    size, bulk, f'benchmark-{transaction_number}')
+
+        bulk_query_counts = {results[(size, True)] for size in self.CART_SIZES}
+        self.assertEqual(
+            len(bulk_query_counts),
+            1,
+            msg=f"Bulk path query count should not depend on cart size "
+                f"but got {bulk_query_counts}"
+        )
+        self.assertLess(
+            results[(100, True)],
+            results[(100, False)],
+            msg="Bulk path should run fewer queries than the per pack cart path"
+        )
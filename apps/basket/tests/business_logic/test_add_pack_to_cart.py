@@ -0,0 +1,123 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection
+from django.test import TransactionTestCase
+
+from painless.utils.decorators import disable_logging
+
+from warehouse.repository.generator_layer import WarehouseDataGenerator
+from basket.repository.generator_layer import BasketDataGenerator
+from account.repository.generator_layer import AccountDataGenerator
+
+from basket.models import (
+    Cart,
+    PackCart
+)
+from warehouse.models import Pack
+
+
+class AddPackToCartConcurrency(TransactionTestCase):
+    """
+    Parallel adds of the same packs must end with one pack cart per pack
+    holding the exact sum of the added quantities, parallel decrements
+    must none of them be lost.
+    """
+    WORKERS = 8
+    ADDS = 40
+
+    @disable_logging
+    def setUp(self):
+        # Account Data Generator
+        account_dgl = AccountDataGenerator()
+        account_dgl.create_user(2)
+        account_dgl.create_profile()
+        # Warehouse Data Generator
+        warehouse_dgl = WarehouseDataGenerator()
+        brands = warehouse_dgl.create_brands(2)
+        categories = warehouse_dgl.create_categories(5)
+        colors = warehouse_dgl.create_colors(2)
+        warranties = warehouse_dgl.create_warranties(2)
+        tags = warehouse_dgl.create_tags(2)
+        products = warehouse_dgl.create_products(brands, categories, tags, 5)
+        warehouse_dgl.create_physical_info()
+        warehouse_dgl.create_packs(colors, warranties, products, 10)
+        warehouse_dgl.create_expenses()
+
+        # Basket Data Generator
+        basket_dgl = BasketDataGenerator()
+        basket_dgl.create_cart()
+
+        self.cart = Cart.objects.first()
+        PackCart.objects.filter(cart=self.cart).delete()
+        self.packs = list(Pack.objects.all()[:3])
+
+    def run_in_parallel(self, function, total):
+        def run(index):
+            try:
+                return function(index)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as executor:
+            list(executor.map(run, range(total)))
+
+    def test_parallel_add_pack_to_cart(self):
+        pack = self.packs[0]
+        self.run_in_parallel(
+            lambda index: Cart.bll.add_pack_to_cart(self.cart, pack, 1 + index % 3),
+            self.ADDS)
+        expected = sum(1 + index % 3 for index in range(self.ADDS))
+        pack_carts = list(PackCart.objects.filter(cart=self.cart, pack=pack))
+
+        self.assertEqual(
+            len(pack_carts),
+            1,
+            msg=f"Parallel adds created {len(pack_carts)} pack carts instead of 1"
+        )
+        self.assertEqual(
+            pack_carts[0].quantity,
+            expected,
+            msg=f"Pack cart quantity is {pack_carts[0].quantity} but expected is {expected}"
+        )
+
+    def test_parallel_bulk_add_packs_to_cart(self):
+        self.run_in_parallel(
+            lambda index: Cart.bll.bulk_add_packs_to_cart(
+                self.cart, {pack: 1 for pack in self.packs}),
+            self.ADDS)
+        actual = dict(PackCart.objects.filter(cart=self.cart)
+                      .values_list('pack_id', 'quantity'))
+        expected = {pack.id: self.ADDS for pack in self.packs}
+
+        self.assertDictEqual(
+            actual,
+            expected,
+            msg=f"Pack cart quantities are {actual} but expected are {expected}"
+        )
+
+    def test_parallel_decrements(self):
+        remaining = 5
+        pack_cart = Cart.bll.add_pack_to_cart(self.cart, self.packs[0], self.ADDS + remaining)
+        self.run_in_parallel(
+            lambda index: Cart.bll.update_pack_cart_quantity(self.cart, pack_cart, False),
+            self.ADDS)
+        actual = PackCart.objects.get(id=pack_cart.id).quantity
+
+        self.assertEqual(
+            actual,
+            remaining,
+            msg=f"Pack cart quantity is {actual} after parallel decrements "
+                f"but expected is {remaining}"
+        )
+
+    def test_parallel_decrements_to_zero(self):
+        pack_cart = Cart.bll.add_pack_to_cart(self.cart, self.packs[0], self.ADDS)
+        # no decrement may be lost, so none of them raises PackNotInPackCart
+        self.run_in_parallel(
+            lambda index: Cart.bll.update_pack_cart_quantity(self.cart, pack_cart, False),
+            self.ADDS)
+
+        self.assertFalse(
+            PackCart.objects.filter(id=pack_cart.id).exists(),
+            msg="Pack cart decremented to 0 by parallel calls should be deleted"
+        )
@@ -187,6 +187,32 @@ class BasketBusinessLogicLayer(TestCase):
                                                pack_cart_not_in_cart,
                                                True)
 
+    def test_apply_cart_diff(self):
+        cart_choice = Cart.bll.first()
+        PackCart.bll.filter(cart=cart_choice).delete()
+        increased_pack, removed_pack = Pack.objects.all()[:2]
+        increased = Cart.bll.add_pack_to_cart(cart_choice, increased_pack, 3)
+        removed = Cart.bll.add_pack_to_cart(cart_choice, removed_pack, 1)
+
+        actual = Cart.bll.apply_cart_diff(cart_choice, {
+            increased.pack.sku: 2,
+            removed.pack.sku: -1,
+        })
+        expected = {
+            increased.pack.sku: increased.quantity + 2,
+            removed.pack.sku: 0,
+        }
+        self.assertDictEqual(
+            actual,
+            expected,
+            msg=f"Actual quantities are `{actual}` "
+                f"but expected are `{expected}`"
+        )
+        self.assertFalse(
+            PackCart.bll.filter(id=removed.id).exists(),
+            msg="Pack cart whose quantity dropped to 0 should be deleted"
+        )
+
     def test_add_to_order_address(self):
         NotImplemented
 
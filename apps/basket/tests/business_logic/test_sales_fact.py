@@ -0,0 +1,100 @@
+from django.conf import settings
+from django.db.models import Sum
+from django.test import TestCase
+
+from warehouse.repository.generator_layer import WarehouseDataGenerator
+from basket.repository.generator_layer import BasketDataGenerator
+from account.repository.generator_layer import AccountDataGenerator
+from logistic.repository.generator_layer import LogisticDataGenerator
+from painless.utils.decorators import disable_logging
+
+from basket.models import (
+    Order,
+    PackOrder,
+    SalesFact
+)
+from warehouse.models import Product
+
+
+class SalesFactBusinessLogicLayer(TestCase):
+
+    @classmethod
+    @disable_logging
+    def setUpClass(cls):
+        super(SalesFactBusinessLogicLayer, cls).setUpClass()
+
+        # Account Data Generator
+        account_dgl = AccountDataGenerator()
+        account_dgl.create_user(10)
+        account_dgl.create_profile()
+        # Warehouse Data Generator
+        warehouse_dgl = WarehouseDataGenerator()
+        brands = warehouse_dgl.create_brands(5)
+        categories = warehouse_dgl.create_categories(20)
+        colors = warehouse_dgl.create_colors(10)
+        warranties = warehouse_dgl.create_warranties(10)
+        tags = warehouse_dgl.create_tags(5)
+        products = warehouse_dgl.create_products(brands, categories, tags, 20)
+        warehouse_dgl.create_physical_info()
+        warehouse_dgl.create_packs(colors, warranties, products, 60)
+        warehouse_dgl.create_expenses()
+
+        # Logistic Data Generator
+        logistic_dgl = LogisticDataGenerator()
+        logistic_dgl.create_address(5)
+        logistic_dgl.create_logistic(total=10)
+
+        # Basket Data Generator
+        basket_dgl = BasketDataGenerator()
+        basket_dgl.create_order_addresses(10)
+        orders = basket_dgl.create_orders()
+        basket_dgl.create_pack_order(orders)
+
+    def get_sold_quantity(self):
+        return PackOrder.objects \
+            .exclude(order__status__in=settings.SALES_FACT_EXCLUDED_STATUSES) \
+            .aggregate(total=Sum('quantity'))['total'] or 0
+
+    def test_backfill(self):
+        SalesFact.bll.backfill()
+        actual = SalesFact.objects.aggregate(total=Sum('quantity'))['total'] or 0
+        expected = self.get_sold_quantity()
+
+        self.assertEqual(
+            actual,
+            expected,
+            msg=f"Sales facts hold {actual} sold packs but pack orders have {expected}"
+        )
+
+    def test_from_facts_matches_pack_orders(self):
+        SalesFact.bll.backfill()
+        actual = {product.id: product.product_sold_count or 0
+                  for product in Product.dal.get_queryset().get_product_sold_count(from_facts=True)}
+        expected = {product.id: 0 for product in Product.objects.all()}
+        for pack_order in PackOrder.objects \
+                .exclude(order__status__in=settings.SALES_FACT_EXCLUDED_STATUSES) \
+                .select_related('pack'):
+            expected[pack_order.pack.product_id] += pack_order.quantity
+
+        self.assertDictEqual(
+            actual,
+            expected,
+            msg=f"Sold count read from facts is {actual} but expected is {expected}"
+        )
+
+    def test_refresh_on_status_change(self):
+        SalesFact.bll.backfill()
+        order = Order.objects.exclude(
+            status__in=settings.SALES_FACT_EXCLUDED_STATUSES).filter(pack_orders__isnull=False).first()
+        with self.captureOnCommitCallbacks(execute=True):
+            order.status = 'cancelled'
+            order.save()
+        actual = SalesFact.objects.aggregate(total=Sum('quantity'))['total'] or 0
+        expected = self.get_sold_quantity()
+
+        self.assertEqual(
+            actual,
+            expected,
+            msg=f"Sales facts hold {actual} sold packs after the order was cancelled"
+                f" but pack orders have {expected}"
+        )
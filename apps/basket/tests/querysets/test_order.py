@@ -274,3 +274,28 @@ class OrderQuerysetManager(TestCase):
             msg=f"actual orders for given user are `{actual}`"
                 f"but expected are `{expected}`"
         )
+
+    def test_queryset_get_order_history(self):
+        user = User.objects.first()
+        with self.assertNumQueries(1):
+            actual = {
+                order.id: (order.line_count, order.quantity)
+                for order in Order.dal.get_order_history(user)
+            }
+
+        orders_obj = Order.objects.filter(user=user)\
+            .prefetch_related('pack_orders')
+        expected = {
+            order.id: (
+                len(order.pack_orders.all()),
+                sum(pack_order.quantity for pack_order in order.pack_orders.all())
+            )
+            for order in orders_obj
+        }
+
+        self.assertDictEqual(
+            actual,
+            expected,
+            msg=f"actual line count and quantity per order are {actual} "
+                f"but expected are {expected}"
+        )
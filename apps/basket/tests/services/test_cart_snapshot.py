@@ -0,0 +1,78 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from painless.utils.decorators import disable_logging
+
+from warehouse.repository.generator_layer import WarehouseDataGenerator
+from basket.repository.generator_layer import BasketDataGenerator
+from account.repository.generator_layer import AccountDataGenerator
+
+from basket.services import CartSnapshotServices
+from basket.models import (
+    Cart,
+    PackCart
+)
+
+
+class CartSnapshotServicesTest(TestCase):
+    @classmethod
+    @disable_logging
+    def setUpClass(cls) -> None:
+        super(CartSnapshotServicesTest, cls).setUpClass()
+
+        # Account Data Generator
+        account_dgl = AccountDataGenerator()
+        account_dgl.create_user(10)
+        account_dgl.create_profile()
+        # Warehouse Data Generator
+        warehouse_dgl = WarehouseDataGenerator()
+        brands = warehouse_dgl.create_brands(5)
+        categories = warehouse_dgl.create_categories(20)
+        colors = warehouse_dgl.create_colors(10)
+        warranties = warehouse_dgl.create_warranties(10)
+        tags = warehouse_dgl.create_tags(5)
+        products = warehouse_dgl.create_products(brands, categories, tags, 10)
+        warehouse_dgl.create_physical_info()
+        warehouse_dgl.create_packs(colors, warranties, products, 50)
+        warehouse_dgl.create_expenses()
+
+        # Basket Data Generator
+        basket_dgl = BasketDataGenerator()
+        basket_dgl.create_cart()
+        basket_dgl.create_pack_cart()
+
+    def setUp(self):
+        cache.clear()
+        self.cart = Cart.objects.filter(pack_carts__isnull=False).first()
+
+    def test_snapshot_in_a_single_query(self):
+        with self.assertNumQueries(1):
+            pack_carts, total_cost = CartSnapshotServices().load_snapshot(self.cart)
+            for pack_cart in pack_carts:
+                pack_cart.pack.product.title, pack_cart.pack.color
+
+        expected = sum(PackCart.bll.get_total_price(pack_cart) for pack_cart in pack_carts)
+        self.assertEqual(
+            total_cost.amount,
+            expected,
+            msg=f"Snapshot total is {total_cost.amount} but expected is {expected}"
+        )
+
+    def test_cached_snapshot_runs_no_query(self):
+        services = CartSnapshotServices()
+        services.get_snapshot(self.cart)
+        with self.assertNumQueries(0):
+            services.get_snapshot(self.cart)
+
+    def test_cart_change_invalidates_snapshot(self):
+        services = CartSnapshotServices()
+        pack_carts, _ = services.get_snapshot(self.cart)
+        with self.captureOnCommitCallbacks(execute=True):
+            PackCart.objects.filter(id=pack_carts[0].id).delete()
+        actual, _ = services.get_snapshot(self.cart)
+
+        self.assertEqual(
+            len(actual),
+            len(pack_carts) - 1,
+            msg=f"Snapshot has {len(actual)} lines after a delete, expected {len(pack_carts) - 1}"
+        )
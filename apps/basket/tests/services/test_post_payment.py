@@ -14,8 +14,10 @@ from voucher.repository.generator_layer import VoucherDataGenerator
 from logistic.repository.generator_layer import LogisticDataGenerator
 
 from basket.services import PostPaymentServices
+from basket.helper.exceptions import OrderFailedToFinalize
 
 from basket.models import Order
+from warehouse.models import Expense
 
 
 class PostPaymentServicesTest(TransactionTestCase):
@@ -108,4 +110,47 @@ class PostPaymentServicesTest(TransactionTestCase):
         self.assertListEqual(
             actual_actual_stock_count,
             expected_actual_stock_count,
-        )
\ No newline at end of file
+        )
+
+    @test_time_upper_limit(0.1)
+    def test_after_successful_payment_out_of_stock(self):
+        order = random.choice(Order.objects.filter(pack_orders__isnull=False).distinct())
+        pack_order = order.pack_orders.select_related('pack__expense').first()
+        expense = pack_order.pack.expense
+        expense.count_stock = pack_order.quantity - 1
+        expense.save()
+
+        expected_stock_count = list(
+            Expense.objects.filter(pack__pack_orders__order=order)
+            .order_by('id')
+            .values_list('count_stock', 'actual_count_stock')
+        )
+
+        with self.assertRaises(OrderFailedToFinalize):
+            PostPaymentServices().after_successful_payment(order)
+
+        actual_stock_count = list(
+            Expense.objects.filter(pack__pack_orders__order=order)
+            .order_by('id')
+            .values_list('count_stock', 'actual_count_stock')
+        )
+        self.assertListEqual(
+            actual_stock_count,
+            expected_stock_count,
+            msg="Stock should not change when a pack is out of stock"
+        )
+
+    @test_time_upper_limit(0.1)
+    def test_bulk_update_stock_out_of_stock_report(self):
+        expense = Expense.objects.select_related('pack').first()
+        sku = expense.pack.sku
+        requested = expense.count_stock + 1
+
+        result = Expense.bll.bulk_update_stock({sku: requested,
+                                                'not-a-sku': 1})
+
+        self.assertFalse(result.is_successful)
+        self.assertSetEqual(set(result.out_of_stock), {sku, 'not-a-sku'})
+        self.assertEqual(result.out_of_stock[sku].requested, requested)
+        self.assertIsNone(result.out_of_stock['not-a-sku'].count_stock)
+        self.assertDictEqual(result.levels, {})
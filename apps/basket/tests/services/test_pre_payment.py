@@ -1,8 +1,12 @@
 import random
 import mimesis
 
+from django.conf import settings
+from django.db import connection
 from django.test import (TestCase,
                          TransactionTestCase)
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
 from painless.utils.decorators import (
     disable_logging,
@@ -20,11 +24,15 @@ from basket.helper.exceptions import FailedAddToCart
 from basket.services import PrePaymentServices
 
 from warehouse.models import (Pack,
-                              Product)
+                              Product,
+                              Category)
+from warehouse.helper.structures import AvailabilityReason
 from basket.models import (PackCart,
+                           PackOrder,
                            Cart,
                            Order,
-                           OrderAddress)
+                           OrderAddress,
+                           SalesFact)
 from account.models import User
 from voucher.models import Voucher
 from logistic.models import Logistic
@@ -123,6 +131,48 @@ class PrePaymentServicesTest(TestCase):
         # with self.assertRaises(FailedAddToCart):
         #     PrePaymentServices().add_pack_to_cart(cart, pack_with_inactive_category, quantity)
 
+    @test_time_upper_limit(0.1)
+    def test_is_available_many(self):
+        """
+        Test verdicts of many packs are resolved with a single query.
+        """
+        packs_per_tree = dict()
+        for pack in Pack.objects.select_related('product__category') \
+                .filter(product__category__isnull=False):
+            packs_per_tree.setdefault(pack.product.category.tree_id, pack)
+        available_pack, inactive_pack, pack_with_inactive_ancestor = \
+            list(packs_per_tree.values())[:3]
+        packs = [available_pack, inactive_pack, pack_with_inactive_ancestor]
+
+        Category.objects.filter(tree_id__in=[pack.product.category.tree_id
+                                             for pack in packs]) \
+            .update(is_active=True)
+        Product.objects.filter(id__in=[pack.product_id for pack in packs]) \
+            .update(is_active=True)
+        Pack.objects.filter(id__in=[pack.id for pack in packs]) \
+            .update(is_active=True)
+        expense = available_pack.expense
+        expense.count_stock = 10
+        expense.is_suppliable = True
+        expense.save()
+
+        Pack.objects.filter(id=inactive_pack.id).update(is_active=False)
+        Category.objects.filter(
+            tree_id=pack_with_inactive_ancestor.product.category.tree_id,
+            level=0).update(is_active=False)
+
+        skus = [pack.sku for pack in packs] + ['not-a-sku']
+        with self.assertNumQueries(1):
+            verdicts = Pack.bll.is_available_many(skus, [1] * len(skus))
+
+        self.assertTrue(verdicts[available_pack.sku].is_available)
+        self.assertEqual(verdicts[inactive_pack.sku].reason,
+                         AvailabilityReason.PackNotActive)
+        self.assertEqual(verdicts[pack_with_inactive_ancestor.sku].reason,
+                         AvailabilityReason.CategoryNotActive)
+        self.assertEqual(verdicts['not-a-sku'].reason,
+                         AvailabilityReason.DoesNotExist)
+
 
 class TransactionPrePaymentServicesTest(TransactionTestCase):
     @classmethod
@@ -179,3 +229,105 @@ class TransactionPrePaymentServicesTest(TransactionTestCase):
         orders = basket_dgl.create_orders()
         basket_dgl.create_pack_order(orders)
         basket_dgl.create_refund()
+
+    def transform_cart(self, cart, packs, voucher, bulk, transaction_number):
+        PackCart.objects.filter(cart=cart).delete()
+        for pack in packs:
+            Cart.bll.add_pack_to_cart(cart, pack, 2)
+        PrePaymentServices().transform_cart_to_order(
+            footnote='voucher',
+            transaction_number=transaction_number,
+            user=cart.user,
+            logistic=Logistic.objects.first(),
+            voucher=voucher,
+            order_address=OrderAddress.objects.first(),
+            bulk=bulk,
+        )
+        order = Order.objects.get(transaction_number=transaction_number)
+        return list(order.pack_orders.order_by('pack_id')
+                    .values_list('pack_id', 'quantity', 'cost', 'cost_without_discount'))
+
+    def test_transform_cart_to_order_paths_match(self):
+        """
+        Test both paths give the same pack orders, line by line.
+        """
+        cart = Cart.objects.select_related('user').first()
+        packs = list(Pack.objects.all()[:5])
+
+        expected = self.transform_cart(cart, packs, None, False, 'per-pack-cart')
+        actual = self.transform_cart(cart, packs, None, True, 'bulk')
+        self.assertEqual(len(actual), len(packs))
+        for actual_line, expected_line in zip(actual, expected):
+            self.assertTupleEqual(
+                actual_line,
+                expected_line,
+                msg=f"Bulk path pack order `{actual_line}` but the per pack cart path "
+                    f"gives `{expected_line}`"
+            )
+
+    def test_transform_cart_to_order_with_voucher(self):
+        """
+        Test the bulk path links the voucher to every pack order with one
+        insert whatever the number of lines.
+        """
+        cart = Cart.objects.select_related('user').first()
+        packs = list(Pack.objects.all()[:5])
+        voucher = Voucher.objects.first()
+
+        self.transform_cart(cart, packs, voucher, True, 'voucher-bulk')
+        order = Order.objects.get(transaction_number='voucher-bulk')
+        PackOrderVoucher = PackOrder.vouchers.through
+        actual = set(PackOrderVoucher.objects.filter(packorder__order=order)
+                     .values_list('packorder_id', 'voucher_id'))
+        expected = {(pack_order_id, voucher.id)
+                    for pack_order_id in order.pack_orders.values_list('id', flat=True)}
+        self.assertSetEqual(
+            actual,
+            expected,
+            msg="Every pack order of the bulk path should be linked to the voucher"
+        )
+
+        queries = dict()
+        for size in (1, len(packs)):
+            PackCart.objects.filter(cart=cart).delete()
+            for pack in packs[:size]:
+                Cart.bll.add_pack_to_cart(cart, pack, 1)
+            order = Order.bll.add_to_order(footnote='voucher',
+                                           transaction_number=f'voucher-bulk-{size}',
+                                           user=cart.user,
+                                           logistic=Logistic.objects.first(),
+                                           voucher=voucher,
+                                           order_address=OrderAddress.objects.first())
+            with CaptureQueriesContext(connection) as captured:
+                PrePaymentServices().bulk_transform_pack_carts(cart, order, voucher)
+            queries[size] = len(captured)
+        self.assertEqual(
+            queries[1],
+            queries[len(packs)],
+            msg=f"Bulk path with a voucher should not run more queries for more "
+                f"lines but ran {queries}"
+        )
+
+    def test_transform_cart_to_order_refreshes_sales_facts(self):
+        """
+        Test the bulk path refreshes the sales facts of the new pack orders.
+        """
+        cart = Cart.objects.select_related('user').first()
+        packs = list(Pack.objects.all()[:5])
+
+        self.transform_cart(cart, packs, None, True, 'sales-fact-bulk')
+        order = Order.objects.get(transaction_number='sales-fact-bulk')
+        day = timezone.localdate(order.created)
+        for pack in packs:
+            expected = sum(PackOrder.objects
+                           .filter(pack=pack, order__created__date=day)
+                           .exclude(order__status__in=settings.SALES_FACT_EXCLUDED_STATUSES)
+                           .values_list('quantity', flat=True))
+            actual = sum(SalesFact.objects.filter(day=day, pack=pack)
+                         .values_list('quantity', flat=True))
+            self.assertEqual(
+                actual,
+                expected,
+                msg=f"Sales facts of pack `{pack.id}` on {day} count {actual} sold "
+                    f"but the pack orders count {expected}"
+            )
@@ -0,0 +1,106 @@
+from django.test import TestCase
+
+from painless.utils.decorators import disable_logging
+
+from warehouse.repository.generator_layer import WarehouseDataGenerator
+from basket.repository.generator_layer import BasketDataGenerator
+from account.repository.generator_layer import AccountDataGenerator
+
+from basket.helper.exceptions import PackNotInPackCart
+from basket.services import SessionCartServices
+from basket.models import (
+    Cart,
+    PackCart
+)
+from warehouse.models import Pack
+
+
+class SessionCartServicesTest(TestCase):
+    @classmethod
+    @disable_logging
+    def setUpClass(cls) -> None:
+        super(SessionCartServicesTest, cls).setUpClass()
+
+        # Account Data Generator
+        account_dgl = AccountDataGenerator()
+        account_dgl.create_user(2)
+        account_dgl.create_profile()
+        # Warehouse Data Generator
+        warehouse_dgl = WarehouseDataGenerator()
+        brands = warehouse_dgl.create_brands(2)
+        categories = warehouse_dgl.create_categories(5)
+        colors = warehouse_dgl.create_colors(2)
+        warranties = warehouse_dgl.create_warranties(2)
+        tags = warehouse_dgl.create_tags(2)
+        products = warehouse_dgl.create_products(brands, categories, tags, 5)
+        warehouse_dgl.create_physical_info()
+        warehouse_dgl.create_packs(colors, warranties, products, 10)
+        warehouse_dgl.create_expenses()
+
+        # Basket Data Generator
+        basket_dgl = BasketDataGenerator()
+        basket_dgl.create_cart()
+
+    def setUp(self):
+        self.packs = list(Pack.objects.all()[:3])
+        # sessions behave like dicts, which is all the cart needs
+        self.session_cart = SessionCartServices(dict())
+
+    def test_cart_operations_run_no_query(self):
+        first, second, _ = self.packs
+        with self.assertNumQueries(0):
+            self.session_cart.add_pack_to_cart(first, 2)
+            self.session_cart.add_pack_to_cart(second, 1)
+            self.session_cart.add_pack_to_cart(first, 1)
+            self.session_cart.update_pack_cart_quantity(second.sku, False)
+
+        actual = self.session_cart.get_items()
+        expected = {first.sku: 3}
+        self.assertDictEqual(
+            actual,
+            expected,
+            msg=f"Session cart is `{actual}` but expected is `{expected}`"
+        )
+        with self.assertRaises(PackNotInPackCart):
+            self.session_cart.del_pack_cart_from_cart(second.sku)
+
+    def test_snapshot_in_a_single_query(self):
+        for pack in self.packs:
+            self.session_cart.add_pack_to_cart(pack, 2)
+        with self.assertNumQueries(1):
+            pack_carts, total_cost = self.session_cart.get_snapshot()
+
+        self.assertEqual(
+            len(pack_carts),
+            len(self.packs),
+            msg=f"Snapshot has {len(pack_carts)} lines but expected {len(self.packs)}"
+        )
+        self.assertEqual(
+            total_cost,
+            sum((pack_cart.total_price for pack_cart in pack_carts[1:]),
+                pack_carts[0].total_price),
+            msg="Snapshot total should be the sum of its lines"
+        )
+
+    def test_merge_into(self):
+        cart = Cart.objects.first()
+        PackCart.objects.filter(cart=cart).delete()
+        first, second, _ = self.packs
+        Cart.bll.add_pack_to_cart(cart, first, 1)
+        self.session_cart.add_pack_to_cart(first, 2)
+        self.session_cart.add_pack_to_cart(second, 3)
+
+        with self.assertNumQueries(2):
+            self.session_cart.merge_into(cart)
+
+        actual = dict(PackCart.objects.filter(cart=cart).values_list('pack_id', 'quantity'))
+        expected = {first.id: 3, second.id: 3}
+        self.assertDictEqual(
+            actual,
+            expected,
+            msg=f"Merged cart is `{actual}` but expected is `{expected}`"
+        )
+        self.assertFalse(
+            self.session_cart,
+            msg="Session cart should be empty after the merge"
+        )
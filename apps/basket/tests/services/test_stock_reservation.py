@@ -0,0 +1,160 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from painless.api.cache import get_generations
+from painless.utils.decorators import disable_logging
+
+from warehouse.repository.generator_layer import WarehouseDataGenerator
+from basket.repository.generator_layer import BasketDataGenerator
+from account.repository.generator_layer import AccountDataGenerator
+from logistic.repository.generator_layer import LogisticDataGenerator
+
+from basket.services import StockReservationServices
+from basket.helper.enums import OrderStatus
+from basket.models import Order
+from warehouse.helper.exceptions import PackOutOfStock
+from warehouse.helper.structures import AvailabilityReason
+from warehouse.models import (
+    Expense,
+    Pack,
+    StockReservation
+)
+
+
+class StockReservationServicesTest(TestCase):
+    @classmethod
+    @disable_logging
+    def setUpClass(cls) -> None:
+        super(StockReservationServicesTest, cls).setUpClass()
+
+        # Account Data Generator
+        account_dgl = AccountDataGenerator()
+        account_dgl.create_user(5)
+        account_dgl.create_profile()
+        # Warehouse Data Generator
+        warehouse_dgl = WarehouseDataGenerator()
+        brands = warehouse_dgl.create_brands(2)
+        categories = warehouse_dgl.create_categories(5)
+        colors = warehouse_dgl.create_colors(2)
+        warranties = warehouse_dgl.create_warranties(2)
+        tags = warehouse_dgl.create_tags(2)
+        products = warehouse_dgl.create_products(brands, categories, tags, 5)
+        warehouse_dgl.create_physical_info()
+        warehouse_dgl.create_packs(colors, warranties, products, 10)
+        warehouse_dgl.create_expenses()
+
+        # Logistic Data Generator
+        logistic_dgl = LogisticDataGenerator()
+        logistic_dgl.create_address(5)
+        logistic_dgl.create_logistic(total=10)
+
+        # Basket Data Generator
+        basket_dgl = BasketDataGenerator()
+        basket_dgl.create_cart()
+        basket_dgl.create_order_addresses(5)
+        basket_dgl.create_orders()
+
+    def setUp(self):
+        self.pack = Pack.objects.select_related('expense').first()
+        Expense.objects.filter(pack=self.pack).update(count_stock=5, is_suppliable=True)
+        self.first_order, self.second_order = Order.objects.order_by('id')[:2]
+        Order.objects.filter(id__in=[self.first_order.id, self.second_order.id]) \
+            .update(status=OrderStatus.Waiting)
+        self.services = StockReservationServices()
+
+    def test_holds_are_counted_in_availability(self):
+        self.services.hold_order(self.first_order, {self.pack.sku: 3})
+
+        verdicts = Pack.bll.is_available_many([self.pack.sku], [2])
+        actual = verdicts[self.pack.sku].reason
+        expected = AvailabilityReason.Available
+        self.assertEqual(
+            actual,
+            expected,
+            msg=f"Actual verdict for the 2 free packs is `{actual}` but expected is `{expected}`"
+        )
+        verdicts = Pack.bll.is_available_many([self.pack.sku], [3])
+        actual = verdicts[self.pack.sku].reason
+        expected = AvailabilityReason.OutOfStock
+        self.assertEqual(
+            actual,
+            expected,
+            msg=f"Actual verdict for 3 of the 2 free packs is `{actual}` but expected is `{expected}`"
+        )
+
+    def test_hold_more_than_free_stock(self):
+        self.services.hold_order(self.first_order, {self.pack.sku: 3})
+
+        with self.assertRaises(PackOutOfStock):
+            self.services.hold_order(self.second_order, {self.pack.sku: 3})
+
+        actual = StockReservation.objects.filter(order=self.second_order).count()
+        self.assertEqual(
+            actual,
+            0,
+            msg=f"Actual holds of the rejected order are `{actual}` but expected is `0`"
+        )
+
+        # holding again for the same order replaces its hold
+        self.services.hold_order(self.first_order, {self.pack.sku: 5})
+        actual = list(StockReservation.objects.filter(order=self.first_order)
+                      .values_list('quantity', flat=True))
+        self.assertListEqual(actual, [5])
+
+    def test_sweep_expires_then_cancels_orders(self):
+        self.services.hold_order(self.first_order, {self.pack.sku: 5})
+        StockReservation.objects.filter(order=self.first_order) \
+            .update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        # an expired hold no longer counts against the stock
+        verdicts = Pack.bll.is_available_many([self.pack.sku], [5])
+        self.assertTrue(verdicts[self.pack.sku].is_available)
+
+        actual = self.services.sweep()
+        expected = {'expiring': 1, 'cancelled': 0}
+        self.assertDictEqual(actual, expected)
+        self.first_order.refresh_from_db()
+        self.assertEqual(self.first_order.status, OrderStatus.Expiring)
+
+        StockReservation.objects.filter(order=self.first_order).update(
+            expires_at=timezone.now() - timedelta(
+                seconds=settings.STOCK_RESERVATION_CANCEL_AFTER + 1))
+        actual = self.services.sweep()
+        expected = {'expiring': 0, 'cancelled': 1}
+        self.assertDictEqual(actual, expected)
+        self.first_order.refresh_from_db()
+        self.assertEqual(self.first_order.status, OrderStatus.Cancelled)
+        self.assertFalse(StockReservation.objects.filter(order=self.first_order).exists())
+
+    def test_release_order(self):
+        self.services.hold_order(self.first_order, {self.pack.sku: 5})
+
+        self.services.release_order(self.first_order)
+
+        verdicts = Pack.bll.is_available_many([self.pack.sku], [5])
+        self.assertTrue(verdicts[self.pack.sku].is_available)
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_holds_bump_expense_generation(self):
+        generation, = get_generations(['warehouse.Expense'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.services.hold_order(self.first_order, {self.pack.sku: 2})
+        held, = get_generations(['warehouse.Expense'])
+        self.assertGreater(
+            held,
+            generation,
+            msg="A hold lowers the free stock, the cached api results must be invalidated"
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.services.release_order(self.first_order)
+        released, = get_generations(['warehouse.Expense'])
+        self.assertGreater(
+            released,
+            held,
+            msg="A release raises the free stock, the cached api results must be invalidated"
+        )
@@ -2,6 +2,7 @@ import logging
 from typing import Callable, Any, Dict
 
 from django.contrib import messages
+from django.db import transaction
 from django.views.generic import TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.utils.translation import gettext_lazy as _
@@ -12,7 +13,13 @@ from painless.utils.iranian_bank_gateway import IranianBankGateway
 from logistic.forms import AddressForm
 from logistic.models import Address
 from basket.forms import OrderAddressForm
-from basket.models import Cart, Order
+from basket.models import Order
+from basket.services import (
+    PrePaymentServices,
+    CartSnapshotServices,
+    StockReservationServices
+)
+from warehouse.helper.exceptions import PackOutOfStock
 
 
 logger = logging.getLogger(__name__)
@@ -29,6 +36,11 @@ class CheckoutView(LoginRequiredMixin, TemplateView):
             return True
         return False
 
+    def check_if_cart_is_available(self):
+        cart = self.request.user.cart
+        packs_with_quantity = CartSnapshotServices().get_packs_with_quantity(cart)
+        return PrePaymentServices().check_conditions_many(cart, packs_with_quantity)
+
     def create_or_get_address(self, order_form):
         filters = {
             "country": order_form.data.get('country'),
@@ -50,11 +62,15 @@ class CheckoutView(LoginRequiredMixin, TemplateView):
 
         context = dict()
         context['cart_packs'], context['total_cost'] = \
-            Cart.dal.get_all_pack_carts_with_total_cart_cost(cart=self.request.user.cart)
+            CartSnapshotServices().get_snapshot(self.request.user.cart)
 
         if self.check_if_cart_is_empty(context):
             return redirect(reverse('basket:cart'))
 
+        if not self.check_if_cart_is_available():
+            messages.error(self.request, _("Some items of your cart are not available anymore"))
+            return redirect(reverse('basket:cart'))
+
         if order_address_form.is_valid():
             try:
                 address = self.create_or_get_address(order_address_form)
@@ -65,12 +81,22 @@ class CheckoutView(LoginRequiredMixin, TemplateView):
 
             order_address = order_address_form.save()
 
-            # todo use transform_cart_to_order from PrePaymentService
-            order = Order.bll.add_to_order(
-                user=request.user,
-                order_address=order_address,
-                footnote=request.POST.get('footnote')
-            )
+            # the cart is emptied by the order, its packs are held afterwards
+            packs_with_quantity = CartSnapshotServices() \
+                .get_packs_with_quantity(self.request.user.cart)
+            try:
+                with transaction.atomic():
+                    # todo use transform_cart_to_order from PrePaymentService
+                    order = Order.bll.add_to_order(
+                        user=request.user,
+                        order_address=order_address,
+                        footnote=request.POST.get('footnote')
+                    )
+                    StockReservationServices().hold_order(order, packs_with_quantity)
+            except PackOutOfStock as e:
+                logger.info(f'user: `{request.user}`, action: `hold order stock`, error: `{e}`')
+                messages.error(self.request, _("Some items of your cart are not available anymore"))
+                return redirect(reverse('basket:cart'))
 
             bank = IranianBankGateway(
                 amount=order.total_cost.amount,
@@ -88,7 +114,7 @@ class CheckoutView(LoginRequiredMixin, TemplateView):
         # being loaded.
 
         context['cart_packs'], context['total_cost'] = \
-            Cart.dal.get_all_pack_carts_with_total_cart_cost(cart=self.request.user.cart)
+            CartSnapshotServices().get_snapshot(self.request.user.cart)
 
         if self.check_if_cart_is_empty(context):
             return redirect(reverse('basket:cart'))
@@ -15,6 +15,7 @@ from azbankgateways import default_settings as bank_settings
 
 from basket.helper.enums import OrderStatus
 from basket.models import Order
+from basket.services import StockReservationServices
 
 
 logger = logging.getLogger(__name__)
@@ -59,6 +60,8 @@ class CheckoutSuccessView(LoginRequiredMixin, TemplateView):
             order=order,
             bank_record=bank_record
         ) # this is where the order status and warehouse data updates
+        # paid or not, the gateway is back and the order holds no stock anymore
+        StockReservationServices().release_order(order)
 
         if bank_record.status == PaymentStatus.COMPLETE:
             context['success'] = True
@@ -1,5 +1,3 @@
-from django.core.cache import cache
-
 from rest_framework.generics import (
     ListCreateAPIView,
     RetrieveAPIView
@@ -32,16 +30,21 @@ from rest_framework.renderers import (
 )
 
 
+from painless.api.cache import ResultCacheMixin
+from painless.api.pagination import KeysetPagination
+
 from warehouse.api.serializers import ProductSerializer
+from warehouse.repository.filters.product import ProductAPIFilter
 from warehouse.models import Product
 
 
 class ProductViewSet(
+        ResultCacheMixin,
         ListModelMixin,
         RetrieveModelMixin,
         GenericViewSet):
-    # Stick to Serializer
-    queryset = Product.dal.get_available_items()
+    # Stick to Serializer, the router reads the model from `queryset`
+    queryset = Product.objects.all()
     serializer_class = ProductSerializer
     lookup_field = 'slug'
     lookup_url_kwarg = 'slug'
@@ -49,6 +52,13 @@ class ProductViewSet(
     permission_classes = (
         IsAuthenticated,
     )
+    pagination_class = KeysetPagination
+    # Result Cache
+    result_cache_models = (
+        'warehouse.Product',
+        'warehouse.Pack',
+        'warehouse.Expense'
+    )
     # Data Representation
     renderer_classes = (
         BrowsableAPIRenderer,
@@ -61,13 +71,7 @@ class ProductViewSet(
         OrderingFilter,
         DjangoFilterBackend
     ]
-    filterset_fields = [
-        'category',
-        'packs__expense__price',
-        'tags',
-        'is_active',
-        'brand'
-    ]
+    filterset_class = ProductAPIFilter
     search_fields = [
         'title',
         'brand__title',
@@ -75,27 +79,20 @@ class ProductViewSet(
     ]
     ordering_fields = [
         'title',
-        'created'
+        'created',
+        'default_pack_price',
+        'total_actual_count_stock'
     ]
+    ordering = [
+        '-total_actual_count_stock'
+    ]
+
+    def get_queryset(self):
+        # built per request, the price expression reads the current rates
+        return Product.dal.get_available_items()
 
     # Action
     @action(methods=['GET'], detail=False)
     def vouchers(self, request):
-        queryset = cache.get('product_vouchers')
-        if queryset is None:
-            queryset = self.get_queryset().get_vouchers()
-            cache.set('product_vouchers', queryset)
-
-        serializer = self.get_serializer(queryset, many=True)
-        # queryset=Product.objects.all()
-        # START PAGINATION
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(queryset, many=True)
-            return self.get_paginated_response(serializer.data)
-        # END PAGINATION
-
-        return Response(
-            serializer.data,
-            status=status.HTTP_200_OK,
-        )
+        queryset = self.filter_queryset(self.get_queryset().get_vouchers())
+        return self.cached_list(request, queryset)
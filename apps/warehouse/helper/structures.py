@@ -0,0 +1,69 @@
+from dataclasses import (
+    dataclass,
+    field
+)
+from typing import (
+    Dict,
+    Optional
+)
+
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+@dataclass(frozen=True)
+class StockLevel:
+    """Stock counters of a pack after an update."""
+    sku: str
+    count_stock: int
+    actual_count_stock: int
+
+
+@dataclass(frozen=True)
+class OutOfStockReport:
+    """Why the stock of a pack could not be updated.
+
+    `count_stock` and `actual_count_stock` are None when the pack has no
+    expense row.
+    """
+    sku: str
+    requested: int
+    count_stock: Optional[int] = None
+    actual_count_stock: Optional[int] = None
+
+
+@dataclass
+class StockUpdateResult:
+    """Outcome of `ExpenseBusinessLogicLayer.bulk_update_stock`.
+
+    Either every pack is in `levels` or nothing was updated and the failing
+    packs are in `out_of_stock`.
+    """
+    levels: Dict[str, StockLevel] = field(default_factory=dict)
+    out_of_stock: Dict[str, OutOfStockReport] = field(default_factory=dict)
+
+    @property
+    def is_successful(self) -> bool:
+        return not self.out_of_stock
+
+
+class AvailabilityReason(models.TextChoices):
+    Available = ('available', _('Available'))
+    DoesNotExist = ('does_not_exist', _('Does not exist'))
+    CategoryNotActive = ('category_not_active', _('Category not active'))
+    PackNotActive = ('pack_not_active', _('Pack not active'))
+    ProductNotActive = ('product_not_active', _('Product not active'))
+    PackNotAvailable = ('pack_not_available', _('Pack not available'))
+    OutOfStock = ('out_of_stock', _('Out of stock'))
+
+
+@dataclass(frozen=True)
+class PackAvailability:
+    """Verdict of `PackBusinessLogicLayer.is_available_many` for one pack."""
+    sku: str
+    requested: Optional[int]
+    reason: str = AvailabilityReason.Available
+
+    @property
+    def is_available(self) -> bool:
+        return self.reason == AvailabilityReason.Available
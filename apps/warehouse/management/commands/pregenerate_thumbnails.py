@@ -0,0 +1,53 @@
+import logging
+from concurrent.futures import as_completed
+
+from django.core.management.base import BaseCommand
+
+from warehouse.models import ProductGallery
+from warehouse.services.thumbnail import (
+    thumbnail_pipeline,
+    generate_thumbnails,
+    get_thumbnail_specs
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Pregenerate Thumbnails
+    Generate the configured thumbnails of the existing gallery pictures.
+    """
+    help = 'Generate the configured thumbnails of the gallery pictures.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products',
+                            type=int,
+                            nargs='*',
+                            help='Specify the ids of products, all products by default.')  # noqa
+        parser.add_argument('--sync',
+                            action='store_true',
+                            help='Generate in this process instead of the worker pool.')  # noqa
+
+    def handle(self, *args, **kwargs):
+        galleries = ProductGallery.objects.exclude(picture='')
+        if kwargs['products']:
+            galleries = galleries.filter(product_id__in=kwargs['products'])
+        names = galleries.values_list('picture', flat=True).iterator()
+
+        logger.debug('Prepare to generate thumbnails ...')
+        specs = get_thumbnail_specs()
+        total = 0
+        if kwargs['sync']:
+            for name in names:
+                total += thumbnail_pipeline.run(name, specs)
+        else:
+            executor = thumbnail_pipeline.get_executor()
+            futures = {executor.submit(generate_thumbnails, name, specs): name
+                       for name in names}
+            for future in as_completed(futures):
+                try:
+                    total += future.result()
+                except Exception as e:
+                    logger.error(f"failed to generate thumbnails of {futures[future]}: {e}")  # noqa
+            thumbnail_pipeline.shutdown(wait=True)
+        self.stdout.write(self.style.SUCCESS(f'{total} thumbnails have been generated.'))  # noqa
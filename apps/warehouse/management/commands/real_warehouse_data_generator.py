@@ -1,8 +1,13 @@
 import logging
+import os
 
 from django.core.management.base import BaseCommand
 
-from warehouse.repository.generator_layer import RealWarehouseDataGenerator
+from kernel.settings.base import BASE_DIR
+from warehouse.repository.generator_layer import (
+    RealWarehouseDataGenerator,
+    RealWarehouseDataLoader
+)
 
 RDGL = RealWarehouseDataGenerator()
 logger = logging.getLogger(__name__)
@@ -31,6 +36,24 @@ class Command(BaseCommand):
                             type=int,
                             default=4,
                             help='Specify the maximum number of packs per product to generate.')  # noqa
+        parser.add_argument('--bulk',
+                            action='store_true',
+                            help='Load in bulk with parallel sheet parsing and a resumable checkpoint.')  # noqa
+        parser.add_argument('--workers',
+                            type=int,
+                            default=None,
+                            help='Specify the number of processes parsing sheets, CPU count by default.')  # noqa
+        parser.add_argument('--checkpoint',
+                            type=str,
+                            default=os.path.join(BASE_DIR, '.real_warehouse_data_generator.json'),
+                            help='Specify the checkpoint file of the bulk load.')  # noqa
+        parser.add_argument('--seed',
+                            type=int,
+                            default=0,
+                            help='Specify the seed of the random choices of the bulk load.')  # noqa
+        parser.add_argument('--restart',
+                            action='store_true',
+                            help='Ignore the checkpoint and load from the beginning.')  # noqa
 
     def handle(self, *args, **kwargs):
         total_colors = kwargs['total_colors']
@@ -40,6 +63,17 @@ class Command(BaseCommand):
 
         logger.debug('Prepare to generate fake data  ...')
 
+        if kwargs['bulk']:
+            loader = RealWarehouseDataLoader(kwargs['checkpoint'],
+                                             workers=kwargs['workers'],
+                                             seed=kwargs['seed'])
+            if kwargs['restart']:
+                loader.checkpoint.clear()
+            total_products = loader.load(total_colors, total_warranties, total_tags, total_packs)
+            loader.checkpoint.clear()
+            self.stdout.write(self.style.SUCCESS(f'{total_products} products have been loaded in bulk.'))  # noqa
+            return
+
         brands = RDGL.create_brands()
         self.stdout.write(self.style.SUCCESS(f'{len(brands)} brands have been generated by machine.'))  # noqa
 
@@ -0,0 +1,32 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from warehouse.models import ProductListing
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Refresh Product Listing
+    Recompute the `ProductListing` read model.
+    """
+    help = 'Recompute the product listing read model.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products',
+                            type=int,
+                            nargs='*',
+                            help='Specify the ids of products to refresh, all products by default.')  # noqa
+        parser.add_argument('--batch-size',
+                            type=int,
+                            default=500,
+                            help='Specify the number of products to refresh per query.')  # noqa
+
+    def handle(self, *args, **kwargs):
+        product_ids = kwargs['products'] or None
+        batch_size = kwargs['batch_size']
+
+        logger.debug('Prepare to refresh product listing ...')
+        total = ProductListing.bll.refresh(product_ids, batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f'{total} product listing rows have been refreshed.'))  # noqa
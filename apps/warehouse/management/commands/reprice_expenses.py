@@ -0,0 +1,38 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from warehouse.models import ExpensePrice
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Reprice Expenses
+    Convert the expense prices to the base currency with the current rates.
+    """
+    help = 'Convert the expense prices to the base currency.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--expenses',
+                            type=int,
+                            nargs='*',
+                            help='Specify the ids of expenses to reprice, all expenses by default.')  # noqa
+        parser.add_argument('--pending',
+                            action='store_true',
+                            help='Reprice only if an exchange rate change is pending, run it periodically.')  # noqa
+        parser.add_argument('--batch-size',
+                            type=int,
+                            default=1000,
+                            help='Specify the number of expenses to reprice per query.')  # noqa
+
+    def handle(self, *args, **kwargs):
+        expense_ids = kwargs['expenses'] or None
+        batch_size = kwargs['batch_size']
+
+        logger.debug('Prepare to reprice expenses ...')
+        if kwargs['pending']:
+            total = ExpensePrice.bll.reprice_pending(batch_size=batch_size)
+        else:
+            total = ExpensePrice.bll.reprice(expense_ids, batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f'{total} expenses have been repriced.'))  # noqa
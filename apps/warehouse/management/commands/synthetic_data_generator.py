@@ -0,0 +1,104 @@
+import logging
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from warehouse.models import (
+    ExpensePrice,
+    ProductListing
+)
+from warehouse.repository.generator_layer import SyntheticDataGenerator
+from warehouse.services.category_tree import bump_category_tree_version
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Synthetic Data Generator
+    Stream a catalog of the given size into the database with COPY, then
+    build the read models COPY does not maintain.
+    """
+    help = 'Generate a synthetic catalog of the given size for load tests.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--brands',
+                            type=int,
+                            default=1000,
+                            help='Specify the number of brands to generate.')
+        parser.add_argument('--categories',
+                            type=int,
+                            default=5000,
+                            help='Specify the number of categories to generate.')
+        parser.add_argument('--products',
+                            type=int,
+                            default=1000000,
+                            help='Specify the number of products to generate.')
+        parser.add_argument('--packs',
+                            type=int,
+                            default=5000000,
+                            help='Specify the number of packs to generate, at least one per product.')  # noqa
+        parser.add_argument('--pack-orders',
+                            type=int,
+                            default=0,
+                            help='Specify the number of pack orders to generate, e.g. 20000000.')  # noqa
+        parser.add_argument('--seed',
+                            type=int,
+                            default=0,
+                            help='Specify the seed, the same seed gives the same data.')
+        parser.add_argument('--skew',
+                            type=float,
+                            default=1.1,
+                            help='Specify the Zipf exponent of popularity.')
+        parser.add_argument('--chunk-size',
+                            type=int,
+                            default=50000,
+                            help='Specify the number of rows per COPY statement.')
+
+    def handle(self, *args, **kwargs):
+        generator = SyntheticDataGenerator(seed=kwargs['seed'],
+                                           skew=kwargs['skew'],
+                                           chunk_size=kwargs['chunk_size'])
+
+        logger.debug('Prepare to generate synthetic data ...')
+        with transaction.atomic():
+            brands = generator.create_brands(kwargs['brands'])
+            self.stdout.write(self.style.SUCCESS(f'{brands[1]} brands have been copied.'))  # noqa
+
+            categories = generator.create_categories(kwargs['categories'])
+            # COPY sends no signal, running processes reload the tree on commit
+            bump_category_tree_version()
+            self.stdout.write(self.style.SUCCESS(f'{categories[1]} categories have been copied.'))  # noqa
+
+            products = generator.create_products(kwargs['products'], brands, categories)
+            self.stdout.write(self.style.SUCCESS(f'{products[1]} products have been copied.'))  # noqa
+
+            packs = generator.create_packs(kwargs['packs'], products)
+            self.stdout.write(self.style.SUCCESS(f'{packs[1]} packs have been copied.'))  # noqa
+
+            expenses = generator.create_expenses(packs)
+            self.stdout.write(self.style.SUCCESS(f'{expenses[1]} expenses have been copied.'))  # noqa
+
+            if kwargs['pack_orders']:
+                pack_orders = generator.create_orders(kwargs['pack_orders'], packs)
+                self.stdout.write(self.style.SUCCESS(f'{pack_orders[1]} pack orders have been copied.'))  # noqa
+
+        generator.analyze([
+            apps.get_model('warehouse', model_name)
+            for model_name in ('Brand', 'Category', 'Product', 'Pack', 'Expense')
+        ] + [
+            apps.get_model('basket', model_name)
+            for model_name in ('Order', 'PackOrder')
+        ])
+
+        # COPY sends no signals, the read models are built once all rows exist
+        repriced = ExpensePrice.bll.reprice(refresh_listing=False)
+        self.stdout.write(self.style.SUCCESS(f'{repriced} expenses have been repriced.'))  # noqa
+
+        listings = ProductListing.bll.refresh()
+        self.stdout.write(self.style.SUCCESS(f'{listings} product listing rows have been refreshed.'))  # noqa
+
+        if kwargs['pack_orders']:
+            facts = apps.get_model('basket', 'SalesFact').bll.backfill()
+            self.stdout.write(self.style.SUCCESS(f'{facts} sales facts have been built.'))  # noqa
+        logger.debug('Synthetic data generation finished.')
@@ -2,11 +2,15 @@ from .attribute import Attribute
 from .brand import Brand
 from .category import Category
 from .color import Color
+from .exchange_rate import ExchangeRate
 from .expense import Expense
+from .expense_price import ExpensePrice
 from .pack import Pack
 from .physical_info import PhysicalInformation
 from .product import Product
 from .product import ProductShowCase
 from .product_gallery import ProductGallery
+from .product_listing import ProductListing
+from .stock_reservation import StockReservation
 from .tag import Tag
 from .warranty import Warranty
@@ -0,0 +1,67 @@
+from django.db import models
+from django.conf import settings
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from django.core.validators import MaxLengthValidator
+
+from painless.models import (
+    TimeStampMixin,
+    TruncateMixin,
+)
+
+CURRENCY_CHOICES = [(currency, currency) for currency in settings.CURRENCIES]
+
+
+class ExchangeRate(TimeStampMixin,
+                   TruncateMixin):
+    """Exchange rate
+    How many `quote_currency` one `base_currency` is worth from
+    `effective_date` on. The latest effective rate of each pair is used by
+    `CurrencyRateProvider`.
+    """
+    base_currency = models.CharField(
+        _("base currency"),
+        max_length=3,
+        validators=[MaxLengthValidator(3)],
+        choices=CURRENCY_CHOICES,
+        help_text=_("The currency being converted"),
+    )
+    quote_currency = models.CharField(
+        _("quote currency"),
+        max_length=3,
+        validators=[MaxLengthValidator(3)],
+        choices=CURRENCY_CHOICES,
+        help_text=_("The currency converted to"),
+    )
+    rate = models.DecimalField(
+        _("rate"),
+        max_digits=24,
+        decimal_places=10,
+        help_text=_("Amount of quote currency per one base currency"),
+    )
+    effective_date = models.DateTimeField(
+        _("effective date"),
+        default=timezone.now,
+        help_text=_("The rate is used from this time on"),
+    )
+
+    objects = models.Manager()
+
+    class Meta:
+        verbose_name = _("Exchange Rate")
+        verbose_name_plural = _("Exchange Rates")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["base_currency", "quote_currency", "effective_date"],
+                name="unique_exchange_rate_per_date"),
+        ]
+        indexes = [
+            models.Index(fields=["base_currency", "quote_currency", "-effective_date"],
+                         name="exchange_rate_pair_date_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.base_currency}/{self.quote_currency}"
+
+    def __repr__(self):
+        return f"{self.base_currency}/{self.quote_currency}"
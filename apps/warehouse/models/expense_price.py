@@ -0,0 +1,65 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from apps.warehouse.repository.business_logic.manager import \
+    ExpensePriceBusinessLogicLayer
+
+
+class ExpensePrice(models.Model):
+    """Expense price
+    Prices of an expense converted to `BASE_CURRENCY`, so price range
+    filters and price ordering can use a B-tree index instead of a `Case`
+    over the three currencies. Rows are recomputed when the expense changes
+    and by a batched re-pricing job when exchange rates change.
+    """
+    price_in_base_currency = models.DecimalField(
+        _("price in base currency"),
+        max_digits=24,
+        decimal_places=2,
+        help_text=_("Price of the expense converted to the base currency"),
+    )
+    buy_price_in_base_currency = models.DecimalField(
+        _("buy price in base currency"),
+        max_digits=24,
+        decimal_places=2,
+        help_text=_("Buy price of the expense converted to the base currency"),
+    )
+    rate_version = models.PositiveIntegerField(
+        _("rate version"),
+        help_text=_("Version of the exchange rates used to convert the prices"),
+    )
+    refreshed = models.DateTimeField(
+        _("refreshed"),
+        auto_now=True,
+        help_text=_("Last time the prices were converted"),
+    )
+    # ############################### #
+    #                 Fks             #
+    # ############################### #
+    expense = models.OneToOneField(
+        "Expense",
+        verbose_name=_("expense"),
+        related_name="normalized_price",
+        primary_key=True,
+        on_delete=models.CASCADE,
+        help_text=_("Access to the related expense of a normalized price"),
+    )
+
+    bll = ExpensePriceBusinessLogicLayer()
+    objects = models.Manager()
+
+    class Meta:
+        verbose_name = _("Expense Price")
+        verbose_name_plural = _("Expense Prices")
+        indexes = [
+            models.Index(fields=["price_in_base_currency"],
+                         name="expense_price_base_idx"),
+            models.Index(fields=["buy_price_in_base_currency"],
+                         name="expense_buy_price_base_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.expense_id}"
+
+    def __repr__(self):
+        return f"{self.expense_id}"
@@ -4,6 +4,7 @@ from django.utils.text import slugify
 
 from apps.warehouse.repository.manager import \
     ProductDataAccessLayerManager
+from warehouse.services.image_manifest import ImageManifestDescriptor
 from painless.models import (
     SKUMixin,
     TitleSlugDescriptionMixin,
@@ -66,6 +67,8 @@ class Product(SKUMixin,
         help_text=_("Access to the related tag(s) of a product"),
     )
 
+    image_manifest = ImageManifestDescriptor()
+
     dal = ProductDataAccessLayerManager()
     objects = models.Manager()
 
@@ -43,8 +43,8 @@ class ProductGallery(UploadSorlThumbnailPictureMixin,
         category_dir_path
     UploadSorlThumbnailPictureMixin._meta.get_field("picture").validators.extend(
         [
-            DimensionValidator(800, 960),
-            ImageSizeValidator(UnitConvertor.convert_megabyte_to_byte(MegaByte(1)))]
+            ImageSizeValidator(UnitConvertor.convert_megabyte_to_byte(MegaByte(1))),
+            DimensionValidator(800, 960)]
     )
 
     dal = ProductGalleryDataAccessLayerManager()
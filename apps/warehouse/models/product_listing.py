@@ -0,0 +1,117 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from apps.warehouse.repository.business_logic.manager import \
+    ProductListingBusinessLogicLayer
+
+
+class ProductListing(models.Model):
+    """Product listing
+    A denormalized read model holding one row per product with everything
+    `ProductQuerySet.get_available_items` used to compute on every request.
+    Rows are refreshed incrementally whenever a `Product`, `Pack`, `Expense`,
+    `ProductGallery` or `Category` changes.
+
+    PARAMS:
+    ----
+    `default_pack_price`: price of the default pack converted to Rial.
+    `total_actual_count_stock`: actual stock summed over the active packs.
+    `count_stock`: stock summed over the active packs.
+    `is_listable`: whether the product can be shown on the listing pages.
+    """
+    default_pack_sku = models.CharField(
+        _("default pack sku"),
+        max_length=255,
+        null=True,
+        help_text=_("SKU of the default pack of the product"),
+    )
+    default_pack_price = models.DecimalField(
+        _("default pack price"),
+        max_digits=20,
+        decimal_places=2,
+        null=True,
+        help_text=_("Price of the default pack converted to Rial"),
+    )
+    default_pack_price_currency = models.CharField(
+        _("default pack price currency"),
+        max_length=3,
+        null=True,
+        help_text=_("Original currency of the default pack price"),
+    )
+    first_pic = models.CharField(
+        _("first picture"),
+        max_length=255,
+        null=True,
+        help_text=_("Path of the `first` gallery picture"),
+    )
+    second_pic = models.CharField(
+        _("second picture"),
+        max_length=255,
+        null=True,
+        help_text=_("Path of the `second` gallery picture"),
+    )
+    default_pic = models.CharField(
+        _("default picture"),
+        max_length=255,
+        null=True,
+        help_text=_("Path of the default gallery picture"),
+    )
+    total_actual_count_stock = models.PositiveIntegerField(
+        _("total actual count stock"),
+        default=0,
+        help_text=_("Actual stock of all active packs of the product"),
+    )
+    count_stock = models.PositiveIntegerField(
+        _("count stock"),
+        default=0,
+        help_text=_("Stock of all active packs of the product"),
+    )
+    total_active_packs = models.PositiveIntegerField(
+        _("total active packs"),
+        default=0,
+        help_text=_("Number of active packs of the product"),
+    )
+    # ############################### #
+    #            BooleanField         #
+    # ############################### #
+    is_listable = models.BooleanField(
+        _("is listable"),
+        default=False,
+        db_index=True,
+        help_text=_("Whether the product is shown on the listing pages"),
+    )
+    refreshed = models.DateTimeField(
+        _("refreshed"),
+        auto_now=True,
+        help_text=_("Last time this row was recomputed"),
+    )
+    # ############################### #
+    #                 Fks             #
+    # ############################### #
+    product = models.OneToOneField(
+        "Product",
+        verbose_name=_("product"),
+        related_name="listing",
+        primary_key=True,
+        on_delete=models.CASCADE,
+        help_text=_("Access to the related product of a listing"),
+    )
+
+    bll = ProductListingBusinessLogicLayer()
+    objects = models.Manager()
+
+    class Meta:
+        verbose_name = _("Product Listing")
+        verbose_name_plural = _("Product Listings")
+        indexes = [
+            models.Index(fields=["is_listable", "-total_actual_count_stock"],
+                         name="listing_listable_stock_idx"),
+            models.Index(fields=["is_listable", "default_pack_price"],
+                         name="listing_listable_price_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id}"
+
+    def __repr__(self):
+        return f"{self.product_id}"
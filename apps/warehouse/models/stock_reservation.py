@@ -0,0 +1,62 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from apps.warehouse.repository.business_logic.manager import \
+    StockReservationBusinessLogicLayer
+
+
+class StockReservation(models.Model):
+    """Stock reservation
+    Stock of a pack held for an unpaid order while the customer is on the
+    bank gateway. Holds count against the stock in availability checks
+    until `expires_at`; they are released when the payment returns and
+    expired ones are swept by `sweep_stock_reservations`.
+    """
+    quantity = models.PositiveIntegerField(
+        _("quantity"),
+        help_text=_("Number of packs held"),
+    )
+    expires_at = models.DateTimeField(
+        _("expires at"),
+        help_text=_("Time the hold stops counting against the stock"),
+    )
+    # ############################### #
+    #                 Fks             #
+    # ############################### #
+    pack = models.ForeignKey(
+        "Pack",
+        verbose_name=_("pack"),
+        related_name="reservations",
+        on_delete=models.CASCADE,
+        help_text=_("Access to the related pack of a reservation"),
+    )
+    order = models.ForeignKey(
+        "basket.Order",
+        verbose_name=_("order"),
+        related_name="reservations",
+        on_delete=models.CASCADE,
+        help_text=_("Access to the related order of a reservation"),
+    )
+
+    bll = StockReservationBusinessLogicLayer()
+    objects = models.Manager()
+
+    class Meta:
+        verbose_name = _("Stock Reservation")
+        verbose_name_plural = _("Stock Reservations")
+        constraints = [
+            models.UniqueConstraint(fields=["order", "pack"],
+                                    name="stock_reservation_unique_pack"),
+        ]
+        indexes = [
+            models.Index(fields=["pack", "expires_at"],
+                         name="reservation_pack_expires_idx"),
+            models.Index(fields=["expires_at"],
+                         name="reservation_expires_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.order_id} {self.pack_id}"
+
+    def __repr__(self):
+        return f"{self.order_id} {self.pack_id}"
@@ -1,4 +1,7 @@
 from .warehouse import (ExpenseBusinessLogicLayer,
+                        ExpensePriceBusinessLogicLayer,
                         PackBusinessLogicLayer,
                         BrandBusinessLogicLayer,
-                        ProductBusinessLogicLayer)
+                        ProductBusinessLogicLayer,
+                        ProductListingBusinessLogicLayer,
+                        StockReservationBusinessLogicLayer)
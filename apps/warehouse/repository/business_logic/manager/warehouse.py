@@ -1,9 +1,36 @@
 import logging
+import operator
+import threading
+from datetime import timedelta
+from functools import reduce
+from typing import (
+    Dict,
+    Iterable,
+    Optional
+)
+
+from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
 
 from django.apps import apps
-from django.db.models import F
+from django.utils import timezone
+from django.db.models import (
+    F,
+    Q,
+    Sum,
+    Case,
+    When,
+    Value,
+    Count,
+    Exists,
+    Subquery,
+    OuterRef,
+    IntegerField,
+    DecimalField
+)
 from django.db.models import Manager
+from django.db.models.functions import Coalesce
 from warehouse.helper.exceptions import (
     CategoryNotActive,
     ProductNotActive,
@@ -15,6 +42,19 @@ from warehouse.helper.exceptions import (
     PackNotActive,
     UnexpectedBehavior
 )
+from warehouse.services.category_tree import (
+    get_category_tree,
+    bump_category_tree_version
+)
+from warehouse.services.image_manifest import load_image_manifests
+from painless.api.cache import bump_generation
+from warehouse.helper.structures import (
+    StockLevel,
+    OutOfStockReport,
+    StockUpdateResult,
+    AvailabilityReason,
+    PackAvailability
+)
 
 logger = logging.getLogger(__name__)
 
@@ -68,7 +108,13 @@ class ExpenseBusinessLogicLayer(Manager):
                     f"Unexpected behavior from {self.__class__.__name__}"
                     )
 
-            return self.get(pack__sku=pack_sku).count_stock
+            expense = self.select_related('pack').get(pack__sku=pack_sku)
+            # `update` sends no signal, the listing and the cached api
+            # results are refreshed here
+            ProductListing = apps.get_model('warehouse', 'ProductListing')
+            ProductListing.bll.schedule_refresh([expense.pack.product_id])
+            bump_generation('warehouse.Expense')
+            return expense.count_stock
 
     def update_actual_count_stock(self,
                                   pack_sku,
@@ -118,7 +164,209 @@ class ExpenseBusinessLogicLayer(Manager):
                     f"Unexpected behavior from {self.__class__.__name__}"
                     )
 
-            return self.get(pack__sku=pack_sku).actual_count_stock
+            expense = self.select_related('pack').get(pack__sku=pack_sku)
+            # `update` sends no signal, the listing and the cached api
+            # results are refreshed here
+            ProductListing = apps.get_model('warehouse', 'ProductListing')
+            ProductListing.bll.schedule_refresh([expense.pack.product_id])
+            bump_generation('warehouse.Expense')
+            return expense.actual_count_stock
+
+    def bulk_update_stock(self,
+                          skus_with_quantity: Dict[str, int],
+                          increase: bool = False) -> StockUpdateResult:
+        """
+        update both `count_stock` and `actual_count_stock` of many packs by
+        the given quantities at once.
+
+        DESC
+        _____
+        1. lock the expense rows of all given packs, ordered by pack sku so
+           concurrent calls on overlapping packs always lock in the same order.
+        2. when decreasing, check every pack has enough of both stocks. if any
+           doesn't, nothing is updated and the result holds an out of stock
+           report per failing pack.
+        3. apply both counters to all packs with a single conditional UPDATE.
+        returns the new stock levels per pack sku.
+        """
+        if any(quantity < 0 for quantity in skus_with_quantity.values()):
+            raise ValueError('quantities should be greater than or equal 0 '
+                             f'however {skus_with_quantity} was given')
+
+        result = StockUpdateResult()
+        if not skus_with_quantity:
+            return result
+
+        with transaction.atomic():
+            rows = list(
+                self.select_for_update(of=('self',))
+                .filter(pack__sku__in=skus_with_quantity.keys())
+                .order_by('pack__sku')
+                .values_list('id', 'pack__sku', 'count_stock', 'actual_count_stock')
+            )
+
+            found_skus = {sku for _, sku, _, _ in rows}
+            for sku in skus_with_quantity.keys() - found_skus:
+                result.out_of_stock[sku] = OutOfStockReport(
+                    sku=sku, requested=skus_with_quantity[sku])
+
+            sign = 1 if increase else -1
+            for _, sku, count_stock, actual_count_stock in rows:
+                quantity = skus_with_quantity[sku]
+                new_count_stock = count_stock + sign * quantity
+                new_actual_count_stock = actual_count_stock + sign * quantity
+                if new_count_stock < 0 or new_actual_count_stock < 0:
+                    result.out_of_stock[sku] = OutOfStockReport(
+                        sku=sku,
+                        requested=quantity,
+                        count_stock=count_stock,
+                        actual_count_stock=actual_count_stock,
+                    )
+                else:
+                    result.levels[sku] = StockLevel(
+                        sku=sku,
+                        count_stock=new_count_stock,
+                        actual_count_stock=new_actual_count_stock,
+                    )
+
+            if result.out_of_stock:
+                logger.warning(f"Insufficient stock for packs "
+                               f"{sorted(result.out_of_stock)}")
+                result.levels.clear()
+                return result
+
+            delta = Case(
+                *[When(id=expense_id, then=Value(skus_with_quantity[sku]))
+                  for expense_id, sku, _, _ in rows],
+                output_field=IntegerField(),
+            )
+            if increase:
+                condition = Q(id__in=[expense_id for expense_id, _, _, _ in rows])
+                updated = self.filter(condition).update(
+                    count_stock=F('count_stock') + delta,
+                    actual_count_stock=F('actual_count_stock') + delta,
+                )
+            else:
+                condition = reduce(operator.or_, [
+                    Q(id=expense_id,
+                      count_stock__gte=skus_with_quantity[sku],
+                      actual_count_stock__gte=skus_with_quantity[sku])
+                    for expense_id, sku, _, _ in rows
+                ])
+                updated = self.filter(condition).update(
+                    count_stock=F('count_stock') - delta,
+                    actual_count_stock=F('actual_count_stock') - delta,
+                )
+
+            if updated != len(rows):
+                logger.error(
+                    f"Unexpected behavior from {self.__class__.__name__}"
+                    f" in bulk_update_stock method"
+                    )
+                raise UnexpectedBehavior(
+                    f"Unexpected behavior from {self.__class__.__name__}"
+                    )
+            logger.info(f"the stock of {len(rows)} packs is "
+                        f"{'increased' if increase else 'decreased'}")
+            ProductListing = apps.get_model('warehouse', 'ProductListing')
+            ProductListing.bll.schedule_refresh(
+                self.filter(id__in=[expense_id for expense_id, _, _, _ in rows])
+                .values_list('pack__product_id', flat=True))
+            bump_generation('warehouse.Expense')
+        return result
+
+
+class ExpensePriceBusinessLogicLayer(Manager):
+    """
+    handles functions affecting ExpensePrice model, such as converting the
+    expense prices to the base currency.
+    """
+    REPRICE_PENDING_KEY = 'warehouse:expense-price:reprice-pending'
+
+    def reprice(self, expense_ids=None, batch_size=1000, refresh_listing=True) -> int:
+        """
+        converts the prices of the given expenses, all expenses if
+        `expense_ids` is None, to `BASE_CURRENCY` in batches walked by id,
+        then refreshes the listing rows of their products unless
+        `refresh_listing` is False, e.g. when the caller refreshes them all.
+        returns the number of repriced expenses.
+        """
+        from warehouse.services.currency import rate_provider
+
+        Expense = apps.get_model('warehouse', 'Expense')
+        ProductListing = apps.get_model('warehouse', 'ProductListing')
+        base_currency = settings.BASE_CURRENCY
+        output_field = DecimalField(max_digits=24, decimal_places=2)
+        version = rate_provider.get_matrix().version
+        expenses = Expense.objects.annotate(
+            price_in_base_currency=rate_provider.get_case(
+                base_currency, field='price', output_field=output_field),
+            buy_price_in_base_currency=rate_provider.get_case(
+                base_currency, field='buy_price', output_field=output_field),
+        )
+        if expense_ids is not None:
+            expenses = expenses.filter(id__in=list(expense_ids))
+
+        total = 0
+        last_id = 0
+        while True:
+            rows = list(expenses.filter(id__gt=last_id)
+                        .order_by('id')
+                        .values_list('id',
+                                     'price_in_base_currency',
+                                     'buy_price_in_base_currency')[:batch_size])
+            if not rows:
+                break
+            self.bulk_create(
+                [self.model(expense_id=expense_id,
+                            price_in_base_currency=price,
+                            buy_price_in_base_currency=buy_price,
+                            rate_version=version)
+                 for expense_id, price, buy_price in rows],
+                update_conflicts=True,
+                unique_fields=['expense'],
+                update_fields=['price_in_base_currency',
+                               'buy_price_in_base_currency',
+                               'rate_version',
+                               'refreshed'],
+            )
+            # the listing reads `price_in_base_currency`, refresh it after
+            if refresh_listing:
+                ProductListing.bll.schedule_refresh(
+                    Expense.objects.filter(id__in=[expense_id for expense_id, _, _ in rows])
+                    .values_list('pack__product_id', flat=True))
+            total += len(rows)
+            last_id = rows[-1][0]
+        logger.info(f"{total} expenses are repriced to {base_currency}")
+        return total
+
+    def schedule_reprice(self) -> None:
+        """
+        marks all expenses to be repriced once the current transaction
+        commits, the committing request only writes the marker.
+        `reprice_pending`, run by `reprice_expenses --pending`, reprices
+        them in batches in the background. until then the prices are read
+        with the live conversion, see `get_rial_price_expression`.
+        """
+        from warehouse.services.currency import rate_provider
+
+        transaction.on_commit(lambda: cache.set(self.REPRICE_PENDING_KEY,
+                                                rate_provider.get_version(),
+                                                timeout=None))
+
+    def reprice_pending(self, batch_size=1000) -> int:
+        """
+        reprices all expenses if `schedule_reprice` marked them, returns
+        the number of repriced expenses. a mark set while repricing is
+        kept, so the next run picks up the newer rates.
+        """
+        pending = cache.get(self.REPRICE_PENDING_KEY)
+        if pending is None:
+            return 0
+        total = self.reprice(batch_size=batch_size)
+        if cache.get(self.REPRICE_PENDING_KEY) == pending:
+            cache.delete(self.REPRICE_PENDING_KEY)
+        return total
 
 
 class PackBusinessLogicLayer(Manager):
@@ -132,19 +380,20 @@ class PackBusinessLogicLayer(Manager):
     ) -> bool:
         """
         Checks if:
-            1- parent category of pack and all their parents are active.
+            1- category of pack and all its ancestors are active, read from
+               the per process category tree snapshot.
             2- the product pack belongs to is active.
             3- the brand the pack's product belongs to is active. (Not Implemented)
         if any of these conditions are not met, an exception is raised.
         returns the pack if conditions are met.
         """
-        pack = self.get(sku=pack_sku)
-        categories = pack.product.category.get_family()
-        for category in categories:
+        pack = self.select_related('product').get(sku=pack_sku)
+        category_id = pack.product.category_id
+        if category_id is None or \
+                not get_category_tree().is_all_ancestors_active(category_id):
             try:
-                if not category.is_active:
-                    raise CategoryNotActive(f'Given pack with sku: {pack.sku} '
-                                            f'cannot be added to the cart')
+                raise CategoryNotActive(f'Given pack with sku: {pack.sku} '
+                                        f'cannot be added to the cart')
             except CategoryNotActive as e:
                 logger.error(e)
                 raise CategoryNotActive(f'Given pack with sku: {pack.sku} '
@@ -177,21 +426,97 @@ class PackBusinessLogicLayer(Manager):
         Checks if:
             1- pack either not out of stock or is suppliable.
             2- pack stock is higher than given quantity.
+        stock held by unexpired `StockReservation`s is not counted.
         if any of these conditions are not met, an exception is raised.
         returns the pack if conditions are met.
         """
+        StockReservation = apps.get_model('warehouse', 'StockReservation')
         pack = self.get(sku=pack_sku)
-        if not pack.expense.count_stock > 0 :
+        free_stock = pack.expense.count_stock - \
+            StockReservation.bll.get_held_quantities([pack.id]).get(pack.id, 0)
+        if not free_stock > 0 :
             raise PackNotAvailable(f"Insufficient stock for pack {pack.sku}")
         elif not pack.expense.is_suppliable:
             raise PackNotAvailable(f"Insufficient stock for pack {pack.sku}")
         elif not pack.is_active:
             raise PackNotAvailable(f"Insufficient stock for pack {pack.sku}")
-        elif not pack.expense.count_stock >= quantity:
+        elif not free_stock >= quantity:
             raise OutOfStock(f"Insufficient stock for pack {pack.sku}")
         else:
             return True
 
+    def is_available_many(
+            self,
+            skus: Iterable[str],
+            quantities: Optional[Iterable[int]] = None,
+    ) -> Dict[str, PackAvailability]:
+        """
+        Checks the conditions of `is_available` and, when quantities are given,
+        of `is_pack_in_stock` for many packs with a single query.
+
+        DESC
+        _____
+        Inactive ancestor categories are found with an EXISTS over the MPTT
+        `tree_id`/`lft`/`rght` range of each pack's category instead of
+        walking the tree per pack. stock held by unexpired `StockReservation`s
+        is subtracted in the same query.
+        returns a verdict per pack sku, nothing is raised.
+        """
+        skus = list(skus)
+        quantities = [None] * len(skus) if quantities is None else list(quantities)
+        if len(skus) != len(quantities):
+            raise ValueError(f'{len(skus)} skus were given with '
+                             f'{len(quantities)} quantities')
+
+        Category = apps.get_model('warehouse', 'Category')
+        StockReservation = apps.get_model('warehouse', 'StockReservation')
+        inactive_ancestors = Category.objects.filter(
+            tree_id=OuterRef('product__category__tree_id'),
+            lft__lte=OuterRef('product__category__lft'),
+            rght__gte=OuterRef('product__category__rght'),
+            is_active=False,
+        )
+        packs = {
+            pack['sku']: pack
+            for pack in self.filter(sku__in=skus)
+            .annotate(has_inactive_category=Exists(inactive_ancestors),
+                      held_stock=StockReservation.bll.get_held_subquery())
+            .values('sku',
+                    'is_active',
+                    'product__is_active',
+                    'expense__count_stock',
+                    'expense__is_suppliable',
+                    'has_inactive_category',
+                    'held_stock')
+        }
+
+        verdicts = dict()
+        for sku, quantity in zip(skus, quantities):
+            pack = packs.get(sku)
+            if pack is not None:
+                free_stock = (pack['expense__count_stock'] or 0) - pack['held_stock']
+            if pack is None:
+                reason = AvailabilityReason.DoesNotExist
+            elif pack['has_inactive_category']:
+                reason = AvailabilityReason.CategoryNotActive
+            elif not pack['is_active']:
+                reason = AvailabilityReason.PackNotActive
+            elif not pack['product__is_active']:
+                reason = AvailabilityReason.ProductNotActive
+            elif quantity is None:
+                reason = AvailabilityReason.Available
+            elif not free_stock > 0 \
+                    or not pack['expense__is_suppliable']:
+                reason = AvailabilityReason.PackNotAvailable
+            elif not free_stock >= quantity:
+                reason = AvailabilityReason.OutOfStock
+            else:
+                reason = AvailabilityReason.Available
+            verdicts[sku] = PackAvailability(sku=sku,
+                                             requested=quantity,
+                                             reason=reason)
+        return verdicts
+
     def is_actual_count_stock_gte_stock(self,
                                         pack_sku,
                                         ) -> 'Pack':
@@ -227,6 +552,7 @@ class PackBusinessLogicLayer(Manager):
         for category in categories:
             if not category.is_active:
                 Category.objects.filter(id=category.id).update(is_active=True)
+        bump_category_tree_version()
         return pack
 
 
@@ -249,6 +575,10 @@ class BrandBusinessLogicLayer(Manager):
                 .filter(brand=brand)\
                 .update(is_active=is_active)
             logger.info(f" all products are activated by given brand `{brand.title}`")
+            ProductListing = apps.get_model('warehouse', 'ProductListing')
+            ProductListing.bll.schedule_refresh(
+                Product.objects.filter(brand=brand).values_list('id', flat=True))
+            bump_generation('warehouse.Product')
 
 
 class ProductBusinessLogicLayer(Manager):
@@ -270,3 +600,272 @@ class ProductBusinessLogicLayer(Manager):
                 .filter(product=product)\
                 .update(is_active=is_active)
             logger.info(f" all packs are activated by given product `{product.title}`")
+            ProductListing = apps.get_model('warehouse', 'ProductListing')
+            ProductListing.bll.schedule_refresh([product.id])
+            bump_generation('warehouse.Pack')
+
+
+class ProductListingBusinessLogicLayer(Manager):
+    """
+    handles functions affecting ProductListing model, such as recomputing
+    the listing rows of changed products.
+    """
+    _pending = threading.local()
+
+    def get_listing_values(self, product_ids):
+        """
+        computes the values of the listing rows of the given products,
+        except the pictures which are read by `load_image_manifests`.
+        """
+        from warehouse.repository.queryset.product import \
+            get_rial_price_expression
+
+        Product = apps.get_model('warehouse', 'Product')
+        Pack = apps.get_model('warehouse', 'Pack')
+        active_packs = Q(packs__is_active=True)
+        default_pack = Pack.objects.filter(product_id=OuterRef('pk'),
+                                           is_default=True)
+        return Product.objects.filter(id__in=product_ids).annotate(
+            total_actual_count_stock=Coalesce(
+                Sum('packs__expense__actual_count_stock', filter=active_packs), 0),
+            count_stock=Coalesce(
+                Sum('packs__expense__count_stock', filter=active_packs), 0),
+            total_active_packs=Count('packs', filter=active_packs),
+            default_pack_sku=Subquery(default_pack.values('sku')[:1]),
+            default_pack_price=Subquery(
+                default_pack.annotate(
+                    rial_price=get_rial_price_expression('expense__'))
+                .values('rial_price')[:1]),
+            default_pack_price_currency=Subquery(
+                default_pack.values('expense__price_currency')[:1]),
+            category_is_active=F('category__is_active'),
+        ).values(
+            'id',
+            'is_active',
+            'category_is_active',
+            'total_actual_count_stock',
+            'count_stock',
+            'total_active_packs',
+            'default_pack_sku',
+            'default_pack_price',
+            'default_pack_price_currency',
+        )
+
+    def refresh(self, product_ids=None, batch_size=500) -> int:
+        """
+        recomputes the listing rows of the given products, all products if
+        `product_ids` is None. returns the number of refreshed rows.
+        """
+        Product = apps.get_model('warehouse', 'Product')
+        if product_ids is None:
+            product_ids = Product.objects.values_list('id', flat=True)
+        product_ids = sorted(set(product_ids))
+
+        total = 0
+        for start in range(0, len(product_ids), batch_size):
+            batch = product_ids[start:start + batch_size]
+            manifests = load_image_manifests(batch)
+            listings = [
+                self.model(
+                    product_id=row['id'],
+                    default_pack_sku=row['default_pack_sku'],
+                    default_pack_price=row['default_pack_price'],
+                    default_pack_price_currency=row['default_pack_price_currency'],
+                    first_pic=manifests[row['id']]['first_pic'],
+                    second_pic=manifests[row['id']]['second_pic'],
+                    default_pic=manifests[row['id']]['default_pic'],
+                    total_actual_count_stock=row['total_actual_count_stock'],
+                    count_stock=row['count_stock'],
+                    total_active_packs=row['total_active_packs'],
+                    is_listable=bool(row['is_active']
+                                     and row['category_is_active']
+                                     and row['total_active_packs']
+                                     and row['default_pack_sku']
+                                     and manifests[row['id']]['default_pic']),
+                )
+                for row in self.get_listing_values(batch)
+            ]
+            self.bulk_create(
+                listings,
+                update_conflicts=True,
+                unique_fields=['product'],
+                update_fields=[
+                    'default_pack_sku',
+                    'default_pack_price',
+                    'default_pack_price_currency',
+                    'first_pic',
+                    'second_pic',
+                    'default_pic',
+                    'total_actual_count_stock',
+                    'count_stock',
+                    'total_active_packs',
+                    'is_listable',
+                    'refreshed',
+                ],
+            )
+            total += len(listings)
+        logger.info(f"{total} product listing rows are refreshed")
+        return total
+
+    def schedule_refresh(self, product_ids) -> None:
+        """
+        refreshes the listing rows of the given products once the current
+        transaction commits. ids scheduled in the same transaction are
+        refreshed together by the first callback, the rest are no-ops.
+        """
+        product_ids = {product_id for product_id in product_ids
+                       if product_id is not None}
+        if not product_ids:
+            return
+        pending = getattr(self._pending, 'product_ids', None)
+        if pending is None:
+            pending = self._pending.product_ids = set()
+        pending.update(product_ids)
+
+        def run_refresh():
+            scheduled = set(self._pending.product_ids)
+            self._pending.product_ids.clear()
+            if scheduled:
+                self.refresh(scheduled)
+
+        transaction.on_commit(run_refresh)
+
+
+class StockReservationBusinessLogicLayer(Manager):
+    """
+    Holds stock of packs for unpaid orders. A hold counts against
+    `Expense.count_stock` until it expires, so packs an order is paying for
+    are not sold twice while the customer is on the bank gateway.
+    """
+    def get_active(self, now=None):
+        """holds that still count against the stock."""
+        return self.filter(expires_at__gt=now or timezone.now())
+
+    def get_held_subquery(self, pack_ref: str = 'pk'):
+        """
+        Sum of the unexpired holds of the pack at `pack_ref` of the outer
+        query, 0 when there is none.
+        """
+        held = self.get_active() \
+            .filter(pack_id=OuterRef(pack_ref)) \
+            .order_by() \
+            .values('pack_id') \
+            .annotate(total=Sum('quantity')) \
+            .values('total')
+        return Coalesce(Subquery(held, output_field=IntegerField()), 0)
+
+    def get_held_quantities(self,
+                            pack_ids: Iterable[int],
+                            exclude_order_id: Optional[int] = None) -> Dict[int, int]:
+        """unexpired held quantity per pack id, packs without holds are left out."""
+        holds = self.get_active().filter(pack_id__in=list(pack_ids))
+        if exclude_order_id is not None:
+            holds = holds.exclude(order_id=exclude_order_id)
+        return dict(
+            holds.order_by()
+            .values('pack_id')
+            .annotate(total=Sum('quantity'))
+            .values_list('pack_id', 'total')
+        )
+
+    def reserve(self,
+                order: 'Order',
+                skus_with_quantity: Dict[str, int],
+                ttl: Optional[int] = None) -> list:
+        """
+        Holds `skus_with_quantity` for `order` for `ttl` seconds, defaults to
+        `STOCK_RESERVATION_TTL`. Reserving again for the same order replaces
+        its holds and renews their expiry.
+
+        DESC
+        _____
+        The expenses of the packs are locked in sku order, the order
+        `Expense.bll.bulk_update_stock` locks them in, so concurrent
+        reservations and stock updates of the same packs wait for each
+        other instead of deadlocking or reading the same free stock. raises `PackOutOfStock` naming every
+        pack whose free stock is not enough, nothing is held then.
+        """
+        Expense = apps.get_model('warehouse', 'Expense')
+        ttl = settings.STOCK_RESERVATION_TTL if ttl is None else ttl
+        skus_with_quantity = {sku: quantity for sku, quantity in skus_with_quantity.items()
+                              if quantity > 0}
+        if not skus_with_quantity:
+            return list()
+
+        with transaction.atomic():
+            expenses = list(
+                Expense.objects.select_for_update(of=('self',))
+                .filter(pack__sku__in=skus_with_quantity.keys())
+                .order_by('pack__sku')
+                .values_list('pack_id', 'pack__sku', 'count_stock', 'is_suppliable')
+            )
+            held = self.get_held_quantities([pack_id for pack_id, *_ in expenses],
+                                            exclude_order_id=order.id)
+            found = {sku for _, sku, *_ in expenses}
+            out_of_stock = set(skus_with_quantity) - found
+            for pack_id, sku, count_stock, is_suppliable in expenses:
+                free_stock = (count_stock or 0) - held.get(pack_id, 0)
+                if not is_suppliable or free_stock < skus_with_quantity[sku]:
+                    out_of_stock.add(sku)
+            if out_of_stock:
+                raise PackOutOfStock(f"Insufficient stock for packs "
+                                     f"{', '.join(sorted(out_of_stock))}")
+
+            expires_at = timezone.now() + timedelta(seconds=ttl)
+            self.filter(order_id=order.id) \
+                .exclude(pack_id__in=[pack_id for pack_id, *_ in expenses]) \
+                .delete()
+            # holds lower the free stock the api reports
+            bump_generation('warehouse.Expense')
+            return self.bulk_create(
+                [self.model(order_id=order.id,
+                            pack_id=pack_id,
+                            quantity=skus_with_quantity[sku],
+                            expires_at=expires_at)
+                 for pack_id, sku, *_ in expenses],
+                update_conflicts=True,
+                unique_fields=['order', 'pack'],
+                update_fields=['quantity', 'expires_at'],
+            )
+
+    def release(self, order_ids: Iterable[int]) -> int:
+        """drops every hold of the given orders, returns how many were dropped."""
+        deleted, _ = self.filter(order_id__in=list(order_ids)).delete()
+        if deleted:
+            bump_generation('warehouse.Expense')
+        return deleted
+
+    def get_expired_order_ids(self, now=None) -> set:
+        """ids of the orders having a hold that expired."""
+        return set(
+            self.filter(expires_at__lte=now or timezone.now())
+            .order_by()
+            .values_list('order_id', flat=True)
+            .distinct()
+        )
+
+    def release_expired(self, expired_before, batch_size: int = 1000) -> set:
+        """
+        Deletes the holds that expired before `expired_before` in batches of
+        `batch_size`, returns the ids of their orders. Rows locked by another
+        sweeper are skipped, so sweepers may run concurrently.
+        """
+        order_ids = set()
+        while True:
+            with transaction.atomic():
+                rows = list(
+                    self.select_for_update(skip_locked=True)
+                    .filter(expires_at__lte=expired_before)
+                    .order_by('id')
+                    .values_list('id', 'order_id')[:batch_size]
+                )
+                if not rows:
+                    break
+                self.filter(id__in=[row_id for row_id, _ in rows]).delete()
+                bump_generation('warehouse.Expense')
+            order_ids.update(order_id for _, order_id in rows)
+            if len(rows) < batch_size:
+                break
+        if order_ids:
+            logger.info(f"expired stock holds of {len(order_ids)} orders are released")
+        return order_ids
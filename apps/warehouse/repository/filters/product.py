@@ -1,7 +1,12 @@
 from django.db import models
+from django.db.models import (
+    Exists,
+    OuterRef
+)
 from django_filters import (
     FilterSet,
     CharFilter,
+    RangeFilter,
     Filter
 )
 
@@ -10,6 +15,7 @@ from django_filters.widgets import (
 )
 
 from warehouse.models import Product
+from warehouse.models import Pack
 from warehouse.models import Category
 
 class ProductFilter(FilterSet):
@@ -71,4 +77,40 @@ class ProductFilter(FilterSet):
         return queryset
 
     def filter_in_stock_availability(self, queryset, value, *args, **kwargs):
-        return queryset.exclude(count_stock=0)
\ No newline at end of file
+        return queryset.exclude(count_stock=0)
+
+
+class ProductAPIFilter(FilterSet):
+    """
+    Filters of the product API. `price_in_base_currency_min` and
+    `price_in_base_currency_max` keep the products having a pack priced
+    within both bounds.
+    """
+    price_in_base_currency = RangeFilter(
+        method='filter_price_in_base_currency'
+    )
+
+    class Meta:
+        model = Product
+        fields = {
+            'category': ['exact'],
+            'packs__expense__price': ['exact'],
+            'tags': ['exact'],
+            'is_active': ['exact'],
+            'brand': ['exact']
+        }
+
+    def filter_price_in_base_currency(self, queryset, name, value):
+        """
+        Both bounds are checked on the same pack in one EXISTS, a join on
+        `packs` would duplicate the rows and inflate the per product sums.
+        """
+        packs = Pack.objects.filter(product_id=OuterRef('pk'))
+        if value.start is not None:
+            packs = packs.filter(
+                expense__normalized_price__price_in_base_currency__gte=value.start)
+        if value.stop is not None:
+            packs = packs.filter(
+                expense__normalized_price__price_in_base_currency__lte=value.stop)
+        return queryset.filter(Exists(packs))
+
@@ -1,2 +1,4 @@
 from .real_warehouse_data_generator import RealWarehouseDataGenerator
+from .real_warehouse_data_loader import RealWarehouseDataLoader
+from .synthetic_data_generator import SyntheticDataGenerator
 from .warehouse_data_generator import WarehouseDataGenerator
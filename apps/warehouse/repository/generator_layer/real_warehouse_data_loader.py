@@ -0,0 +1,292 @@
+import json
+import logging
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+
+from tqdm import tqdm
+from django.core.files import File
+from django.db import transaction
+from django.utils.text import slugify
+
+import dataset
+from dataset import ReadDataset
+from kernel.settings.base import BASE_DIR
+from warehouse.models import (
+    Brand,
+    Category,
+    Color,
+    Warranty,
+    Tag,
+    Product,
+    Pack,
+    ProductGallery,
+    ProductListing,
+    ExpensePrice
+)
+from warehouse.services.category_tree import bump_category_tree_version
+from warehouse.services.image_manifest import invalidate_image_manifest
+from warehouse.services.thumbnail import thumbnail_pipeline
+from .real_warehouse_data_generator import RealWarehouseDataGenerator
+
+logger = logging.getLogger(__name__)
+
+
+class LoadCheckpoint:
+    """
+    Progress of a load stored as JSON, so an interrupted load resumes after
+    the last finished stage, or gallery batch.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.state = dict()
+        if os.path.exists(path):
+            with open(path) as checkpoint_file:
+                self.state = json.load(checkpoint_file)
+
+    def is_done(self, stage):
+        return self.state.get(stage, dict()).get('done', False)
+
+    def get(self, stage, key, default=None):
+        return self.state.get(stage, dict()).get(key, default)
+
+    def save(self, stage, **values):
+        self.state.setdefault(stage, dict()).update(values)
+        temporary_path = f'{self.path}.tmp'
+        with open(temporary_path, 'w') as checkpoint_file:
+            json.dump(self.state, checkpoint_file)
+        os.replace(temporary_path, self.path)
+
+    def clear(self):
+        self.state = dict()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class RealWarehouseDataLoader(RealWarehouseDataGenerator):
+    """Real warehouse data loader
+    Loads the same data as `RealWarehouseDataGenerator` in bulk.
+
+    Sheets are parsed in parallel worker processes, the category tree is
+    built in memory and inserted one `bulk_create` per level, product tags
+    are inserted as through rows and every gallery picture is read once,
+    streamed to the storage. Each stage runs in a transaction and is
+    recorded in the checkpoint file, so a rerun skips finished stages.
+    Random choices are drawn from a generator seeded by `seed`, so two
+    loads of the same dataset tag the same products.
+    """
+    def __init__(self, checkpoint_path, workers=None, seed=0):
+        super().__init__()
+        self.checkpoint = LoadCheckpoint(checkpoint_path)
+        self.workers = workers
+        self.random = random.Random(seed)
+
+    def read_sheets(self, sheet_names):
+        """parses the given sheets in parallel, returns rows per sheet."""
+        sheet_names = list(sheet_names)
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            sheets = executor.map(ReadDataset.read_excel_file, sheet_names)
+            return dict(zip(sheet_names, sheets))
+
+    def get_product_sheet_names(self):
+        return [sheet_name for sheet_name in ReadDataset.get_sheet_names()
+                if 'prod' in sheet_name]
+
+    def build_category_tree(self, categories):
+        """
+        Links every category to its parent as `insert_at` did, then numbers
+        the tree depth first to set `lft`, `rght`, `level` and `tree_id`.
+        Returns the category objects per level.
+        """
+        levels = [self.get_categories(categories, disable_progress_bar=True, level=level)
+                  for level in range(3)]
+        roots, children, grand_children = levels
+        children_of = {id(category): list() for level in levels for category in level}
+        for child in children:
+            children_of[id(roots[child.tree_id])].append(child)
+        parent_ids = self.get_parent_id_grand_children(categories, grand_children)
+        for index, grand_child in enumerate(grand_children):
+            children_of[id(children[parent_ids[index]])].append(grand_child)
+
+        def number(node, parent, level, tree_id, counter):
+            node.parent = parent
+            node.level = level
+            node.tree_id = tree_id
+            node.lft = counter
+            counter += 1
+            for child in children_of[id(node)]:
+                counter = number(child, node, level + 1, tree_id, counter)
+            node.rght = counter
+            return counter + 1
+
+        for tree_id, root in enumerate(roots, start=1):
+            number(root, None, 0, tree_id, 1)
+        return levels
+
+    def create_categories(self,
+                          batch_size=300,
+                          disable_progress_bar=False):
+        categories = ReadDataset.read_excel_file('categories')
+        # levels are saved top down, so every parent has its primary key
+        for level, category_objs in enumerate(self.build_category_tree(categories)):
+            Category.tree.bulk_create(category_objs, batch_size=batch_size)
+            logger.debug(f'{len(category_objs)} categories of level {level} are saved.')
+        # `bulk_create` sends no signal, running processes reload the tree
+        bump_category_tree_version()
+        return Category.objects.all()
+
+    def get_products_from_excel(self):
+        """rows of all product sheets in sheet order."""
+        sheets = self.read_sheets(self.get_product_sheet_names())
+        brands = {brand.title: brand for brand in Brand.objects.all()}
+        categories = {category.title: category for category in Category.objects.all()}
+        all_products_from_excel = list()
+        for prods in sheets.values():
+            brand_obj = brands.get(prods[0]['brand'])
+            category_obj = categories.get(prods[0]['category'])
+            for prod in prods:
+                prod.update(brand=brand_obj, category=category_obj)
+            all_products_from_excel += prods
+        return all_products_from_excel
+
+    def create_products(self,
+                        tags,
+                        all_products_from_excel,
+                        tag_count=5,
+                        product_with_no_tag_ratio=2,
+                        batch_size=300,
+                        disable_progress_bar=False):
+        product_objs = [Product(sku=self.get_random_secret(20),
+                                title=product['title_en'],
+                                title_fa=product['title_fa'],
+                                title_en=product['title_en'],
+                                slug=slugify(product['title_fa'], allow_unicode=True),
+                                description=self.get_random_sentence(),
+                                subtitle=product['subtitle'],
+                                is_active=product['is_active'],
+                                is_voucher_active=product['is_voucher_active'],
+                                brand=product['brand'],
+                                category=product['category'])
+                        for product in tqdm(all_products_from_excel, disable=disable_progress_bar)
+                        ]
+        products = Product.objects.bulk_create(product_objs, batch_size=batch_size)
+
+        tags = list(tags)
+        ProductTag = Product.tags.through
+        tag_objs = [ProductTag(product_id=product_obj.id, tag_id=tag.id)
+                    for product_obj in self.random.sample(products, len(products) // product_with_no_tag_ratio)
+                    for tag in self.random.sample(tags, self.random.randint(1, min(tag_count, len(tags))))
+                    ]
+        ProductTag.objects.bulk_create(tag_objs, batch_size=batch_size)
+        logger.debug(f'{len(products)} products and {len(tag_objs)} product tags are saved.')
+        return products
+
+    def get_gallery_paths(self, sheet_names):
+        """picture paths of each product, in the order of the products."""
+        for prod_sheet_name in sheet_names:
+            prod_path = os.path.normpath(f'{dataset.__path__[0]}/products/{prod_sheet_name}')
+            sub_dirs = sorted(int(f.name) for f in os.scandir(prod_path) if f.is_dir())
+            for sub_dir in sub_dirs:
+                directory = os.path.normpath(f'{prod_path}/{sub_dir}')
+                image_names = sorted(next(os.walk(directory))[2], key=self.natural_keys)
+                if not image_names:
+                    yield [os.path.normpath(f'{dataset.__path__[0]}/default_image.jpg')]
+                else:
+                    yield [os.path.normpath(f'{directory}/{image_name}')
+                           for image_name in image_names]
+
+    def create_product_gallery(self,
+                               products,
+                               products_sheet_names,
+                               batch_size=50,
+                               disable_progress_bar=False):
+        """
+        Saves the pictures `batch_size` products at a time. Every picture
+        is opened once and streamed to the storage by `bulk_create`.
+
+        `bulk_create` sends no `post_save`, so the thumbnails and image
+        manifests of each committed batch are handled here, and the listing
+        rows of all products are refreshed at the end.
+        """
+        start = self.checkpoint.get('galleries', 'products', 0)
+        product_paths = list(zip(products, self.get_gallery_paths(products_sheet_names)))
+        for index in tqdm(range(start, len(product_paths), batch_size),
+                          disable=disable_progress_bar):
+            batch = product_paths[index:index + batch_size]
+            with ExitStack() as stack, transaction.atomic():
+                picture_objs = [
+                    ProductGallery(product=product,
+                                   picture=File(stack.enter_context(
+                                       open(os.path.join(BASE_DIR, image_path), 'rb')),
+                                       name=os.path.basename(image_path)),
+                                   alternate_text=self.get_random_sentence()[:110],
+                                   image_status=self.get_image_banner(position),
+                                   is_default=position == 0)
+                    for product, image_paths in batch
+                    for position, image_path in enumerate(image_paths)
+                ]
+                ProductGallery.objects.bulk_create(picture_objs)
+            self.checkpoint.save('galleries', products=index + len(batch))
+            for product, _ in batch:
+                invalidate_image_manifest(product.id)
+            for picture_obj in picture_objs:
+                thumbnail_pipeline.enqueue(picture_obj.picture.name)
+        logger.info('All pictures are saved into the database.')
+
+        total = ProductListing.bll.refresh([product.id for product in products])
+        logger.info(f'{total} product listings are refreshed.')
+
+    def run_stage(self, stage, function, *args, **kwargs):
+        """runs a stage in a transaction unless the checkpoint has it done."""
+        if self.checkpoint.is_done(stage):
+            logger.info(f'Stage `{stage}` is already loaded, skipped.')
+            return False
+        with transaction.atomic():
+            function(*args, **kwargs)
+        self.checkpoint.save(stage, done=True)
+        return True
+
+    def load(self,
+             total_colors,
+             total_warranties,
+             total_tags,
+             total_packs,
+             disable_progress_bar=False):
+        """
+        Loads every stage in order and returns the number of products.
+        """
+        self.run_stage('brands', self.create_brands,
+                       disable_progress_bar=disable_progress_bar)
+        self.run_stage('categories', self.create_categories,
+                       disable_progress_bar=disable_progress_bar)
+        self.run_stage('colors', self.create_colors, total_colors,
+                       disable_progress_bar=disable_progress_bar)
+        self.run_stage('warranties', self.create_warranties, total_warranties,
+                       disable_progress_bar=disable_progress_bar)
+        self.run_stage('tags', self.create_tags, total_tags,
+                       disable_progress_bar=disable_progress_bar)
+
+        products_sheet_names = self.get_product_sheet_names()
+        all_products_from_excel = self.get_products_from_excel()
+        self.run_stage('products', self.create_products, Tag.objects.all(),
+                       all_products_from_excel,
+                       disable_progress_bar=disable_progress_bar)
+        products = list(Product.objects.order_by('id'))
+
+        self.run_stage('physical_info', self.create_physical_info,
+                       products, all_products_from_excel,
+                       disable_progress_bar=disable_progress_bar)
+        self.run_stage('packs', self.create_packs,
+                       list(Color.objects.all()), list(Warranty.objects.all()),
+                       products, all_products_from_excel, total_packs,
+                       disable_progress_bar=disable_progress_bar)
+        self.run_stage('expenses', self.create_expenses, Pack.objects.all(),
+                       disable_progress_bar=disable_progress_bar)
+        # the listing is refreshed once, after the galleries
+        self.run_stage('prices', ExpensePrice.bll.reprice, refresh_listing=False)
+        if not self.checkpoint.is_done('galleries'):
+            self.create_product_gallery(products, products_sheet_names,
+                                        disable_progress_bar=disable_progress_bar)
+            self.checkpoint.save('galleries', done=True)
+        return len(products)
@@ -0,0 +1,254 @@
+import logging
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from painless.utils.bulk_copy import (
+    CopyWriter,
+    reserve_ids
+)
+
+logger = logging.getLogger(__name__)
+
+
+def zipf_index(rng, total, skew):
+    """
+    A 0-based index below `total` drawn from a Zipf like distribution, so
+    low indexes are picked far more often. Inverse CDF of the continuous
+    approximation, O(1) time and memory whatever `total` is.
+    """
+    if total <= 1:
+        return 0
+    if skew == 1:
+        index = int(total ** rng.random()) - 1
+    else:
+        exponent = 1 - skew
+        index = int(((total ** exponent - 1) * rng.random() + 1) ** (1 / exponent)) - 1
+    return min(max(index, 0), total - 1)
+
+
+class SyntheticDataGenerator:
+    """Synthetic data generator
+    Streams a catalog of any size into PostgreSQL with COPY, for load tests
+    and query plans close to production.
+
+    Every stage draws from its own `random.Random` seeded with `seed` and
+    the stage name, so the same arguments always give the same data.
+
+    Skew
+    ----
+    `categories`: new categories prefer deep parents up to `max_depth`.
+    `products`: spread over categories with a Zipf distribution.
+    `packs`: one default pack per product, the rest go to popular products.
+    `expenses`: currencies follow `currency_weights`.
+    `pack orders`: packs are picked by a Zipf popularity.
+    """
+    def __init__(self,
+                 seed=0,
+                 skew=1.1,
+                 max_depth=4,
+                 lines_per_order=3,
+                 currency_weights=None,
+                 chunk_size=50000):
+        self.seed = seed
+        self.skew = skew
+        self.max_depth = max_depth
+        self.lines_per_order = lines_per_order
+        self.currency_weights = currency_weights or {'R': 6, 'T': 3, 'USD': 1}
+        self.chunk_size = chunk_size
+        self.now = timezone.now()
+
+    def get_rng(self, stage):
+        return random.Random(f'{self.seed}:{stage}')
+
+    def get_writer(self, model, rng):
+        return CopyWriter(model, rng, chunk_size=self.chunk_size)
+
+    def create_brands(self, total):
+        Brand = apps.get_model('warehouse', 'Brand')
+        first_id = reserve_ids(Brand, total)
+        rows = ({'id': first_id + index,
+                 'title': f'brand-{self.seed}-{first_id + index}',
+                 'slug': f'brand-{self.seed}-{first_id + index}'}
+                for index in range(total))
+        return first_id, self.get_writer(Brand, self.get_rng('brands')).write_many(rows)
+
+    def build_category_tree(self, rng, total):
+        """
+        Parents of `total` categories, then MPTT fields by depth first
+        numbering. Returns rows in insertion order, parents first.
+        """
+        roots = max(1, total // 50)
+        parents = [None] * roots
+        depths = [0] * roots
+        for index in range(roots, total):
+            while True:
+                parent = zipf_index(rng, index, self.skew)
+                parent = index - 1 - parent
+                if depths[parent] < self.max_depth - 1:
+                    break
+            parents.append(parent)
+            depths.append(depths[parent] + 1)
+
+        children = [list() for _ in range(total)]
+        for index, parent in enumerate(parents):
+            if parent is not None:
+                children[parent].append(index)
+
+        lfts, rghts, tree_ids = [0] * total, [0] * total, [0] * total
+        for tree_id, root in enumerate(range(roots), start=1):
+            counter = 1
+            stack = [(root, False)]
+            while stack:
+                node, is_closed = stack.pop()
+                if is_closed:
+                    rghts[node] = counter
+                    counter += 1
+                    continue
+                lfts[node] = counter
+                tree_ids[node] = tree_id
+                counter += 1
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(children[node]))
+        return parents, depths, lfts, rghts, tree_ids
+
+    def create_categories(self, total):
+        Category = apps.get_model('warehouse', 'Category')
+        rng = self.get_rng('categories')
+        parents, depths, lfts, rghts, tree_ids = self.build_category_tree(rng, total)
+        first_id = reserve_ids(Category, total)
+        # parents always have a lower index, so they are written first
+        rows = ({'id': first_id + index,
+                 'title': f'category-{self.seed}-{first_id + index}',
+                 'slug': f'category-{self.seed}-{first_id + index}',
+                 'sku': f'CT-{self.seed}-{first_id + index}',
+                 'is_active': True,
+                 'parent_id': None if parents[index] is None else first_id + parents[index],
+                 'level': depths[index],
+                 'lft': lfts[index],
+                 'rght': rghts[index],
+                 'tree_id': tree_ids[index] + self.get_tree_id_offset(Category)}
+                for index in range(total))
+        return first_id, self.get_writer(Category, rng).write_many(rows)
+
+    def get_tree_id_offset(self, Category):
+        if not hasattr(self, '_tree_id_offset'):
+            last = Category.objects.order_by('-tree_id').values_list('tree_id', flat=True).first()
+            self._tree_id_offset = last or 0
+        return self._tree_id_offset
+
+    def create_products(self, total, brands, categories):
+        Product = apps.get_model('warehouse', 'Product')
+        rng = self.get_rng('products')
+        first_brand, total_brands = brands
+        first_category, total_categories = categories
+        first_id = reserve_ids(Product, total)
+        rows = ({'id': first_id + index,
+                 'title': f'product-{self.seed}-{first_id + index}',
+                 'slug': f'product-{self.seed}-{first_id + index}',
+                 'sku': f'PR-{self.seed}-{first_id + index}',
+                 'subtitle': f'product {index}',
+                 'description': '',
+                 'is_active': rng.random() < 0.95,
+                 'is_voucher_active': rng.random() < 0.2,
+                 'brand_id': first_brand + zipf_index(rng, total_brands, self.skew),
+                 'category_id': first_category + zipf_index(rng, total_categories, self.skew)}
+                for index in range(total))
+        return first_id, self.get_writer(Product, rng).write_many(rows)
+
+    def get_packs_per_product(self, rng, total_products, total_packs):
+        """one pack per product, the remaining packs go to popular products."""
+        packs_per_product = [1] * total_products
+        for _ in range(max(total_packs - total_products, 0)):
+            packs_per_product[zipf_index(rng, total_products, self.skew)] += 1
+        return packs_per_product
+
+    def create_packs(self, total, products):
+        Pack = apps.get_model('warehouse', 'Pack')
+        rng = self.get_rng('packs')
+        first_product, total_products = products
+        packs_per_product = self.get_packs_per_product(rng, total_products, total)
+        total = sum(packs_per_product)
+        first_id = reserve_ids(Pack, total)
+
+        def get_rows():
+            pack_id = first_id
+            for index, count in enumerate(packs_per_product):
+                for position in range(count):
+                    yield {'id': pack_id,
+                           'sku': f'PK-{self.seed}-{pack_id}',
+                           'is_active': position == 0 or rng.random() < 0.8,
+                           'is_default': position == 0,
+                           'product_id': first_product + index}
+                    pack_id += 1
+
+        return first_id, self.get_writer(Pack, rng).write_many(get_rows())
+
+    def create_expenses(self, packs):
+        Expense = apps.get_model('warehouse', 'Expense')
+        rng = self.get_rng('expenses')
+        first_pack, total_packs = packs
+        currencies = list(self.currency_weights)
+        weights = list(self.currency_weights.values())
+        first_id = reserve_ids(Expense, total_packs)
+
+        def get_rows():
+            for index in range(total_packs):
+                currency = rng.choices(currencies, weights)[0]
+                buy_price = Decimal(rng.randint(10, 10000)) \
+                    * {'USD': 1, 'T': 40000, 'R': 400000}.get(currency, 1)
+                yield {'id': first_id + index,
+                       'pack_id': first_pack + index,
+                       'buy_price': buy_price,
+                       'buy_price_currency': currency,
+                       'price': (buy_price * Decimal('1.3')).quantize(Decimal('0.01')),
+                       'price_currency': currency,
+                       'count_stock': rng.randint(0, 500),
+                       'actual_count_stock': rng.randint(0, 250),
+                       'is_suppliable': rng.random() < 0.9}
+
+        return first_id, self.get_writer(Expense, rng).write_many(get_rows())
+
+    def create_orders(self, total_pack_orders, packs):
+        """orders and their pack orders, packs picked by popularity."""
+        Order = apps.get_model('basket', 'Order')
+        PackOrder = apps.get_model('basket', 'PackOrder')
+        rng = self.get_rng('orders')
+        first_pack, total_packs = packs
+        total_orders = max(1, total_pack_orders // self.lines_per_order)
+        first_order = reserve_ids(Order, total_orders)
+        statuses = ['waiting', 'processing', 'shipped', 'delivered',
+                    'completed', 'expiring', 'cancelled']
+        orders = ({'id': first_order + index,
+                   'transaction_number': f'SY-{self.seed}-{first_order + index}',
+                   'status': rng.choices(statuses, [5, 10, 10, 15, 50, 5, 5])[0],
+                   'created': self.now - timedelta(seconds=rng.randint(0, 2 * 365 * 86400))}
+                  for index in range(total_orders))
+        self.get_writer(Order, rng).write_many(orders)
+
+        first_id = reserve_ids(PackOrder, total_pack_orders)
+        currency = settings.DEFAULT_CURRENCY_SHOW_ON_SITE
+
+        def get_rows():
+            for index in range(total_pack_orders):
+                cost = Decimal(rng.randint(100, 100000))
+                yield {'id': first_id + index,
+                       'order_id': first_order + index % total_orders,
+                       'pack_id': first_pack + zipf_index(rng, total_packs, self.skew),
+                       'quantity': 1 + zipf_index(rng, 10, 2),
+                       'cost': cost,
+                       'cost_currency': currency,
+                       'cost_without_discount': cost,
+                       'cost_without_discount_currency': currency}
+
+        return first_id, self.get_writer(PackOrder, rng).write_many(get_rows())
+
+    def analyze(self, models):
+        with connection.cursor() as cursor:
+            for model in models:
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
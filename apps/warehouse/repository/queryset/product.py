@@ -4,16 +4,69 @@ from typing import (Optional,
 from datetime import datetime
 
 from django.apps import apps
+from django.conf import settings
+from django.db import connections
 from django.db.models import (
     QuerySet, Subquery, OuterRef,
     Prefetch, Count, When, Case,
     Func, Sum, Max, Min, Avg, F,
-    Q, ImageField, BooleanField,
-    DateTimeField
+    Q, BooleanField,
+    DateTimeField, ExpressionWrapper,
+    Exists
 )
 from django.db.models.functions import Coalesce
 
 from painless.models.fields import MoneyRialCurrencyOutput
+from warehouse.services.currency import rate_provider
+
+
+def get_rial_price_expression(prefix='packs__expense__'):
+    """
+    Build the expression converting an expense price reached through
+    `prefix` to Rial. When Rial is the base currency the stored
+    `ExpensePrice` column is read if it was converted with the current
+    rates, falling back to the conversion for expenses that are not
+    repriced yet or were repriced with older rates.
+    """
+    case = rate_provider.get_case('R', prefix,
+                                  output_field=MoneyRialCurrencyOutput())
+    if settings.BASE_CURRENCY != 'R':
+        return case
+    stored_price = Case(
+        When(**{f'{prefix}normalized_price__rate_version': rate_provider.get_matrix().version},
+             then=F(f'{prefix}normalized_price__price_in_base_currency')),
+        default=None,
+        output_field=MoneyRialCurrencyOutput())
+    return Coalesce(stored_price,
+                    case,
+                    output_field=MoneyRialCurrencyOutput())
+
+
+def get_sales_fact_subquery(field):
+    """
+    Sum of a `SalesFact` field per product, as one correlated subquery over
+    the pre-aggregated facts instead of joining every pack order.
+    """
+    SalesFact = apps.get_model('basket', 'SalesFact')
+    return Subquery(SalesFact.objects
+                    .filter(product_id=OuterRef('pk'))
+                    .order_by()
+                    .values('product_id')
+                    .annotate(total=Sum(field))
+                    .values('total'))
+
+
+def get_sales_quantity_path(from_facts=False):
+    return 'sales_facts__quantity' if from_facts else 'packs__pack_orders__quantity'
+
+
+def get_sales_destinations(destinations, from_facts=False):
+    """
+    `values()` expressions of the order address fields in `destinations`,
+    read from `SalesFact` with `from_facts`.
+    """
+    prefix = 'sales_facts__' if from_facts else 'packs__pack_orders__order__order_address__'
+    return {destination: F(f'{prefix}{destination}') for destination in destinations}
 
 
 class ReportQuerySet(QuerySet):
@@ -112,7 +165,9 @@ class AnnotationQuerySet(QuerySet):
         return self.annotate(
             stock_count=Sum('packs__expense__actual_count_stock'))
 
-    def get_queryset_of_product_with_the_least_or_most_purchase(self, is_the_most: bool = True):
+    def get_queryset_of_product_with_the_least_or_most_purchase(self,
+                                                                is_the_most: bool = True,
+                                                                from_facts: bool = False):
         """
         The list of the least or most purchased products
         ----
@@ -122,32 +177,29 @@ class AnnotationQuerySet(QuerySet):
         ------
         `preferred_order` : bool
             default value is True
+        `from_facts` : bool
+            read the quantities from `SalesFact`, cancelled and expiring
+            orders are not counted there.
         """
         # TODO: Add most_purchase as well.
+        if from_facts:
+            quantity = Coalesce(get_sales_fact_subquery('quantity'), 0)
+        else:
+            quantity = Coalesce(Sum('packs__pack_orders__quantity'), 0)
         if is_the_most:
             qs = self.annotate(
-                product_quantity=Coalesce(Sum('packs__pack_orders__quantity'), 0)
+                product_quantity=quantity
             ).order_by('-product_quantity')
         else:
             qs = self.annotate(
-                product_quantity=Coalesce(Sum('packs__pack_orders__quantity'), 0)
+                product_quantity=quantity
             ).order_by('product_quantity')
         return qs
 
     def get_default_pack_price(self):
         """get default pack price per product"""
-        currency_rate = 300_000  # Rial
-        default_pack_price_query = Case(
-            When(Q(packs__expense__price_currency='R'),
-                 then=F('packs__expense__price')),
-            When(Q(packs__expense__price_currency='T'),
-                 then=F('packs__expense__price') * 10),
-            When(Q(packs__expense__price_currency='USD'),
-                 then=F('packs__expense__price') * currency_rate),
-            output_field=MoneyRialCurrencyOutput()
-        )
         return self.get_default_pack() \
-            .annotate(default_pack_price=default_pack_price_query,
+            .annotate(default_pack_price=get_rial_price_expression(),
                       default_pack_price_currency=F('packs__expense__price_currency'),
                       pack_sku=F('packs__sku'))  # noqa
 
@@ -155,11 +207,14 @@ class AnnotationQuerySet(QuerySet):
         """ return sum of tags used per products"""
         return self.annotate(tag_count_per_product=Count('tags'))
 
-    def get_product_sold_count(self):
+    def get_product_sold_count(self, from_facts=False):
         """
         Get the quantity of all packs sold for each product in
-        `product_sold_count` attribute.
+        `product_sold_count` attribute, read from `SalesFact` with
+        `from_facts`.
         """
+        if from_facts:
+            return self.annotate(product_sold_count=get_sales_fact_subquery('quantity'))
         Pack = apps.get_model('warehouse', 'Pack')
         pack_query = Pack.dal.filter(product__id=OuterRef('pk')) \
             .values('id') \
@@ -190,27 +245,83 @@ class AnnotationQuerySet(QuerySet):
         return self.get_default_pack() \
             .annotate(title_of_default_pack_warranty=Coalesce(F('packs__warranty__title'), None))
 
-    def get_total_packs_in_orders(self):
+    def get_total_packs_in_orders(self, from_facts=False):
         """get all packs submitted in each order"""
+        if from_facts:
+            return self.annotate(total_packs_in_orders=
+                                 Coalesce(get_sales_fact_subquery('lines'), 0))
         return self.annotate(total_packs_in_orders=
                              Coalesce(Count('packs__pack_orders__pack_id'), 0))
 
-    def get_number_sold_per_product_per_country(self):
-        """get the number of products sold per country"""
-        return self.annotate(total_sold_product_per_contry=
-                             Coalesce(Sum('packs__pack_orders__quantity'), 0),
-                             country=F('packs__pack_orders__order__order_address__country'))
+    def get_number_sold_per_product_per_country(self, from_facts=False):
+        """
+        get the number of products sold per country, one dict per product
+        and country with `id`, `country` and `total_sold_product_per_contry`
+        """
+        return self.order_by() \
+            .values('id', **get_sales_destinations(['country'], from_facts)) \
+            .annotate(total_sold_product_per_contry=
+                      Coalesce(Sum(get_sales_quantity_path(from_facts)), 0))
+
+    def get_number_sold_per_product_per_country_per_province(self, from_facts=False):
+        """
+        get the number of products sold per country, per province, one dict
+        per product, country and province with `id`, `country`, `province`
+        and `total_sold_product_per_contry_per_province`
+        """
+        return self.order_by() \
+            .values('id', **get_sales_destinations(['country', 'province'], from_facts)) \
+            .annotate(total_sold_product_per_contry_per_province=
+                      Coalesce(Sum(get_sales_quantity_path(from_facts)), 0))
 
-    def get_number_sold_per_product_per_country_per_province(self):
-        """get the number of products sold per country, per province"""
-        return self.annotate(total_sold_product_per_contry_per_province=
-                             Coalesce(Sum('packs__pack_orders__quantity'), 0),
-                             country=F('packs__pack_orders__order__order_address__country'),
-                             province=F('packs__pack_orders__order__order_address__province'))
+    def get_sales_rollup(self, by_province=False, from_facts=False):
+        """
+        Geographic sales rollup
+        ----
+        `(product_id, country, quantity)` tuples, or
+        `(product_id, country, province, quantity)` with `by_province`,
+        grouped in SQL. Products without sales are left out. Iterate with
+        `.iterator()` to stream large rollups.
+        """
+        destinations = ['country', 'province'] if by_province else ['country']
+        return self.order_by() \
+            .values('id', **get_sales_destinations(destinations, from_facts)) \
+            .annotate(quantity=Sum(get_sales_quantity_path(from_facts))) \
+            .filter(quantity__isnull=False) \
+            .values_list('id', *destinations, 'quantity') \
+            .order_by('id', '-quantity')
+
+    def iter_sales_rollup(self, by_province=False, top=None, from_facts=False, chunk_size=2000):
+        """
+        Streams the tuples of `get_sales_rollup`, `chunk_size` rows per
+        fetch. With `top` only the `top` destinations of each product by
+        quantity are kept, ranked by a `ROW_NUMBER()` window in SQL.
+        """
+        rollup = self.get_sales_rollup(by_province, from_facts)
+        if top is None:
+            yield from rollup.iterator(chunk_size=chunk_size)
+            return
+
+        # filtering on a window function needs an outer query
+        sql, params = rollup.query.sql_with_params()
+        ranked_sql = (
+            'SELECT * FROM ('
+            'SELECT rollup.*, ROW_NUMBER() OVER '
+            '(PARTITION BY rollup.id ORDER BY rollup.quantity DESC) AS sales_rank '
+            f'FROM ({sql}) rollup'
+            ') ranked WHERE sales_rank <= %s ORDER BY id, sales_rank'
+        )
+        with connections[self.db].chunked_cursor() as cursor:
+            cursor.execute(ranked_sql, (*params, top))
+            while rows := cursor.fetchmany(chunk_size):
+                for row in rows:
+                    yield row[:-1]
 
-    def get_profit_per_product(self):
+    def get_profit_per_product(self, from_facts=False):
         """get profit by subtracting the cost
         from the buy price multiplied by the quantity"""
+        if from_facts:
+            return self.annotate(profit=get_sales_fact_subquery('profit'))
         return self.annotate(profit=Coalesce(Sum(F('packs__pack_orders__quantity') * (
                 F('packs__pack_orders__cost') - F('packs__pack_orders__buy_price'))), None))
 
@@ -221,26 +332,12 @@ class AnnotationQuerySet(QuerySet):
         attribute on Queryset
         """
         ProductGallery = apps.get_model('warehouse', 'ProductGallery')
-        first_img = ProductGallery.objects \
-            .filter(product_id=OuterRef('pk')) \
-            .annotate(first_pic=F('picture')) \
-            .filter(image_status='first') \
-            .values('first_pic')
-        second_img = ProductGallery.objects \
-            .filter(product_id=OuterRef('pk')) \
-            .annotate(second_pic=F('picture')) \
-            .filter(image_status='second') \
-            .values('second_pic')
         return self.prefetch_related(
             Prefetch('galleries',
                      queryset=ProductGallery.objects
                      .filter(image_status='other'),
                      to_attr='other_pic')
-        ). \
-            annotate(
-            first_pic=Subquery(first_img, output_field=ImageField()),
-            second_pic=Subquery(second_img, output_field=ImageField())
-        )
+        ).prefetch_image_manifest()
 
     def get_default_picture(self):
         """get default picture for product
@@ -248,13 +345,24 @@ class AnnotationQuerySet(QuerySet):
         Get default with `default_pic` attribute on Queryset
         """
         ProductGallery = apps.get_model('warehouse', 'ProductGallery')
-        return self.filter(galleries__is_default=True) \
+        default_gallery = ProductGallery.objects \
+            .filter(product_id=OuterRef('pk'), is_default=True)
+        return self.filter(Exists(default_gallery)) \
             .prefetch_related(Prefetch('galleries',
                                        queryset=ProductGallery.dal.get_default())) \
-            .annotate(default_pic=F('galleries__picture'))
+            .prefetch_image_manifest()
 
 
 class BaseProductQuerySet(QuerySet):
+    def prefetch_image_manifest(self):
+        """
+        Set `first_pic`, `second_pic` and `default_pic` on the fetched
+        products from their cached image manifests, loading the missing
+        ones with a single grouped query. `values()` rows have no pictures,
+        `iterator()` needs a `chunk_size` to prefetch them.
+        """
+        return self.prefetch_related('image_manifest')
+
     def get_actives(self, is_active=True):
         """Get all active/inactive products"""
         return self.filter(is_active=is_active)
@@ -268,8 +376,12 @@ class BaseProductQuerySet(QuerySet):
 
         Get default with `pack` attribute on Queryset
         """
+        return self.filter(packs__is_default=True).prefetch_default_pack()
+
+    def prefetch_default_pack(self):
+        """prefetch default pack of each product into `pack` attribute"""
         Pack = apps.get_model("warehouse", "Pack")
-        return self.filter(packs__is_default=True).prefetch_related(
+        return self.prefetch_related(
             Prefetch(
                 'packs',
                 Pack.dal.get_default(is_default=True),
@@ -308,10 +420,18 @@ class ProductQuerySet(BaseProductQuerySet, AnnotationQuerySet, ReportQuerySet):
         return self.prefetch_related('packs') \
             .prefetch_related('packs__color')
 
-    def get_available_items(self, fields=None):
+    def get_available_items(self, fields=None, use_read_model=None):
         """
         Get necessary items needed to load a product page.
+
+        PARAMS
+        ------
+        `use_read_model` : bool
+            read the precomputed values from `ProductListing` instead of
+            computing them, defaults to `PRODUCT_LISTING_READ_MODEL` setting.
         """
+        if use_read_model is None:
+            use_read_model = settings.PRODUCT_LISTING_READ_MODEL
         if fields is None:
             fields = [
                 'title',
@@ -325,6 +445,8 @@ class ProductQuerySet(BaseProductQuerySet, AnnotationQuerySet, ReportQuerySet):
                 'category',
                 'created'
             ]
+        if use_read_model:
+            return self.get_available_items_from_listing(fields)
         return self.get_actives() \
             .get_active_category() \
             .select_related('brand') \
@@ -338,3 +460,33 @@ class ProductQuerySet(BaseProductQuerySet, AnnotationQuerySet, ReportQuerySet):
             .get_default_picture() \
             .order_by('-total_actual_count_stock') \
             .only(*fields)
+
+    def get_available_items_from_listing(self, fields):
+        """
+        Same attributes as `get_available_items` read from the
+        `ProductListing` read model.
+        """
+        ProductGallery = apps.get_model('warehouse', 'ProductGallery')
+        return self.filter(listing__is_listable=True) \
+            .select_related('brand') \
+            .get_related_packs() \
+            .prefetch_default_pack() \
+            .prefetch_related(
+                Prefetch('galleries',
+                         queryset=ProductGallery.objects
+                         .filter(image_status='other'),
+                         to_attr='other_pic')) \
+            .annotate(
+                total_actual_count_stock=F('listing__total_actual_count_stock'),
+                count_stock=F('listing__count_stock'),
+                total_active_packs=F('listing__total_active_packs'),
+                default_pack_price=ExpressionWrapper(
+                    F('listing__default_pack_price'),
+                    output_field=MoneyRialCurrencyOutput()),
+                default_pack_price_currency=F('listing__default_pack_price_currency'),
+                pack_sku=F('listing__default_pack_sku'),
+                first_pic=F('listing__first_pic'),
+                second_pic=F('listing__second_pic'),
+                default_pic=F('listing__default_pic')) \
+            .order_by('-total_actual_count_stock') \
+            .only(*fields)
@@ -1,5 +1,7 @@
 from django.db.models import (
     QuerySet,
+    Max,
+    Q,
 )
 
 
@@ -8,3 +10,19 @@ class ProductGalleryQuerySet(QuerySet):
     def get_default(self):
         """Get all default galleries"""
         return self.filter(is_default=True)
+
+    def get_image_manifest(self, product_ids):
+        """
+        Pivot the galleries of the given products into one row per product
+        in a single grouped query.
+
+        Get `product_id`, `first_pic`, `second_pic` and `default_pic`
+        """
+        return self.filter(product_id__in=product_ids) \
+            .order_by() \
+            .values('product_id') \
+            .annotate(
+                first_pic=Max('picture', filter=Q(image_status='first')),
+                second_pic=Max('picture', filter=Q(image_status='second')),
+                default_pic=Max('picture', filter=Q(is_default=True))
+            )
@@ -0,0 +1,177 @@
+import threading
+import time
+from array import array
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+CATEGORY_TREE_VERSION_KEY = 'warehouse:category-tree:version'
+
+_lock = threading.Lock()
+_snapshot = None
+_checked_at = 0.0
+
+
+class CategoryTreeSnapshot:
+    """
+    Immutable copy of the whole category tree held by each process.
+
+    Nodes are stored in parallel arrays ordered by (`tree_id`, `lft`), so a
+    parent is always stored before its children. Ancestors and the
+    "all ancestors active" flag are precomputed per node, so both lookups
+    are O(1).
+    """
+    __slots__ = (
+        'version',
+        'ids',
+        'parents',
+        'lfts',
+        'rghts',
+        'tree_ids',
+        'is_active',
+        'titles',
+        'all_active',
+        'ancestors',
+        'positions',
+    )
+
+    def __init__(self, version, rows):
+        self.version = version
+        self.ids = array('q')
+        self.parents = array('q')
+        self.lfts = array('q')
+        self.rghts = array('q')
+        self.tree_ids = array('q')
+        self.is_active = bytearray()
+        self.titles = list()
+        self.all_active = bytearray()
+        self.ancestors = list()
+        self.positions = dict()
+
+        for position, (pk, parent_id, lft, rght, tree_id, is_active, title) \
+                in enumerate(rows):
+            parent = self.positions.get(parent_id, -1)
+            self.positions[pk] = position
+            self.ids.append(pk)
+            self.parents.append(parent)
+            self.lfts.append(lft)
+            self.rghts.append(rght)
+            self.tree_ids.append(tree_id)
+            self.is_active.append(bool(is_active))
+            self.titles.append(title)
+            if parent == -1:
+                self.all_active.append(bool(is_active))
+                self.ancestors.append((position,))
+            else:
+                self.all_active.append(bool(is_active) and self.all_active[parent])
+                self.ancestors.append(self.ancestors[parent] + (position,))
+
+    def __contains__(self, category_id):
+        return category_id in self.positions
+
+    def __len__(self):
+        return len(self.ids)
+
+    def get_ancestor_ids(self, category_id, include_self=True):
+        """
+        ids of the ancestors of the category from the root down, None when
+        the category is not in the snapshot.
+        """
+        position = self.positions.get(category_id)
+        if position is None:
+            return None
+        positions = self.ancestors[position]
+        if not include_self:
+            positions = positions[:-1]
+        return [self.ids[position] for position in positions]
+
+    def get_ancestor_titles(self, category_id, include_self=True):
+        """
+        titles of the ancestors of the category from the root down, None
+        when the category is not in the snapshot.
+        """
+        position = self.positions.get(category_id)
+        if position is None:
+            return None
+        positions = self.ancestors[position]
+        if not include_self:
+            positions = positions[:-1]
+        return [self.titles[position] for position in positions]
+
+    def is_all_ancestors_active(self, category_id):
+        """
+        whether the category and all of its ancestors are active, False
+        when the category is not in the snapshot.
+        """
+        position = self.positions.get(category_id)
+        return position is not None and bool(self.all_active[position])
+
+
+def load_category_tree(version):
+    Category = apps.get_model('warehouse', 'Category')
+    rows = Category.objects.order_by('tree_id', 'lft').values_list(
+        'id', 'parent_id', 'lft', 'rght', 'tree_id', 'is_active', 'title')
+    return CategoryTreeSnapshot(version, rows.iterator())
+
+
+def get_category_tree_version():
+    version = cache.get(CATEGORY_TREE_VERSION_KEY)
+    if version is None:
+        cache.add(CATEGORY_TREE_VERSION_KEY, 1, timeout=None)
+        version = cache.get(CATEGORY_TREE_VERSION_KEY, 1)
+    return version
+
+
+def get_category_tree():
+    """
+    Returns the category tree snapshot of this process.
+
+    The shared version key is read at most once every
+    `CATEGORY_TREE_VERSION_CHECK_INTERVAL` seconds and the tree is reloaded
+    only when the version has changed. A category unknown to the snapshot
+    does not reload it, lookups of it return None.
+    """
+    global _snapshot, _checked_at
+
+    now = time.monotonic()
+    snapshot = _snapshot
+    if snapshot is not None and \
+            now - _checked_at < settings.CATEGORY_TREE_VERSION_CHECK_INTERVAL:
+        return snapshot
+
+    version = get_category_tree_version()
+    if snapshot is not None and snapshot.version == version:
+        _checked_at = now
+        return snapshot
+
+    with _lock:
+        if _snapshot is None or _snapshot.version != version:
+            _snapshot = load_category_tree(version)
+        _checked_at = now
+        return _snapshot
+
+
+def increment_category_tree_version():
+    global _snapshot
+
+    cache.add(CATEGORY_TREE_VERSION_KEY, 1, timeout=None)
+    try:
+        cache.incr(CATEGORY_TREE_VERSION_KEY)
+    except ValueError:
+        cache.set(CATEGORY_TREE_VERSION_KEY, 2, timeout=None)
+    _snapshot = None
+
+
+def bump_category_tree_version():
+    """
+    Marks every process' snapshot as stale. Call it after changing
+    categories with queryset `update` or other paths skipping signals.
+
+    The version is bumped now and again once the current transaction
+    commits, a snapshot reloaded from the uncommitted tree in between is
+    not kept.
+    """
+    increment_category_tree_version()
+    transaction.on_commit(increment_category_tree_version)
@@ -1,12 +1,244 @@
+import json
+import threading
+import time
+from decimal import Decimal
+
+from django.apps import apps
 from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.module_loading import import_string
 
 from django.db.models import (
                         F,
                         Case,
-                        When)
+                        When,
+                        Value)
 
 from painless.models.fields import MoneyCurrencyOutput
 
+EXCHANGE_RATES = {
+    'USD': {
+        'R': 400000,
+        'T': 40000,
+    },
+    'R': {
+        'USD': 2.5e-06,
+        'T': 0.1,
+    },
+    'T': {
+        'USD': 2.5e-05,
+        'R': 10,
+    }
+}
+
+# Lookup prefix from each queryset's model to the expense price fields.
+JOIN_PATHS = {
+    'ExpenseQuerySet': '',
+    'PackQuerySet': 'expense__',
+    'PackCartQuerySet': 'pack__expense__',
+    'PackOrderQuerySet': 'pack__expense__',
+    'ProductQuerySet': 'packs__expense__',
+}
+
+
+class FileRateBackend:
+    """
+    Reads the rate matrix from a JSON file shaped like `EXCHANGE_RATES`,
+    or from `EXCHANGE_RATES` itself when no file is given.
+    """
+    def __init__(self, path=None):
+        self.path = path
+
+    def get_rates(self):
+        if self.path is None:
+            return EXCHANGE_RATES
+        with open(self.path) as rates_file:
+            return json.load(rates_file)
+
+
+class DatabaseRateBackend:
+    """
+    Reads the latest effective rate of each currency pair from the
+    `ExchangeRate` table. The inverse of a pair read from the table
+    replaces the file backend's one, unless the table has that direction
+    too. Other pairs missing from the table are taken from the file
+    backend.
+    """
+    def __init__(self, path=None):
+        self.fallback = FileRateBackend(path)
+
+    def get_rates(self):
+        ExchangeRate = apps.get_model('warehouse', 'ExchangeRate')
+        rates = {currency: dict(quotes)
+                 for currency, quotes in self.fallback.get_rates().items()}
+        latest_rates = ExchangeRate.objects \
+            .filter(effective_date__lte=timezone.now()) \
+            .order_by('base_currency', 'quote_currency', '-effective_date') \
+            .distinct('base_currency', 'quote_currency') \
+            .values_list('base_currency', 'quote_currency', 'rate')
+        latest_rates = {(base_currency, quote_currency): rate
+                        for base_currency, quote_currency, rate in latest_rates}
+        for (base_currency, quote_currency), rate in latest_rates.items():
+            rates.setdefault(base_currency, dict())[quote_currency] = rate
+            if rate and (quote_currency, base_currency) not in latest_rates:
+                rates.setdefault(quote_currency, dict())[base_currency] = \
+                    1 / Decimal(str(rate))
+        return rates
+
+
+class RateMatrix:
+    """
+    A loaded set of rates identified by `version`. Missing inverse pairs are
+    derived from the known direction.
+    """
+    def __init__(self, version, rates):
+        self.version = version
+        self.rates = dict()
+        for base_currency, quotes in rates.items():
+            for quote_currency, rate in quotes.items():
+                self.rates[(base_currency.upper(), quote_currency.upper())] = \
+                    Decimal(str(rate))
+        for (base_currency, quote_currency), rate in list(self.rates.items()):
+            if rate and (quote_currency, base_currency) not in self.rates:
+                self.rates[(quote_currency, base_currency)] = 1 / rate
+        self.currencies = {currency for pair in self.rates for currency in pair}
+
+    def get_rate(self, input_currency, output_currency):
+        if input_currency == output_currency:
+            return Decimal(1)
+        try:
+            return self.rates[(input_currency, output_currency)]
+        except KeyError:
+            raise ValueError(f'given currencies: `{input_currency}`, `{output_currency}` '
+                             f'not in accepted currencies: {self.currencies}')
+
+
+class CurrencyRateProvider:
+    """
+    Keeps the current rate matrix of the process in memory.
+
+    The matrix is reloaded from the backend when it is older than `ttl`
+    seconds, so newly effective rates are picked up, or as soon as the
+    shared version key changes. The version key is read at most once a
+    second.
+    `Case` expressions converting prices are built once per rate version,
+    target currency and join path.
+    """
+    VERSION_KEY = 'warehouse:currency-rates:version'
+    VERSION_CHECK_INTERVAL = 1
+
+    def __init__(self, backend=None, ttl=None):
+        self.backend = backend
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._loaded_at = 0.0
+        self._checked_at = 0.0
+        self._cases = dict()
+
+    def get_backend(self):
+        if self.backend is None:
+            backend_class = import_string(settings.CURRENCY_RATE_BACKEND)
+            self.backend = backend_class(settings.CURRENCY_RATE_FILE)
+        return self.backend
+
+    def get_ttl(self):
+        return settings.CURRENCY_RATE_TTL if self.ttl is None else self.ttl
+
+    @classmethod
+    def get_version(cls):
+        version = cache.get(cls.VERSION_KEY)
+        if version is None:
+            cache.add(cls.VERSION_KEY, 1, timeout=None)
+            version = cache.get(cls.VERSION_KEY, 1)
+        return version
+
+    def invalidate(self):
+        """marks the rate matrix of every process as stale."""
+        cache.add(self.VERSION_KEY, 1, timeout=None)
+        try:
+            cache.incr(self.VERSION_KEY)
+        except ValueError:
+            cache.set(self.VERSION_KEY, 2, timeout=None)
+        self._matrix = None
+
+    def get_matrix(self):
+        now = time.monotonic()
+        matrix = self._matrix
+        if matrix is not None and now - self._checked_at < self.VERSION_CHECK_INTERVAL:
+            return matrix
+
+        version = self.get_version()
+        with self._lock:
+            if self._matrix is None or self._matrix.version != version \
+                    or now - self._loaded_at >= self.get_ttl():
+                self._matrix = RateMatrix(version, self.get_backend().get_rates())
+                self._cases = dict()
+                self._loaded_at = now
+            self._checked_at = now
+            return self._matrix
+
+    def get_currencies(self):
+        return self.get_matrix().currencies
+
+    def normalize_currency(self, currency):
+        currency = str(currency).upper()
+        if currency not in self.get_currencies():
+            raise ValueError(f'given currency: `{currency}` '
+                             f'not in accepted currencies: {self.get_currencies()}')
+        return currency
+
+    def get_rate(self, input_currency, output_currency):
+        return self.get_matrix().get_rate(str(input_currency).upper(),
+                                          str(output_currency).upper())
+
+    def convert(self, amount, input_currency, output_currency):
+        return Decimal(amount) * self.get_rate(input_currency, output_currency)
+
+    def get_case(self,
+                 output_currency,
+                 prefix='',
+                 field='price',
+                 output_field=None):
+        """
+        Returns the `Case` converting `{prefix}{field}` to `output_currency`.
+        """
+        matrix = self.get_matrix()
+        output_currency = self.normalize_currency(output_currency)
+        key = (output_currency, prefix, field,
+               None if output_field is None else type(output_field))
+        cases = self._cases
+        if key not in cases:
+            cases[key] = Case(
+                *[When(**{f'{prefix}{field}_currency': currency},
+                       then=F(f'{prefix}{field}')
+                       * Value(matrix.get_rate(currency, output_currency)))
+                  for currency in sorted(matrix.currencies)],
+                output_field=output_field or MoneyCurrencyOutput(output_currency)
+            )
+        return cases[key]
+
+
+rate_provider = CurrencyRateProvider()
+
+
+def get_exchange_rate(input_currency, output_currency):
+    """
+    Returns the rate converting `input_currency` to `output_currency`.
+    """
+    return rate_provider.get_rate(input_currency, output_currency)
+
+
+def convert_amount(amount,
+                   input_currency,
+                   output_currency=settings.DEFAULT_CURRENCY_SHOW_ON_SITE):
+    """
+    Converts a single amount in Python, using the same rates as
+    `convert_currency`.
+    """
+    return rate_provider.convert(amount, input_currency, output_currency)
+
 
 def convert_currency(self,
                      output_currency=settings.DEFAULT_CURRENCY_SHOW_ON_SITE):
@@ -14,73 +246,10 @@ def convert_currency(self,
     Converts the price of all packs to the given currency,
     stores it in `converted_price` attribute.
     """
-    # TODO: make this method accept PackCart and Pack.
-    exchange_rates = {
-        'USD': {
-            'R': 400000,
-            'T': 40000,
-        },
-        'R': {
-            'USD': 2.5e-06,
-            'T': 0.1,
-        },
-        'T': {
-            'USD': 2.5e-05,
-            'R': 10,
-        }
-    }
-    if output_currency.upper() not in exchange_rates.keys():
-        raise ValueError(f'given currency: `{output_currency}` '
-                         f'not in accepted currencies: {exchange_rates.keys()}')
-    else:
-        output_currency = output_currency.upper()
-    my_list = list()
-    if type(self).__name__ == 'ExpenseQuerySet':
-        for currency in exchange_rates.keys():
-            if currency == output_currency:
-                rate = 1
-            else:
-                rate = exchange_rates[currency][output_currency]
-            my_list.append(
-                When(price_currency=currency, then=F('price') * rate),
-            )
-        qs = self.annotate(
-                converted_price=Case(
-                    *my_list,
-                    output_field=MoneyCurrencyOutput(output_currency)
-                    )
-                )
-    elif type(self).__name__ == 'PackQuerySet':
-        for currency in exchange_rates.keys():
-            if currency == output_currency:
-                rate = 1
-            else:
-                rate = exchange_rates[currency][output_currency]
-            my_list.append(
-                When(expense__price_currency=currency, then=F('expense__price') * rate),
-            )
-        qs = self.annotate(
-                converted_price=Case(
-                    *my_list,
-                    output_field=MoneyCurrencyOutput(output_currency)
-                )
-            )
-    elif type(self).__name__ in ['PackCartQuerySet', 'PackOrderQuerySet']:
-        for currency in exchange_rates.keys():
-            if currency == output_currency:
-                rate = 1
-            else:
-                rate = exchange_rates[currency][output_currency]
-            my_list.append(
-                When(pack__expense__price_currency=currency, then=F('pack__expense__price') * rate),
-            )
-        qs = self.annotate(
-                converted_price=Case(
-                    *my_list,
-                    output_field=MoneyCurrencyOutput(output_currency)
-                )
-            )
-
-    else:
+    try:
+        prefix = JOIN_PATHS[type(self).__name__]
+    except KeyError:
         raise ValueError(f'{self} does not have access to convert_currency.')
-    return qs
+    return self.annotate(
+        converted_price=rate_provider.get_case(output_currency, prefix)
+    )
@@ -0,0 +1,103 @@
+from operator import (
+    attrgetter,
+    itemgetter
+)
+from typing import (
+    Dict,
+    Iterable
+)
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+
+IMAGE_MANIFEST_KEY = 'warehouse:image-manifest:{product_id}'
+IMAGE_MANIFEST_FIELDS = ('first_pic', 'second_pic', 'default_pic')
+
+
+def load_image_manifests(product_ids: Iterable[int]) -> Dict[int, dict]:
+    """
+    Reads the picture paths of the given products from the database.
+    Products without galleries get an empty manifest.
+    """
+    ProductGallery = apps.get_model('warehouse', 'ProductGallery')
+    product_ids = list(product_ids)
+    manifests = {product_id: dict.fromkeys(IMAGE_MANIFEST_FIELDS)
+                 for product_id in product_ids}
+    rows = ProductGallery.dal.get_queryset().get_image_manifest(product_ids)
+    for row in rows:
+        manifests[row['product_id']] = {field: row[field] or None
+                                        for field in IMAGE_MANIFEST_FIELDS}
+    return manifests
+
+
+def get_image_manifests(product_ids: Iterable[int]) -> Dict[int, dict]:
+    """
+    Picture paths of the given products, `first_pic`, `second_pic` and
+    `default_pic`, read from the cache. Products missing from the cache are
+    loaded with one query and cached until one of their galleries changes.
+    """
+    keys = {IMAGE_MANIFEST_KEY.format(product_id=product_id): product_id
+            for product_id in set(product_ids)}
+    cached = cache.get_many(keys)
+    manifests = {keys[key]: manifest for key, manifest in cached.items()}
+
+    missing = [product_id for key, product_id in keys.items() if key not in cached]
+    if missing:
+        loaded = load_image_manifests(missing)
+        cache.set_many(
+            {IMAGE_MANIFEST_KEY.format(product_id=product_id): manifest
+             for product_id, manifest in loaded.items()},
+            timeout=settings.IMAGE_MANIFEST_TIMEOUT
+        )
+        manifests.update(loaded)
+    return manifests
+
+
+def invalidate_image_manifest(product_id: int) -> None:
+    cache.delete(IMAGE_MANIFEST_KEY.format(product_id=product_id))
+
+
+class ImageManifestDescriptor:
+    """
+    `image_manifest` of a product: its picture paths, also set on the
+    product as `first_pic`, `second_pic` and `default_pic`.
+
+    Read alone it loads the manifest of one product. With
+    `prefetch_related('image_manifest')` the manifests of all fetched
+    products are read from the cache at once, the missing ones with a
+    single grouped query.
+    """
+    cache_name = '_image_manifest'
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        if not self.is_cached(instance):
+            self.__set__(instance, get_image_manifests([instance.pk])[instance.pk])
+        return instance.__dict__[self.cache_name]
+
+    def __set__(self, instance, manifest):
+        manifest = {field: (manifest or dict()).get(field)
+                    for field in IMAGE_MANIFEST_FIELDS}
+        instance.__dict__[self.cache_name] = manifest
+        for field, path in manifest.items():
+            setattr(instance, field, path)
+
+    def is_cached(self, instance):
+        return self.cache_name in instance.__dict__
+
+    def get_prefetch_queryset(self, instances, queryset=None):
+        """hook of `prefetch_related`, one manifest per product."""
+        manifests = get_image_manifests(instance.pk for instance in instances)
+        rows = [dict(manifest, product_id=product_id)
+                for product_id, manifest in manifests.items()]
+        return (rows,
+                itemgetter('product_id'),
+                attrgetter('pk'),
+                True,
+                self.name,
+                True)
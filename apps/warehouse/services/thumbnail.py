@@ -0,0 +1,106 @@
+import atexit
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    Iterable,
+    List
+)
+
+import django
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def get_thumbnail_specs() -> List[dict]:
+    """
+    Geometries generated for every gallery picture, each one is a dict of
+    `geometry` and the sorl options, e.g. `crop`, `quality`.
+    """
+    return [dict(spec) for spec in settings.THUMBNAIL_PREGENERATE]
+
+
+def generate_thumbnails(name: str, specs: Iterable[dict]) -> int:
+    """
+    Generates the thumbnails of the picture stored under `name`. sorl
+    stores each one and records it in its key-value store, so the first
+    render of a page finds it ready. Returns the number of thumbnails.
+    """
+    from sorl.thumbnail import get_thumbnail
+
+    total = 0
+    for spec in specs:
+        options = dict(spec)
+        geometry = options.pop('geometry')
+        get_thumbnail(name, geometry, **options)
+        total += 1
+    return total
+
+
+class ThumbnailPipeline:
+    """
+    Generates gallery thumbnails in a pool of worker processes.
+
+    Workers are spawned, not forked, so they do not share the database or
+    cache connections of the web process, and set Django up on start.
+    The pool is created on the first `enqueue` and is sized by
+    `THUMBNAIL_PREGENERATE_WORKERS`. With `THUMBNAIL_PREGENERATE_ASYNC`
+    off, thumbnails are generated in the calling process instead.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=settings.THUMBNAIL_PREGENERATE_WORKERS,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=django.setup,
+                )
+                atexit.register(self.shutdown)
+            return self._executor
+
+    def shutdown(self, wait=False):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=not wait)
+                self._executor = None
+
+    def enqueue(self, name: str):
+        """
+        Schedules the thumbnails of the picture stored under `name`.
+        Returns the future of the job, or None when generated in place.
+        """
+        if not name:
+            return None
+        specs = get_thumbnail_specs()
+        if not settings.THUMBNAIL_PREGENERATE_ASYNC:
+            self.run(name, specs)
+            return None
+
+        future = self.get_executor().submit(generate_thumbnails, name, specs)
+        future.add_done_callback(lambda done: self.log_result(name, done))
+        return future
+
+    def run(self, name: str, specs: Iterable[dict]) -> int:
+        try:
+            return generate_thumbnails(name, specs)
+        except Exception as e:
+            logger.error(f"failed to generate thumbnails of {name}: {e}",
+                         exc_info=True)
+            return 0
+
+    @staticmethod
+    def log_result(name, future):
+        exception = future.exception()
+        if exception is not None:
+            logger.error(f"failed to generate thumbnails of {name}: {exception}")
+        else:
+            logger.debug(f"{future.result()} thumbnails of {name} are generated")
+
+
+thumbnail_pipeline = ThumbnailPipeline()
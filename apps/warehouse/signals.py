@@ -0,0 +1,133 @@
+from django.db.models.signals import (
+    pre_save,
+    post_save,
+    post_delete
+)
+from django.db import transaction
+from django.dispatch import receiver
+from mptt.signals import node_moved
+
+from warehouse.models import (
+    Category,
+    ExchangeRate,
+    Expense,
+    ExpensePrice,
+    Pack,
+    Product,
+    ProductGallery,
+    ProductListing
+)
+from painless.api.cache import bump_generation
+
+from warehouse.services.category_tree import bump_category_tree_version
+from warehouse.services.currency import rate_provider
+from warehouse.services.image_manifest import invalidate_image_manifest
+from warehouse.services.thumbnail import thumbnail_pipeline
+
+
+# ############################### #
+#         PRODUCT LISTING         #
+# ############################### #
+@receiver([post_save, post_delete], sender=Product,
+          dispatch_uid='product_listing_product')
+def refresh_listing_on_product_change(sender, instance, **kwargs):
+    ProductListing.bll.schedule_refresh([instance.id])
+
+
+@receiver([post_save, post_delete], sender=Pack,
+          dispatch_uid='product_listing_pack')
+def refresh_listing_on_pack_change(sender, instance, **kwargs):
+    ProductListing.bll.schedule_refresh([instance.product_id])
+
+
+@receiver([post_save, post_delete], sender=Expense,
+          dispatch_uid='product_listing_expense')
+def refresh_listing_on_expense_change(sender, instance, **kwargs):
+    product_ids = Pack.objects.filter(id=instance.pack_id) \
+        .values_list('product_id', flat=True)
+    ProductListing.bll.schedule_refresh(product_ids)
+
+
+@receiver([post_save, post_delete], sender=ProductGallery,
+          dispatch_uid='product_listing_product_gallery')
+def refresh_listing_on_gallery_change(sender, instance, **kwargs):
+    ProductListing.bll.schedule_refresh([instance.product_id])
+
+
+@receiver(post_save, sender=Category,
+          dispatch_uid='product_listing_category')
+def refresh_listing_on_category_change(sender, instance, **kwargs):
+    product_ids = Product.objects.filter(category_id=instance.id) \
+        .values_list('id', flat=True)
+    ProductListing.bll.schedule_refresh(product_ids)
+
+
+# ############################### #
+#          CATEGORY TREE          #
+# ############################### #
+@receiver([post_save, post_delete, node_moved], sender=Category,
+          dispatch_uid='category_tree_version')
+def bump_category_tree_on_category_change(sender, instance, **kwargs):
+    bump_category_tree_version()
+
+
+# ############################### #
+#         EXCHANGE RATES          #
+# ############################### #
+@receiver([post_save, post_delete], sender=ExchangeRate,
+          dispatch_uid='exchange_rate_version')
+def invalidate_rates_on_exchange_rate_change(sender, instance, **kwargs):
+    rate_provider.invalidate()
+    transaction.on_commit(rate_provider.invalidate)
+    ExpensePrice.bll.schedule_reprice()
+
+
+# ############################### #
+#         EXPENSE PRICES          #
+# ############################### #
+@receiver(post_save, sender=Expense,
+          dispatch_uid='expense_price_expense')
+def reprice_on_expense_change(sender, instance, **kwargs):
+    transaction.on_commit(lambda: ExpensePrice.bll.reprice([instance.id]))
+
+
+# ############################### #
+#       API RESULT CACHE          #
+# ############################### #
+@receiver([post_save, post_delete], sender=Product,
+          dispatch_uid='result_cache_product')
+@receiver([post_save, post_delete], sender=Pack,
+          dispatch_uid='result_cache_pack')
+@receiver([post_save, post_delete], sender=Expense,
+          dispatch_uid='result_cache_expense')
+def bump_result_cache_generation(sender, instance, **kwargs):
+    bump_generation(sender._meta.label)
+
+
+# ############################### #
+#         IMAGE MANIFEST          #
+# ############################### #
+@receiver([post_save, post_delete], sender=ProductGallery,
+          dispatch_uid='image_manifest_product_gallery')
+def invalidate_image_manifest_on_gallery_change(sender, instance, **kwargs):
+    product_id = instance.product_id
+    invalidate_image_manifest(product_id)
+    transaction.on_commit(lambda: invalidate_image_manifest(product_id))
+
+
+# ############################### #
+#           THUMBNAILS            #
+# ############################### #
+@receiver(pre_save, sender=ProductGallery,
+          dispatch_uid='thumbnail_product_gallery_pre_save')
+def mark_uploaded_picture(sender, instance, **kwargs):
+    # An uploaded file is not committed to the storage until the model saves
+    instance._is_picture_uploaded = not getattr(instance.picture, '_committed', True)
+
+
+@receiver(post_save, sender=ProductGallery,
+          dispatch_uid='thumbnail_product_gallery_post_save')
+def pregenerate_thumbnails_on_upload(sender, instance, created, **kwargs):
+    if created or getattr(instance, '_is_picture_uploaded', False):
+        name = instance.picture.name
+        transaction.on_commit(lambda: thumbnail_pipeline.enqueue(name))
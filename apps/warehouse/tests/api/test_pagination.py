@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from painless.api.pagination import KeysetPagination
+from painless.utils.decorators import disable_logging
+
+from warehouse.repository.generator_layer import WarehouseDataGenerator
+from warehouse.models import Product
+
+
+class KeysetPaginationTest(TestCase):
+    PAGE_SIZE = 2
+
+    @classmethod
+    @disable_logging
+    def setUpClass(cls) -> None:
+        super(KeysetPaginationTest, cls).setUpClass()
+
+        # Warehouse Data Generator
+        warehouse_dgl = WarehouseDataGenerator()
+        brands = warehouse_dgl.create_brands(2)
+        categories = warehouse_dgl.create_categories(5)
+        tags = warehouse_dgl.create_tags(2)
+        warehouse_dgl.create_products(brands, categories, tags, 9)
+
+    def setUp(self):
+        # every `created` falls in the same millisecond
+        created = timezone.now().replace(microsecond=500000)
+        for position, product_id in enumerate(
+                Product.objects.order_by('id').values_list('id', flat=True)):
+            Product.objects.filter(id=product_id).update(
+                created=created + timedelta(microseconds=(position * 7) % 9))
+
+    def walk_pages(self, ordering):
+        ids = list()
+        params = {'page_size': self.PAGE_SIZE}
+        while True:
+            paginator = KeysetPagination()
+            request = Request(APIRequestFactory().get('/products/', params))
+            page = paginator.paginate_queryset(
+                Product.objects.order_by(*ordering), request)
+            ids.extend(product.id for product in page)
+            next_link = paginator.get_next_link()
+            if next_link is None:
+                return ids
+            params['cursor'] = Request(APIRequestFactory().get(next_link)) \
+                .query_params['cursor']
+
+    def test_microsecond_keys_across_pages(self):
+        for ordering in (['-created'], ['created']):
+            actual = self.walk_pages(ordering)
+            expected = list(Product.objects.order_by(*ordering, 'id')
+                            .values_list('id', flat=True))
+            self.assertListEqual(
+                actual,
+                expected,
+                msg=f"Keyset pages ordered by {ordering} skip or repeat rows "
+                    f"whose `created` differ in microseconds only"
+            )
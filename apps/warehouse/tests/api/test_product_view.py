@@ -0,0 +1,39 @@
+import importlib
+
+from django.test import TestCase
+from django.utils import timezone
+
+from warehouse.api.views import product as product_views
+from warehouse.models import ExchangeRate
+from warehouse.services.currency import rate_provider
+
+
+class ProductViewSetQuerysetTest(TestCase):
+    """
+        Test the product view reads the rates per request, not once when
+        its module is imported.
+    """
+    def setUp(self):
+        rate_provider.invalidate()
+
+    def tearDown(self):
+        rate_provider.invalidate()
+
+    def test_import_runs_no_query(self):
+        with self.assertNumQueries(0):
+            importlib.reload(product_views)
+
+    def test_rate_change_reaches_the_view(self):
+        view = product_views.ProductViewSet()
+        str(view.get_queryset().query)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ExchangeRate.objects.create(base_currency='USD', quote_currency='R',
+                                        rate=123457, effective_date=timezone.now())
+
+        sql = str(view.get_queryset().query)
+        self.assertIn(
+            '123457',
+            sql,
+            msg="The price expression of the view should use the new rate"
+        )
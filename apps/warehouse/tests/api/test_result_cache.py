@@ -0,0 +1,241 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from painless.api import cache as result_cache
+from painless.api.cache import (
+    ResultCacheMixin,
+    bump_generation,
+    get_generations
+)
+from painless.utils.decorators import disable_logging
+
+from warehouse.repository.generator_layer import WarehouseDataGenerator
+from warehouse.models import (
+    Expense,
+    Pack
+)
+
+LOCMEM_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'result-cache-tests',
+    }
+}
+
+
+class ProductListView(ResultCacheMixin):
+    result_cache_models = ('warehouse.Product', 'warehouse.Expense')
+    action = 'list'
+
+
+class PackListView(ResultCacheMixin):
+    result_cache_models = ('warehouse.Pack', )
+    action = 'list'
+
+
+@override_settings(CACHES=LOCMEM_CACHE,
+                   API_RESULT_CACHE_TIMEOUT=60,
+                   API_RESULT_CACHE_STALE_TIMEOUT=300)
+class ResultCacheMixinTest(TestCase):
+    """
+        Test the cached payload follows the generations of its models, is
+        served stale while one request rebuilds it and is keyed per query.
+    """
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.view = ProductListView()
+        self.builds = []
+
+    def get_request(self, params=None):
+        return Request(self.factory.get('/api/products/', params or {}))
+
+    def build_payload(self):
+        self.builds.append(1)
+        return {'build': len(self.builds)}
+
+    def get_payload(self, request=None, now=None):
+        request = request or self.get_request()
+        if now is None:
+            return self.view.get_cached_payload(request, self.build_payload)
+        with mock.patch.object(result_cache.time, 'time', return_value=now):
+            return self.view.get_cached_payload(request, self.build_payload)
+
+    def test_fresh_entry_is_reused(self):
+        first = self.get_payload()
+        second = self.get_payload()
+
+        self.assertEqual(
+            second,
+            first,
+            msg=f"Actual payload is `{second}` but the cached `{first}` is expected"
+        )
+        self.assertEqual(
+            len(self.builds),
+            1,
+            msg=f"The payload is built {len(self.builds)} times but expected once"
+        )
+
+    def test_generation_bump_invalidates(self):
+        self.get_payload()
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_generation('warehouse.Expense')
+
+        actual = self.get_payload()
+        expected = {'build': 2}
+        self.assertEqual(
+            actual,
+            expected,
+            msg=f"Actual payload after the bump is `{actual}` but expected is `{expected}`"
+        )
+
+    def test_unrelated_generation_keeps_entry(self):
+        self.get_payload()
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_generation('warehouse.Pack')
+
+        actual = self.get_payload()
+        expected = {'build': 1}
+        self.assertEqual(
+            actual,
+            expected,
+            msg=f"Actual payload is `{actual}` but a bump of another model should not rebuild it"
+        )
+
+    def test_bump_waits_for_commit(self):
+        before = get_generations(['warehouse.Expense'])
+        with self.captureOnCommitCallbacks(execute=False):
+            bump_generation('warehouse.Expense')
+
+        actual = get_generations(['warehouse.Expense'])
+        self.assertEqual(
+            actual,
+            before,
+            msg=f"Actual generations are `{actual}` before the commit but expected are `{before}`"
+        )
+
+    def test_stale_entry_served_while_locked(self):
+        self.get_payload(now=1000)
+        key = self.view.get_result_cache_key(self.get_request())
+        cache.add(f'{key}:lock', 1)
+
+        actual = self.get_payload(now=1000 + 61)
+        expected = {'build': 1}
+        self.assertEqual(
+            actual,
+            expected,
+            msg=f"Actual payload is `{actual}` but the stale `{expected}` should be served"
+        )
+        self.assertEqual(
+            len(self.builds),
+            1,
+            msg="Only the lock holder should rebuild the stale entry"
+        )
+
+    def test_lock_holder_rebuilds(self):
+        self.get_payload(now=1000)
+        key = self.view.get_result_cache_key(self.get_request())
+
+        actual = self.get_payload(now=1000 + 61)
+        expected = {'build': 2}
+        self.assertEqual(
+            actual,
+            expected,
+            msg=f"Actual payload is `{actual}` but the lock holder should rebuild `{expected}`"
+        )
+        self.assertIsNone(
+            cache.get(f'{key}:lock'),
+            msg="The lock should be released after the rebuild"
+        )
+        actual = self.get_payload(now=1000 + 62)
+        self.assertEqual(
+            actual,
+            expected,
+            msg=f"Actual payload is `{actual}` but the rebuilt `{expected}` should be fresh"
+        )
+
+    def test_keys_per_query_params(self):
+        key = self.view.get_result_cache_key
+        page_one = key(self.get_request({'page': 1, 'ordering': 'price'}))
+        page_two = key(self.get_request({'page': 2, 'ordering': 'price'}))
+        reordered = key(Request(self.factory.get('/api/products/?ordering=price&page=1')))
+
+        self.assertNotEqual(
+            page_one,
+            page_two,
+            msg="Each page should have its own cache entry"
+        )
+        self.assertEqual(
+            page_one,
+            reordered,
+            msg="The order of the query parameters should not change the key"
+        )
+        self.assertNotEqual(
+            page_one,
+            PackListView().get_result_cache_key(self.get_request({'page': 1, 'ordering': 'price'})),
+            msg="Each view should have its own cache entry"
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class StockGenerationTest(TestCase):
+    """
+        Stock changes made with `update` send no signal, they must still
+        invalidate the cached api results.
+    """
+    @classmethod
+    @disable_logging
+    def setUpClass(cls):
+        super(StockGenerationTest, cls).setUpClass()
+
+        # Warehouse Data Generator
+        warehouse_dgl = WarehouseDataGenerator()
+        brands = warehouse_dgl.create_brands(2)
+        categories = warehouse_dgl.create_categories(5)
+        colors = warehouse_dgl.create_colors(2)
+        warranties = warehouse_dgl.create_warranties(2)
+        tags = warehouse_dgl.create_tags(2)
+        products = warehouse_dgl.create_products(brands, categories, tags, 5)
+        warehouse_dgl.create_physical_info()
+        warehouse_dgl.create_packs(colors, warranties, products, 10)
+        warehouse_dgl.create_expenses()
+
+    def setUp(self):
+        cache.clear()
+        Pack.objects.update(is_active=True)
+        Expense.objects.update(count_stock=20, actual_count_stock=20, is_suppliable=True)
+        self.pack = Pack.objects.select_related('product').first()
+
+    def assertBumped(self, label, update):
+        before, = get_generations([label])
+        with self.captureOnCommitCallbacks(execute=True):
+            update()
+        after, = get_generations([label])
+        self.assertGreater(
+            after,
+            before,
+            msg=f"The generation of `{label}` is `{after}` after the update but expected above `{before}`"
+        )
+
+    def test_bulk_update_stock_bumps(self):
+        self.assertBumped(
+            'warehouse.Expense',
+            lambda: Expense.bll.bulk_update_stock({self.pack.sku: 3}, increase=False)
+        )
+
+    def test_update_count_stock_bumps(self):
+        self.assertBumped(
+            'warehouse.Expense',
+            lambda: Expense.bll.update_count_stock(self.pack.sku, 5, increase=False)
+        )
+
+    def test_update_actual_count_stock_bumps(self):
+        self.assertBumped(
+            'warehouse.Expense',
+            lambda: Expense.bll.update_actual_count_stock(self.pack.sku, 5, increase=True)
+        )
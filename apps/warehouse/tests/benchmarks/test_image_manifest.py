@@ -0,0 +1,117 @@
+import time
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import (
+    F,
+    OuterRef,
+    Subquery,
+    ImageField
+)
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from painless.utils.decorators import disable_logging
+
+from warehouse.repository.generator_layer import WarehouseDataGenerator
+from warehouse.services.image_manifest import (
+    get_image_manifests,
+    load_image_manifests
+)
+from warehouse.models import (
+    Product,
+    ProductGallery
+)
+
+
+class ImageManifestBenchmark(TestCase):
+    """
+    Compares the correlated gallery subqueries formerly used by
+    `get_picture_choices` and `get_default_picture` with the grouped
+    `get_image_manifest` query and its cache.
+    """
+    ROUNDS = 5
+
+    @classmethod
+    @disable_logging
+    def setUpClass(cls) -> None:
+        super(ImageManifestBenchmark, cls).setUpClass()
+
+        # Warehouse Data Generator
+        warehouse_dgl = WarehouseDataGenerator()
+        brands = warehouse_dgl.create_brands(5)
+        categories = warehouse_dgl.create_categories(10)
+        tags = warehouse_dgl.create_tags(5)
+        products = warehouse_dgl.create_products(brands, categories, tags, 300)
+        warehouse_dgl.create_product_gallery(
+            products,
+            lower_boundary=3,
+            upper_boundary=5
+        )
+
+    def get_correlated_pictures(self, product_ids):
+        galleries = ProductGallery.objects.filter(product_id=OuterRef('pk'))
+        rows = Product.objects.filter(id__in=product_ids).annotate(
+            first_pic=Subquery(
+                galleries.filter(image_status='first').annotate(
+                    first_pic=F('picture')).values('first_pic')[:1],
+                output_field=ImageField()),
+            second_pic=Subquery(
+                galleries.filter(image_status='second').annotate(
+                    second_pic=F('picture')).values('second_pic')[:1],
+                output_field=ImageField()),
+            default_pic=Subquery(
+                galleries.filter(is_default=True).values('picture')[:1],
+                output_field=ImageField()),
+        ).values('id', 'first_pic', 'second_pic', 'default_pic')
+        return {row.pop('id'): {field: path or None for field, path in row.items()}
+                for row in rows}
+
+    def measure(self, function, product_ids):
+        timings = list()
+        for _ in range(self.ROUNDS):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                result = function(product_ids)
+                timings.append(time.perf_counter() - start)
+        return result, min(timings), len(queries)
+
+    @disable_logging
+    def test_image_manifest_benchmark(self):
+        cache.clear()
+        product_ids = list(Product.objects.values_list('id', flat=True))
+
+        correlated, correlated_time, _ = self.measure(
+            self.get_correlated_pictures, product_ids)
+        grouped, grouped_time, grouped_queries = self.measure(
+            load_image_manifests, product_ids)
+        get_image_manifests(product_ids)
+        cached, cached_time, cached_queries = self.measure(
+            get_image_manifests, product_ids)
+
+        self.assertDictEqual(
+            grouped,
+            correlated,
+            msg="Grouped image manifest should match the correlated subqueries"
+        )
+        self.assertDictEqual(
+            cached,
+            grouped,
+            msg="Cached image manifest should match the grouped query"
+        )
+        self.assertEqual(
+            grouped_queries,
+            1,
+            msg=f"Grouped image manifest should run 1 query but ran {grouped_queries}"
+        )
+        self.assertEqual(
+            cached_queries,
+            0,
+            msg=f"Cached image manifest should run no query but ran {cached_queries}"
+        )
+        self.assertLessEqual(
+            cached_time,
+            grouped_time,
+            msg=f"Cached image manifest took {cached_time:.4f}s but the grouped "
+                f"query alone took {grouped_time:.4f}s"
+        )
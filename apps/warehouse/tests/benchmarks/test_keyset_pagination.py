@@ -0,0 +1,148 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from painless.api.pagination import KeysetPagination
+from painless.middleware.profiling import normalize_sql
+from painless.utils.decorators import disable_logging
+
+from warehouse.repository.generator_layer import WarehouseDataGenerator
+from warehouse.models import Product
+
+
+class KeysetPaginationBenchmark(TestCase):
+    """
+    Walks the product listing with keyset pagination, the deepest page
+    should run the same queries as the first one it seeks from.
+    """
+    PAGE_SIZE = 5
+    ORDERINGS = (
+        ['-total_actual_count_stock'],
+        ['created'],
+        ['title'],
+        ['default_pack_price'],
+    )
+
+    @classmethod
+    @disable_logging
+    def setUpClass(cls) -> None:
+        super(KeysetPaginationBenchmark, cls).setUpClass()
+
+        # Warehouse Data Generator
+        warehouse_dgl = WarehouseDataGenerator()
+        brands = warehouse_dgl.create_brands(5)
+        categories = warehouse_dgl.create_categories(10)
+        colors = warehouse_dgl.create_colors(10)
+        warranties = warehouse_dgl.create_warranties(10)
+        tags = warehouse_dgl.create_tags(5)
+        products = warehouse_dgl.create_products(brands, categories, tags, 200)
+        warehouse_dgl.create_physical_info()
+        warehouse_dgl.create_packs(colors, warranties, products, 400)
+        warehouse_dgl.create_expenses()
+        warehouse_dgl.create_product_gallery(
+            products,
+            lower_boundary=3,
+            upper_boundary=5
+        )
+
+    def get_request(self, url='/products/', **params):
+        params['page_size'] = self.PAGE_SIZE
+        return Request(APIRequestFactory().get(url, params))
+
+    def get_queryset(self, ordering):
+        return Product.dal.get_available_items(use_read_model=False) \
+            .order_by(*ordering)
+
+    def walk_keyset_pages(self, ordering):
+        """
+        fetches every page following the `next` links, returns the shapes
+        of the queries of each page and the ids of the products.
+        """
+        shapes, ids = list(), list()
+        params = dict()
+        while True:
+            paginator = KeysetPagination()
+            request = self.get_request(**params)
+            with CaptureQueriesContext(connection) as queries:
+                page = paginator.paginate_queryset(self.get_queryset(ordering), request)
+            shapes.append([normalize_sql(query['sql']) for query in queries.captured_queries])
+            ids.extend(product.id for product in page)
+            next_link = paginator.get_next_link()
+            if next_link is None:
+                return shapes, ids
+            params = {'cursor': Request(APIRequestFactory().get(next_link))
+                      .query_params['cursor']}
+
+    @disable_logging
+    def test_keyset_pagination_benchmark(self):
+        total = self.get_queryset(['id']).count()
+        for ordering in self.ORDERINGS:
+            shapes, ids = self.walk_keyset_pages(ordering)
+            self.assertGreater(
+                len(shapes),
+                2,
+                msg=f"Not enough products to seek past the second page for {ordering}"
+            )
+
+            query_counts = {len(page_shapes) for page_shapes in shapes}
+            self.assertEqual(
+                len(query_counts),
+                1,
+                msg=f"Every keyset page should run the same number of queries "
+                    f"but got {query_counts} for {ordering}"
+            )
+            # the first page has no cursor, every later page seeks the same way
+            for depth, page_shapes in enumerate(shapes[2:], start=2):
+                self.assertListEqual(
+                    page_shapes,
+                    shapes[1],
+                    msg=f"Page {depth + 1} runs other SQL than page 2 for {ordering}"
+                )
+            for page_shapes in shapes:
+                for shape in page_shapes:
+                    self.assertNotIn(
+                        'OFFSET',
+                        shape.upper(),
+                        msg=f"Keyset pages should seek, not skip rows, for {ordering}"
+                    )
+
+            self.assertEqual(
+                len(ids),
+                len(set(ids)),
+                msg=f"Keyset pages should not repeat products for {ordering}"
+            )
+            self.assertEqual(
+                len(ids),
+                total,
+                msg=f"Keyset pages should cover {total} products "
+                    f"but got {len(ids)} for {ordering}"
+            )
+
+    @disable_logging
+    def test_keyset_pagination_previous_link(self):
+        ordering = ['title']
+        paginator = KeysetPagination()
+        first_page = paginator.paginate_queryset(
+            self.get_queryset(ordering), self.get_request())
+        next_link = paginator.get_next_link()
+        if next_link is None:
+            self.skipTest("Not enough products for a second page")
+
+        paginator = KeysetPagination()
+        cursor = Request(APIRequestFactory().get(next_link)).query_params['cursor']
+        paginator.paginate_queryset(
+            self.get_queryset(ordering), self.get_request(cursor=cursor))
+        previous_link = paginator.get_previous_link()
+
+        paginator = KeysetPagination()
+        cursor = Request(APIRequestFactory().get(previous_link)).query_params['cursor']
+        previous_page = paginator.paginate_queryset(
+            self.get_queryset(ordering), self.get_request(cursor=cursor))
+        self.assertEqual(
+            [product.id for product in previous_page],
+            [product.id for product in first_page],
+            msg="Previous link of the second page should return the first page"
+        )
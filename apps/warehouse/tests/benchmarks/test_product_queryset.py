@@ -0,0 +1,151 @@
+from pathlib import Path
+
+from django.test import TestCase
+
+from painless.utils.benchmark import QuerysetBenchmarkMixin
+from painless.utils.decorators import disable_logging
+
+from warehouse.repository.generator_layer import WarehouseDataGenerator
+from basket.repository.generator_layer import BasketDataGenerator
+from account.repository.generator_layer import AccountDataGenerator
+from logistic.repository.generator_layer import LogisticDataGenerator
+
+from warehouse.repository.queryset.product import ProductQuerySet
+from warehouse.models import Product
+from basket.models import SalesFact
+
+
+class ProductQuerysetBenchmark(QuerysetBenchmarkMixin, TestCase):
+    """
+    Query count, SQL time, Python time and peak memory of every public
+    `ProductQuerySet` method on a fixed size catalog, compared with
+    `product_queryset_baseline.json`.
+
+    Run with `BENCHMARK_UPDATE_BASELINE=1` to record a new baseline.
+    """
+    TOTAL_PRODUCTS = 200
+    TOTAL_PACKS = 600
+    baseline_path = Path(__file__).with_name('product_queryset_baseline.json')
+    queryset_classes = (ProductQuerySet, )
+    # (method, args), a method may appear more than once with other args
+    CASES = (
+        ('report_products_with_one_default_pack', ()),
+        ('report_products_with_no_pack', ()),
+        ('get_average_packs_per_product', ()),
+        ('get_average_of_product_costs', ()),
+        ('get_queryset_of_packs_per_product', ()),
+        ('get_product_with_category_and_packs', ()),
+        ('get_product_with_category_and_packs', (True, )),
+        ('get_product_with_most_or_least_tags', (True, )),
+        ('get_product_with_most_or_least_tags', (False, )),
+        ('get_average_of_tags_per_product', ()),
+        ('get_most_expensive_or_cheapest_product', (True, )),
+        ('get_most_expensive_or_cheapest_product', (False, )),
+        ('get_actual_count_of_stock', ()),
+        ('get_queryset_of_product_with_the_least_or_most_purchase', (True, )),
+        ('get_queryset_of_product_with_the_least_or_most_purchase', (False, )),
+        ('get_queryset_of_product_with_the_least_or_most_purchase', (True, True)),
+        ('get_default_pack_price', ()),
+        ('get_number_of_tags_per_product', ()),
+        ('get_product_sold_count', ()),
+        ('get_product_sold_count', (True, )),
+        ('get_the_product_based_on_the_packs_sold_in_order', ()),
+        ('get_total_active_packs', ()),
+        ('get_title_of_default_pack_warranty', ()),
+        ('get_total_packs_in_orders', ()),
+        ('get_total_packs_in_orders', (True, )),
+        ('get_number_sold_per_product_per_country', ()),
+        ('get_number_sold_per_product_per_country', (True, )),
+        ('get_number_sold_per_product_per_country_per_province', ()),
+        ('get_number_sold_per_product_per_country_per_province', (True, )),
+        ('get_sales_rollup', ()),
+        ('get_sales_rollup', (True, )),
+        ('get_sales_rollup', (False, True)),
+        ('iter_sales_rollup', ()),
+        ('iter_sales_rollup', (True, 3)),
+        ('iter_sales_rollup', (False, 3, True)),
+        ('get_profit_per_product', ()),
+        ('get_profit_per_product', (True, )),
+        ('get_picture_choices', ()),
+        ('get_default_picture', ()),
+        ('prefetch_image_manifest', ()),
+        ('get_actives', ()),
+        ('get_vouchers', ()),
+        ('get_default_pack', ()),
+        ('prefetch_default_pack', ()),
+        ('get_active_products_with_voucher', ()),
+        ('get_active_category', ()),
+        ('get_active_packs', ()),
+        ('get_related_packs', ()),
+        ('get_available_items', ()),
+        ('get_available_items', (None, True)),
+        ('get_available_items_from_listing', (['title', 'slug'], )),
+    )
+
+    @classmethod
+    @disable_logging
+    def setUpClass(cls) -> None:
+        super(ProductQuerysetBenchmark, cls).setUpClass()
+
+        # Account Data Generator
+        account_dgl = AccountDataGenerator()
+        account_dgl.create_user(10)
+        account_dgl.create_profile()
+        # Warehouse Data Generator
+        warehouse_dgl = WarehouseDataGenerator()
+        brands = warehouse_dgl.create_brands(5)
+        categories = warehouse_dgl.create_categories(20)
+        colors = warehouse_dgl.create_colors(10)
+        warranties = warehouse_dgl.create_warranties(10)
+        tags = warehouse_dgl.create_tags(10)
+        products = warehouse_dgl.create_products(
+            brands, categories, tags, cls.TOTAL_PRODUCTS)
+        warehouse_dgl.create_physical_info()
+        warehouse_dgl.create_packs(colors, warranties, products, cls.TOTAL_PACKS)
+        warehouse_dgl.create_expenses()
+        warehouse_dgl.create_product_gallery(
+            products,
+            lower_boundary=3,
+            upper_boundary=5
+        )
+
+        # Logistic Data Generator
+        logistic_dgl = LogisticDataGenerator()
+        logistic_dgl.create_address(5)
+        logistic_dgl.create_logistic(total=10)
+
+        # Basket Data Generator
+        basket_dgl = BasketDataGenerator()
+        basket_dgl.create_order_addresses(10)
+        orders = basket_dgl.create_orders()
+        basket_dgl.create_pack_order(orders)
+        SalesFact.bll.backfill()
+
+    @staticmethod
+    def get_call(method, args):
+        # a new queryset per round, so no round reads a cached result
+        return lambda: getattr(Product.dal.get_queryset(), method)(*args)
+
+    def test_baseline_is_recorded(self):
+        names = {f"{method}[{', '.join(map(repr, args))}]" for method, args in self.CASES}
+        missing = self.baseline.get_missing(names)
+        self.assertFalse(
+            missing,
+            msg=f"Benchmarks without a baseline in {self.baseline.path.name}, "
+                f"run with BENCHMARK_UPDATE_BASELINE=1 to record them: {sorted(missing)}"
+        )
+
+    @disable_logging
+    def test_product_queryset_benchmark(self):
+        for method, args in self.CASES:
+            name = f"{method}[{', '.join(map(repr, args))}]"
+            with self.subTest(name):
+                self.benchmark(name, self.get_call(method, args))
+
+    def test_every_public_method_is_benchmarked(self):
+        benchmarked = {method for method, _ in self.CASES}
+        missing = self.get_public_methods() - benchmarked
+        self.assertFalse(
+            missing,
+            msg=f"Public queryset methods without a benchmark: {sorted(missing)}"
+        )
@@ -0,0 +1,111 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase
+
+from warehouse.repository.generator_layer import WarehouseDataGenerator
+from painless.utils.decorators import disable_logging
+
+from warehouse.models import (
+    ExchangeRate,
+    Expense,
+    ExpensePrice,
+    Product
+)
+from warehouse.repository.queryset.product import get_rial_price_expression
+from warehouse.services.currency import convert_amount
+
+
+class ExpensePriceBusinessLogicLayerTest(TestCase):
+    @classmethod
+    @disable_logging
+    def setUpClass(cls):
+        super(ExpensePriceBusinessLogicLayerTest, cls).setUpClass()
+
+        # Warehouse Data Generator
+        warehouse_dgl = WarehouseDataGenerator()
+        brands = warehouse_dgl.create_brands(2)
+        categories = warehouse_dgl.create_categories(5)
+        colors = warehouse_dgl.create_colors(2)
+        warranties = warehouse_dgl.create_warranties(2)
+        tags = warehouse_dgl.create_tags(2)
+        products = warehouse_dgl.create_products(brands, categories, tags, 10)
+        warehouse_dgl.create_physical_info()
+        warehouse_dgl.create_packs(colors, warranties, products, 20)
+        warehouse_dgl.create_expenses()
+
+    def get_expected_prices(self):
+        return {
+            expense.id: Decimal(convert_amount(expense.price.amount,
+                                               expense.price_currency,
+                                               settings.BASE_CURRENCY)).quantize(Decimal('0.01'))
+            for expense in Expense.objects.all()
+        }
+
+    def get_actual_prices(self):
+        return dict(ExpensePrice.objects.values_list('expense_id', 'price_in_base_currency'))
+
+    def test_reprice(self):
+        ExpensePrice.objects.all().delete()
+
+        actual = ExpensePrice.bll.reprice(batch_size=7)
+        expected = Expense.objects.count()
+        self.assertEqual(
+            actual,
+            expected,
+            msg=f"Repriced `{actual}` expenses but expected is `{expected}`"
+        )
+        self.assertDictEqual(self.get_actual_prices(), self.get_expected_prices())
+
+    def test_reprice_on_exchange_rate_change(self):
+        ExpensePrice.bll.reprice()
+        expense = Expense.objects.first()
+        Expense.objects.filter(id=expense.id).update(price_currency='USD')
+        with self.assertNumQueries(1):
+            with self.captureOnCommitCallbacks(execute=True):
+                ExchangeRate.objects.create(base_currency='USD',
+                                            quote_currency=settings.BASE_CURRENCY,
+                                            rate=123456)
+        expected = (expense.price.amount * 123456).quantize(Decimal('0.01'))
+
+        # the request only marks the reprice, reads convert with the new rate
+        price = Product.dal.get_queryset().filter(packs__expense=expense) \
+            .annotate(price=get_rial_price_expression()) \
+            .values_list('price', flat=True).first()
+        price = Decimal(getattr(price, 'amount', price)).quantize(Decimal('0.01'))
+        self.assertEqual(price, expected)
+
+        call_command('reprice_expenses', '--pending', stdout=StringIO())
+        actual = ExpensePrice.objects.get(expense_id=expense.id).price_in_base_currency
+        self.assertEqual(
+            actual,
+            expected,
+            msg=f"Repriced price is `{actual}` but expected is `{expected}`"
+        )
+        self.assertEqual(
+            ExpensePrice.bll.reprice_pending(),
+            0,
+            msg="A finished reprice should clear the pending mark"
+        )
+
+    def test_ordering_falls_back_to_conversion(self):
+        """
+        Expenses not repriced yet are ordered by the converted price, so
+        the order is the same with or without their `ExpensePrice` rows.
+        """
+        ExpensePrice.bll.reprice()
+        products = Product.dal.get_queryset().get_default_pack_price() \
+            .order_by('default_pack_price', 'id')
+        expected = list(products.values_list('id', flat=True))
+
+        repriced_ids = list(ExpensePrice.objects.order_by('id')
+                            .values_list('id', flat=True))
+        ExpensePrice.objects.filter(id__in=repriced_ids[::2]).delete()
+        actual = list(products.values_list('id', flat=True))
+        self.assertListEqual(
+            actual,
+            expected,
+            msg="Products are ordered differently when some prices are not repriced"
+        )
@@ -0,0 +1,100 @@
+from django.db.models import Sum
+from django.test import TestCase
+
+from warehouse.repository.generator_layer import WarehouseDataGenerator
+from painless.utils.decorators import disable_logging
+
+from warehouse.models import (
+    Brand,
+    Expense,
+    Pack,
+    Product,
+    ProductListing
+)
+
+
+class ProductListingBusinessLogicLayerTest(TestCase):
+    """
+    Stock and activity changes made with `update` send no signal, the
+    listing rows must still follow them.
+    """
+    @classmethod
+    @disable_logging
+    def setUpClass(cls):
+        super(ProductListingBusinessLogicLayerTest, cls).setUpClass()
+
+        # Warehouse Data Generator
+        warehouse_dgl = WarehouseDataGenerator()
+        brands = warehouse_dgl.create_brands(2)
+        categories = warehouse_dgl.create_categories(5)
+        colors = warehouse_dgl.create_colors(2)
+        warranties = warehouse_dgl.create_warranties(2)
+        tags = warehouse_dgl.create_tags(2)
+        products = warehouse_dgl.create_products(brands, categories, tags, 5)
+        warehouse_dgl.create_physical_info()
+        warehouse_dgl.create_packs(colors, warranties, products, 10)
+        warehouse_dgl.create_expenses()
+
+    def setUp(self):
+        Pack.objects.update(is_active=True)
+        Expense.objects.update(count_stock=20, actual_count_stock=20)
+        ProductListing.bll.refresh()
+        self.pack = Pack.objects.select_related('product').first()
+
+    def get_listing(self, product_id):
+        return ProductListing.objects.get(product_id=product_id)
+
+    def get_actual_count_stock(self, product_id):
+        return Expense.objects.filter(pack__product_id=product_id, pack__is_active=True) \
+            .aggregate(total=Sum('actual_count_stock'))['total'] or 0
+
+    def test_refresh_on_bulk_update_stock(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Expense.bll.bulk_update_stock({self.pack.sku: 3}, increase=False)
+
+        actual = self.get_listing(self.pack.product_id).total_actual_count_stock
+        expected = self.get_actual_count_stock(self.pack.product_id)
+        self.assertEqual(
+            actual,
+            expected,
+            msg=f"Listing stock is `{actual}` after a checkout but expected is `{expected}`"
+        )
+
+    def test_refresh_on_update_count_stock(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Expense.bll.update_count_stock(self.pack.sku, 5, increase=False)
+            Expense.bll.update_actual_count_stock(self.pack.sku, 5, increase=False)
+
+        listing = self.get_listing(self.pack.product_id)
+        expected = self.get_actual_count_stock(self.pack.product_id)
+        self.assertEqual(
+            listing.total_actual_count_stock,
+            expected,
+            msg=f"Listing stock is `{listing.total_actual_count_stock}` "
+                f"but expected is `{expected}`"
+        )
+
+    def test_refresh_on_update_pack_is_active(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.bll.update_pack_is_active(self.pack.product.sku, False)
+
+        listing = self.get_listing(self.pack.product_id)
+        self.assertEqual(listing.total_active_packs, 0)
+        self.assertFalse(
+            listing.is_listable,
+            msg="A product without active packs should not be listable"
+        )
+
+    def test_refresh_on_update_product_is_active(self):
+        brand = Brand.objects.get(id=self.pack.product.brand_id)
+        with self.captureOnCommitCallbacks(execute=True):
+            Brand.bll.update_product_is_active(brand.slug, False)
+
+        actual = list(ProductListing.objects
+                      .filter(product__brand=brand, is_listable=True)
+                      .values_list('product_id', flat=True))
+        self.assertListEqual(
+            actual,
+            [],
+            msg=f"Products `{actual}` of a deactivated brand are still listable"
+        )
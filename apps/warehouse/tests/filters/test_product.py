@@ -0,0 +1,56 @@
+from django.test import TestCase
+
+from warehouse.repository.generator_layer import WarehouseDataGenerator
+from painless.utils.decorators import disable_logging
+
+from warehouse.models import (
+    ExpensePrice,
+    Product
+)
+from warehouse.repository.filters.product import ProductAPIFilter
+
+
+class ProductAPIFilterTest(TestCase):
+    @classmethod
+    @disable_logging
+    def setUpClass(cls):
+        super(ProductAPIFilterTest, cls).setUpClass()
+
+        # Warehouse Data Generator
+        warehouse_dgl = WarehouseDataGenerator()
+        brands = warehouse_dgl.create_brands(2)
+        categories = warehouse_dgl.create_categories(5)
+        colors = warehouse_dgl.create_colors(2)
+        warranties = warehouse_dgl.create_warranties(2)
+        tags = warehouse_dgl.create_tags(2)
+        products = warehouse_dgl.create_products(brands, categories, tags, 10)
+        warehouse_dgl.create_physical_info()
+        warehouse_dgl.create_packs(colors, warranties, products, 40)
+        warehouse_dgl.create_expenses()
+        ExpensePrice.bll.reprice()
+
+    def test_price_range(self):
+        prices = sorted(ExpensePrice.objects.values_list('price_in_base_currency', flat=True))
+        low, high = prices[len(prices) // 4], prices[3 * len(prices) // 4]
+        queryset = Product.dal.get_available_items(use_read_model=False)
+
+        filtered = ProductAPIFilter(
+            {'price_in_base_currency_min': low, 'price_in_base_currency_max': high},
+            queryset=queryset,
+        ).qs
+        actual = {product.id: product.total_actual_count_stock for product in filtered}
+        expected = {product.id: product.total_actual_count_stock for product in queryset
+                    if product.packs.filter(
+                        expense__normalized_price__price_in_base_currency__gte=low,
+                        expense__normalized_price__price_in_base_currency__lte=high).exists()}
+
+        self.assertEqual(
+            len(actual),
+            len(filtered),
+            msg="Filtered products should not be duplicated"
+        )
+        self.assertDictEqual(
+            actual,
+            expected,
+            msg="Both bounds should hold on one pack without changing the per product sums"
+        )
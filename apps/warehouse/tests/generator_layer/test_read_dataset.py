@@ -0,0 +1,122 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+import pandas as pd
+
+from django.test import SimpleTestCase
+
+from dataset.read_dataset import (
+    DatasetCache,
+    ReadDataset,
+    clean_column
+)
+
+
+def clean_rows(df):
+    """the row wise cleaning `clean_column` replaced."""
+    count_not_null_rows = len(df[df['id'].notnull()])
+    header = list(df.columns.values)
+    return [dict(zip(header, [int(data) if not isinstance(data, str)
+                              else data.replace('\u200c', '').strip() if data != 'None' else None
+                              for data in df.iloc[row]])) for row in range(count_not_null_rows)]
+
+
+class ReadDatasetTest(SimpleTestCase):
+    """
+        Test the cached, column wise cleaned records match the row wise
+        cleaning of the workbook.
+    """
+    SHEETS = {
+        'products': pd.DataFrame({
+            'id': [1, 2, 3, 4, None],
+            'title': [' first\u200c product ', 'second', 'third ', '\u200cfourth', 'extra'],
+            'mixed': ['x', 4, ' y ', 7, 'extra'],
+            'count': [7, 8, 9, 10, None],
+        }),
+        'brands': pd.DataFrame({
+            'id': [1, 2],
+            'name': ['brand', ' other\u200c '],
+        }),
+    }
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.workbook_path = os.path.join(self.directory, 'dataset.xlsx')
+        self.write_workbook(self.SHEETS)
+        self.cache = DatasetCache(self.workbook_path, os.path.join(self.directory, '.cache'))
+        patcher = mock.patch.object(ReadDataset, 'cache', self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def write_workbook(self, sheets):
+        with pd.ExcelWriter(self.workbook_path) as writer:
+            for sheet_name, df in sheets.items():
+                df.to_excel(writer, sheet_name=sheet_name, index=False)
+
+    def assertRecordsEqual(self, actual, expected):
+        self.assertListEqual(
+            actual,
+            expected,
+            msg=f"Actual records are `{actual}` but expected are `{expected}`"
+        )
+        for actual_record, expected_record in zip(actual, expected):
+            actual_types = {key: type(value) for key, value in actual_record.items()}
+            expected_types = {key: type(value) for key, value in expected_record.items()}
+            self.assertDictEqual(actual_types, expected_types)
+
+    def test_records_match_row_wise_cleaning(self):
+        for sheet_name in self.SHEETS:
+            with self.subTest(sheet_name):
+                expected = clean_rows(pd.read_excel(self.workbook_path, sheet_name=sheet_name))
+                self.assertRecordsEqual(ReadDataset.read_excel_file(sheet_name), expected)
+
+    def test_chunks_match_row_wise_cleaning(self):
+        expected = clean_rows(pd.read_excel(self.workbook_path, sheet_name='products'))
+        actual = list(ReadDataset.iter_excel_file('products', chunk_size=3))
+        self.assertRecordsEqual(actual, expected)
+
+    def test_none_string_becomes_none(self):
+        column = pd.Series(['None', ' a\u200c ', 3], dtype=object)
+        actual = clean_column(column)
+        expected = [None, 'a', 3]
+        self.assertListEqual(
+            actual,
+            expected,
+            msg=f"Actual values are `{actual}` but expected are `{expected}`"
+        )
+
+    def test_sheet_names(self):
+        actual = ReadDataset.get_sheet_names()
+        expected = list(self.SHEETS)
+        self.assertListEqual(
+            actual,
+            expected,
+            msg=f"Actual sheets are `{actual}` but expected are `{expected}`"
+        )
+
+    def test_unchanged_workbook_is_not_converted(self):
+        self.cache.get_manifest()
+        cache = DatasetCache(self.workbook_path, self.cache.directory)
+        with mock.patch.object(DatasetCache, 'convert') as convert:
+            cache.read_sheet('brands')
+            os.utime(self.workbook_path)
+            DatasetCache(self.workbook_path, self.cache.directory).read_sheet('brands')
+        convert.assert_not_called()
+
+    def test_changed_workbook_is_converted(self):
+        ReadDataset.read_excel_file('brands')
+        sheets = dict(self.SHEETS, brands=pd.DataFrame({'id': [1], 'name': ['changed']}))
+        self.write_workbook(sheets)
+
+        actual = ReadDataset.read_excel_file('brands')
+        expected = [{'id': 1, 'name': 'changed'}]
+        self.assertListEqual(
+            actual,
+            expected,
+            msg=f"Actual records are `{actual}` but the changed workbook has `{expected}`"
+        )
@@ -0,0 +1,189 @@
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    TestCase,
+    SimpleTestCase,
+    override_settings
+)
+
+from painless.middleware import profiling
+from painless.middleware.profiling import (
+    QueryProfile,
+    SQLProfilingMiddleware,
+    get_origin,
+    normalize_sql,
+    profile_queries
+)
+from painless.utils.decorators import disable_logging
+
+from warehouse.repository.generator_layer import WarehouseDataGenerator
+from warehouse.models import Product
+
+
+class NormalizeSQLTest(SimpleTestCase):
+    """
+        Test statements differing only in their values share one shape.
+    """
+    def test_literals_are_replaced(self):
+        actual = normalize_sql("SELECT * FROM product WHERE id = 12 AND title = 'it''s'")
+        expected = "SELECT * FROM product WHERE id = ? AND title = ?"
+        self.assertEqual(
+            actual,
+            expected,
+            msg=f"Actual shape is `{actual}` but expected is `{expected}`"
+        )
+
+    def test_placeholder_lists_collapse(self):
+        short = normalize_sql('SELECT * FROM pack WHERE id IN (%s, %s)')
+        long = normalize_sql('SELECT * FROM pack WHERE id IN (%s, %s, %s, %s)')
+        self.assertEqual(
+            short,
+            long,
+            msg=f"`{short}` and `{long}` should have the same shape"
+        )
+        self.assertIn('(...)', short)
+
+    def test_whitespace_is_collapsed(self):
+        actual = normalize_sql('SELECT  *\n  FROM   product\n')
+        expected = 'SELECT * FROM product'
+        self.assertEqual(
+            actual,
+            expected,
+            msg=f"Actual shape is `{actual}` but expected is `{expected}`"
+        )
+
+    def test_other_tables_keep_their_shape(self):
+        self.assertNotEqual(
+            normalize_sql('SELECT * FROM product WHERE id = 1'),
+            normalize_sql('SELECT * FROM pack WHERE id = 1'),
+            msg="Statements reading other tables should not share a shape"
+        )
+
+    def test_get_origin_is_project_frame(self):
+        actual = get_origin()
+        self.assertIsNotNone(actual, msg="The test module is a project frame")
+        self.assertIn(
+            'test_profiling.py',
+            actual,
+            msg=f"Actual origin is `{actual}` but expected this test module"
+        )
+        self.assertTrue(
+            actual.endswith('in test_get_origin_is_project_frame'),
+            msg=f"Actual origin is `{actual}` but expected this test method"
+        )
+
+
+class QueryProfileTest(TestCase):
+    """
+        Test the profile counts queries per shape and flags the repeated
+        ones, e.g. an N+1 loop.
+    """
+    @classmethod
+    @disable_logging
+    def setUpClass(cls):
+        super(QueryProfileTest, cls).setUpClass()
+
+        # Warehouse Data Generator
+        warehouse_dgl = WarehouseDataGenerator()
+        brands = warehouse_dgl.create_brands(2)
+        categories = warehouse_dgl.create_categories(5)
+        colors = warehouse_dgl.create_colors(2)
+        warranties = warehouse_dgl.create_warranties(2)
+        tags = warehouse_dgl.create_tags(2)
+        products = warehouse_dgl.create_products(brands, categories, tags, 6)
+        warehouse_dgl.create_physical_info()
+        warehouse_dgl.create_packs(colors, warranties, products, 12)
+
+    def test_n_plus_one_is_flagged(self):
+        with profile_queries(repeat_threshold=5) as profile:
+            for product in Product.objects.all()[:6]:
+                list(product.packs.all())
+
+        repeated = profile.get_repeated_shapes()
+        self.assertEqual(
+            len(repeated),
+            1,
+            msg=f"Actual repeated shapes are `{repeated}` but expected the packs query only"
+        )
+        self.assertEqual(repeated[0]['count'], 6)
+        origin = next(iter(repeated[0]['origins']))
+        self.assertIn(
+            'test_profiling.py',
+            origin,
+            msg=f"Actual origin is `{origin}` but expected the loop of this test"
+        )
+        summary = profile.get_summary(endpoint='test')
+        self.assertEqual(summary['queries'], 7)
+        self.assertEqual(summary['shapes'], 2)
+
+    def test_prefetch_is_not_flagged(self):
+        with profile_queries(repeat_threshold=5) as profile:
+            for product in Product.objects.prefetch_related('packs')[:6]:
+                list(product.packs.all())
+
+        actual = profile.get_repeated_shapes()
+        self.assertListEqual(
+            actual,
+            [],
+            msg=f"Actual repeated shapes are `{actual}` but a prefetch runs each shape once"
+        )
+        self.assertEqual(profile.count, 2)
+
+    def test_profile_ends_with_block(self):
+        with profile_queries() as profile:
+            Product.objects.count()
+        Product.objects.count()
+
+        self.assertEqual(
+            profile.count,
+            1,
+            msg=f"Actual count is `{profile.count}` but queries after the block should not be recorded"
+        )
+
+    def test_threshold_defaults_to_setting(self):
+        with override_settings(SQL_PROFILING_REPEAT_THRESHOLD=3):
+            profile = QueryProfile()
+        self.assertEqual(profile.repeat_threshold, 3)
+
+
+class SQLProfilingMiddlewareTest(TestCase):
+    """
+        Test only the sampled requests are profiled.
+    """
+    def setUp(self):
+        self.request = RequestFactory().get('/api/products/')
+
+    @staticmethod
+    def get_response(request):
+        Product.objects.count()
+        return HttpResponse()
+
+    def profile(self, sample_rate, draw):
+        with override_settings(SQL_PROFILING_SAMPLE_RATE=sample_rate):
+            middleware = SQLProfilingMiddleware(self.get_response)
+        with mock.patch.object(profiling.random, 'random', return_value=draw), \
+                mock.patch.object(profiling, 'write_summary') as write_summary:
+            middleware(self.request)
+        return write_summary
+
+    def test_disabled_is_not_profiled(self):
+        write_summary = self.profile(0.0, 0.0)
+        write_summary.assert_not_called()
+
+    def test_unsampled_is_not_profiled(self):
+        write_summary = self.profile(0.25, 0.5)
+        write_summary.assert_not_called()
+
+    def test_sampled_is_profiled(self):
+        write_summary = self.profile(0.75, 0.5)
+        write_summary.assert_called_once()
+        summary = write_summary.call_args.args[0]
+        self.assertEqual(summary['endpoint'], 'GET /api/products/')
+        self.assertEqual(summary['status'], 200)
+        self.assertEqual(
+            summary['queries'],
+            1,
+            msg=f"Actual queries are `{summary['queries']}` but the view runs one"
+        )
@@ -0,0 +1,93 @@
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from PIL import Image
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import models
+from django.db.models.fields.files import ImageFieldFile
+from django.test import SimpleTestCase
+from django.test.utils import override_settings
+
+from painless.models.validators import picture
+from painless.models.validators.picture import (
+    ImageSizeValidator,
+    get_image_header
+)
+
+
+def make_png(width, height):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), color=(width % 256, height % 256, 0)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@override_settings(LANGUAGE_CODE='en')
+class PictureValidatorTest(SimpleTestCase):
+    """
+        Test the picture validators on new uploads and on pictures
+        already committed to the storage.
+    """
+    def setUp(self):
+        cache.clear()
+        self.location = tempfile.mkdtemp()
+        self.storage = FileSystemStorage(location=self.location)
+        self.field = models.ImageField(storage=self.storage)
+        self.field.name = 'picture'
+
+    def tearDown(self):
+        shutil.rmtree(self.location, ignore_errors=True)
+
+    def get_committed(self, name, content):
+        if self.storage.exists(name):
+            self.storage.delete(name)
+        name = self.storage.save(name, ContentFile(content))
+        return ImageFieldFile(None, self.field, name)
+
+    def test_size_validator_on_upload(self):
+        content = make_png(40, 40)
+        upload = SimpleUploadedFile('upload.png', content)
+
+        ImageSizeValidator(len(content))(upload)
+        with self.assertRaises(ValidationError):
+            ImageSizeValidator(len(content) - 1)(upload)
+
+    def test_size_validator_on_committed_picture(self):
+        content = make_png(40, 40)
+        value = self.get_committed('committed.png', content)
+
+        with mock.patch.object(picture, 'read_image_header') as read_image_header:
+            ImageSizeValidator(len(content))(value)
+            with self.assertRaises(ValidationError):
+                ImageSizeValidator(len(content) - 1)(value)
+        read_image_header.assert_not_called()
+
+    def test_unchanged_picture_reuses_header(self):
+        value = self.get_committed('same.png', make_png(30, 20))
+
+        header = get_image_header(value)
+        with mock.patch.object(picture, 'read_image_header') as read_image_header:
+            cached = get_image_header(value)
+        read_image_header.assert_not_called()
+        self.assertEqual(cached, header)
+        self.assertEqual((cached.width, cached.height), (30, 20))
+
+    def test_overwritten_picture_is_read_again(self):
+        value = self.get_committed('overwritten.png', make_png(30, 20))
+        self.assertEqual((get_image_header(value).width, get_image_header(value).height), (30, 20))
+
+        value = self.get_committed('overwritten.png', make_png(120, 90))
+        self.assertEqual(value.name, 'overwritten.png')
+
+        header = get_image_header(value)
+        self.assertEqual(
+            (header.width, header.height),
+            (120, 90),
+            msg=f"Header of the overwritten picture should be read again but got {header}"
+        )
@@ -0,0 +1,88 @@
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from PIL import Image
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from painless.utils.decorators import disable_logging
+
+from warehouse.repository.generator_layer import WarehouseDataGenerator
+from warehouse.services.category_tree import (
+    CategoryTreeSnapshot,
+    get_category_tree
+)
+from warehouse.helper.enums import ImageStatus
+from warehouse.models import (
+    Product,
+    ProductGallery
+)
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def make_picture(name='picture.png'):
+    buffer = BytesIO()
+    Image.new('RGB', (800, 960)).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+@override_settings(LANGUAGE_CODE='en', MEDIA_ROOT=MEDIA_ROOT)
+class ProductGalleryModel(TestCase):
+    """
+        Test saving a gallery picture stores it under the directories of
+        the product's category.
+    """
+    @classmethod
+    @disable_logging
+    def setUpClass(cls) -> None:
+        super(ProductGalleryModel, cls).setUpClass()
+
+        # Warehouse Data Generator
+        warehouse_dgl = WarehouseDataGenerator()
+        brands = warehouse_dgl.create_brands(2)
+        categories = warehouse_dgl.create_categories(10)
+        tags = warehouse_dgl.create_tags(2)
+        warehouse_dgl.create_products(brands, categories, tags, 3)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super(ProductGalleryModel, cls).tearDownClass()
+
+    def setUp(self):
+        self.product = Product.objects.filter(category__parent__isnull=False).first() \
+            or Product.objects.first()
+
+    def test_save_picture_under_category_path(self):
+        gallery = ProductGallery.objects.create(product=self.product,
+                                                picture=make_picture(),
+                                                alternate_text='picture',
+                                                image_status=ImageStatus.Other,
+                                                is_default=True)
+
+        titles = get_category_tree().get_ancestor_titles(self.product.category_id)
+        expected = '/'.join(title[:5].strip() for title in titles)
+        self.assertTrue(
+            gallery.picture.name.startswith(f'category/{expected}/prod-'),
+            msg=f"Picture is stored as `{gallery.picture.name}` but expected "
+                f"under `category/{expected}/`"
+        )
+
+    def test_save_picture_of_category_unknown_to_snapshot(self):
+        with mock.patch('warehouse.services.category_tree.get_category_tree',
+                        return_value=CategoryTreeSnapshot(0, [])):
+            gallery = ProductGallery.objects.create(product=self.product,
+                                                    picture=make_picture(),
+                                                    alternate_text='picture',
+                                                    image_status=ImageStatus.Other,
+                                                    is_default=False)
+
+        self.assertTrue(
+            gallery.picture.name.startswith('category//prod-'),
+            msg=f"Picture is stored as `{gallery.picture.name}`"
+        )
@@ -0,0 +1,68 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from painless.utils.decorators import disable_logging
+
+from warehouse.repository.generator_layer import WarehouseDataGenerator
+from warehouse.services.image_manifest import (
+    IMAGE_MANIFEST_FIELDS,
+    load_image_manifests
+)
+from warehouse.models import Product
+
+
+class ProductImageManifestTest(TestCase):
+    @classmethod
+    @disable_logging
+    def setUpClass(cls) -> None:
+        super(ProductImageManifestTest, cls).setUpClass()
+
+        # Warehouse Data Generator
+        warehouse_dgl = WarehouseDataGenerator()
+        brands = warehouse_dgl.create_brands(2)
+        categories = warehouse_dgl.create_categories(5)
+        tags = warehouse_dgl.create_tags(2)
+        products = warehouse_dgl.create_products(brands, categories, tags, 10)
+        warehouse_dgl.create_product_gallery(
+            products,
+            lower_boundary=3,
+            upper_boundary=5
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.expected = load_image_manifests(Product.objects.values_list('id', flat=True))
+
+    def get_pictures(self, products):
+        return {product.id: {field: getattr(product, field)
+                             for field in IMAGE_MANIFEST_FIELDS}
+                for product in products}
+
+    def test_prefetch_image_manifest(self):
+        products = Product.dal.get_queryset().prefetch_image_manifest()
+
+        with self.assertNumQueries(2):
+            actual = self.get_pictures(products)
+        self.assertDictEqual(
+            actual,
+            self.expected,
+            msg="Prefetched pictures should match the gallery rows"
+        )
+
+    def test_iterator_and_chained_querysets(self):
+        queryset = Product.dal.get_queryset().prefetch_image_manifest()
+
+        actual = self.get_pictures(queryset.filter(is_active__in=[True, False])
+                                   .iterator(chunk_size=3))
+        self.assertDictEqual(
+            actual,
+            self.expected,
+            msg="Pictures should be set on products fetched with iterator()"
+        )
+
+    def test_single_product(self):
+        product = Product.objects.first()
+
+        actual = product.image_manifest
+        self.assertDictEqual(actual, self.expected[product.id])
+        self.assertEqual(product.default_pic, self.expected[product.id]['default_pic'])
@@ -0,0 +1,125 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.test import TestCase
+
+from painless.utils.decorators import disable_logging
+
+from warehouse.repository.generator_layer import WarehouseDataGenerator
+from basket.repository.generator_layer import BasketDataGenerator
+from account.repository.generator_layer import AccountDataGenerator
+from logistic.repository.generator_layer import LogisticDataGenerator
+
+from warehouse.models import Product
+from basket.models import (
+    Order,
+    PackOrder,
+    SalesFact
+)
+from basket.helper.enums import OrderStatus
+
+
+class SalesRollupTest(TestCase):
+    """
+        Test the geographic sales rollup against the pack orders, live and
+        read from the sales facts.
+    """
+    @classmethod
+    @disable_logging
+    def setUpClass(cls) -> None:
+        super(SalesRollupTest, cls).setUpClass()
+
+        # Account Data Generator
+        account_dgl = AccountDataGenerator()
+        account_dgl.create_user(10)
+        account_dgl.create_profile()
+        # Warehouse Data Generator
+        warehouse_dgl = WarehouseDataGenerator()
+        brands = warehouse_dgl.create_brands(5)
+        categories = warehouse_dgl.create_categories(20)
+        colors = warehouse_dgl.create_colors(10)
+        warranties = warehouse_dgl.create_warranties(10)
+        tags = warehouse_dgl.create_tags(10)
+        products = warehouse_dgl.create_products(brands, categories, tags, 30)
+        warehouse_dgl.create_physical_info()
+        warehouse_dgl.create_packs(colors, warranties, products, 90)
+        warehouse_dgl.create_expenses()
+
+        # Logistic Data Generator
+        logistic_dgl = LogisticDataGenerator()
+        logistic_dgl.create_address(5)
+        logistic_dgl.create_logistic(total=10)
+
+        # Basket Data Generator
+        basket_dgl = BasketDataGenerator()
+        basket_dgl.create_order_addresses(10)
+        orders = basket_dgl.create_orders()
+        basket_dgl.create_pack_order(orders)
+
+        # facts leave out these orders, the live rollup does not
+        Order.objects.filter(status__in=settings.SALES_FACT_EXCLUDED_STATUSES) \
+            .update(status=OrderStatus.Completed)
+        SalesFact.bll.backfill()
+
+    def get_expected(self, by_province=False):
+        """{(product id, *destination): quantity} summed in Python."""
+        destinations = ['country', 'province'] if by_province else ['country']
+        expected = defaultdict(int)
+        pack_orders = PackOrder.objects.values_list(
+            'pack__product_id',
+            *[f'order__order_address__{destination}'
+              for destination in destinations],
+            'quantity')
+        for product_id, *destination, quantity in pack_orders:
+            expected[(product_id, *destination)] += quantity
+        return dict(expected)
+
+    def as_dict(self, rows):
+        return {tuple(row[:-1]): row[-1] for row in rows}
+
+    def test_sales_rollup(self):
+        for by_province in (False, True):
+            expected = self.get_expected(by_province)
+            for from_facts in (False, True):
+                with self.subTest(by_province=by_province, from_facts=from_facts):
+                    rollup = list(Product.dal.get_queryset()
+                                  .get_sales_rollup(by_province, from_facts))
+                    self.assertEqual(len(rollup), len(expected))
+                    self.assertDictEqual(
+                        self.as_dict(rollup),
+                        expected,
+                        msg=f"Rollup with from_facts={from_facts} "
+                            f"does not match the pack orders"
+                    )
+
+    def test_iter_sales_rollup_matches_rollup(self):
+        for from_facts in (False, True):
+            with self.subTest(from_facts=from_facts):
+                actual = list(Product.dal.get_queryset()
+                              .iter_sales_rollup(from_facts=from_facts, chunk_size=7))
+                self.assertDictEqual(self.as_dict(actual), self.get_expected())
+
+    def test_iter_sales_rollup_top(self):
+        top = 2
+        per_product = defaultdict(list)
+        for (product_id, country), quantity in self.get_expected().items():
+            per_product[product_id].append(quantity)
+
+        for from_facts in (False, True):
+            with self.subTest(from_facts=from_facts):
+                ranked = defaultdict(list)
+                rollup = Product.dal.get_queryset() \
+                    .iter_sales_rollup(top=top, from_facts=from_facts, chunk_size=7)
+                for product_id, country, quantity in rollup:
+                    ranked[product_id].append(quantity)
+
+                self.assertSetEqual(set(ranked), set(per_product))
+                for product_id, quantities in per_product.items():
+                    # ties may keep either destination, their quantities are equal
+                    best = sorted(quantities, reverse=True)[:top]
+                    self.assertListEqual(
+                        ranked[product_id],
+                        best,
+                        msg=f"Product `{product_id}` kept {ranked[product_id]} "
+                            f"but its best {top} destinations sold {best}"
+                    )
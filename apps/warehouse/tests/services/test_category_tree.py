@@ -0,0 +1,67 @@
+from django.test import TestCase
+
+from warehouse.repository.generator_layer import WarehouseDataGenerator
+from painless.utils.decorators import disable_logging
+
+from warehouse.models import Category
+from warehouse.services.category_tree import (
+    get_category_tree,
+    get_category_tree_version
+)
+
+
+class CategoryTreeTest(TestCase):
+    @classmethod
+    @disable_logging
+    def setUpClass(cls):
+        super(CategoryTreeTest, cls).setUpClass()
+
+        # Warehouse Data Generator
+        warehouse_dgl = WarehouseDataGenerator()
+        warehouse_dgl.create_categories(20)
+
+    def setUp(self):
+        Category.objects.update(is_active=True)
+        self.child = Category.objects.filter(parent__isnull=False).first()
+
+    def test_version_is_bumped_again_on_commit(self):
+        version = get_category_tree_version()
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.child.title = f'{self.child.title} renamed'
+            self.child.save()
+            actual = get_category_tree_version()
+            self.assertEqual(actual, version + 1)
+
+        for callback in callbacks:
+            callback()
+        actual = get_category_tree_version()
+        self.assertGreater(
+            actual,
+            version + 1,
+            msg="A snapshot reloaded before the commit would be kept, "
+                "the version should be bumped again on commit"
+        )
+
+    def test_snapshot_follows_committed_changes(self):
+        root = self.child.get_root()
+        self.assertTrue(get_category_tree().is_all_ancestors_active(self.child.id))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            root.is_active = False
+            root.save()
+
+        self.assertFalse(
+            get_category_tree().is_all_ancestors_active(self.child.id),
+            msg="A category under a deactivated root should not be active"
+        )
+
+    def test_unknown_category_does_not_reload(self):
+        tree = get_category_tree()
+        unknown_id = max(tree.ids) + 1000
+
+        with self.assertNumQueries(0):
+            actual = get_category_tree()
+            self.assertIsNone(actual.get_ancestor_ids(unknown_id))
+            self.assertIsNone(actual.get_ancestor_titles(unknown_id))
+            self.assertFalse(actual.is_all_ancestors_active(unknown_id))
+        self.assertIs(actual, tree)
@@ -0,0 +1,123 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from warehouse.models import ExchangeRate
+from warehouse.services.currency import (
+    EXCHANGE_RATES,
+    CurrencyRateProvider,
+    DatabaseRateBackend,
+    FileRateBackend,
+    RateMatrix,
+    rate_provider
+)
+
+
+class CountingRateBackend(FileRateBackend):
+    """file backend counting how many times the rates are read."""
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+        self.loads = 0
+
+    def get_rates(self):
+        self.loads += 1
+        return self.rates
+
+
+class CurrencyRateProviderTest(TestCase):
+    def test_rate_matrix(self):
+        matrix = RateMatrix(1, {'USD': {'R': 400000}})
+
+        self.assertEqual(matrix.get_rate('USD', 'R'), Decimal(400000))
+        self.assertEqual(
+            matrix.get_rate('R', 'USD'),
+            1 / Decimal(400000),
+            msg="The missing inverse pair should be derived from the known one"
+        )
+        self.assertEqual(matrix.get_rate('T', 'T'), Decimal(1))
+        with self.assertRaises(ValueError):
+            matrix.get_rate('USD', 'T')
+
+    def test_matrix_is_kept_until_invalidated(self):
+        backend = CountingRateBackend(EXCHANGE_RATES)
+        provider = CurrencyRateProvider(backend=backend, ttl=3600)
+
+        provider.get_rate('USD', 'R')
+        provider.get_rate('T', 'R')
+        self.assertEqual(
+            backend.loads,
+            1,
+            msg=f"Rates were read {backend.loads} times but expected once"
+        )
+
+        backend.rates = {'USD': {'R': 500000}}
+        provider.invalidate()
+        actual = provider.get_rate('USD', 'R')
+        self.assertEqual(actual, Decimal(500000))
+        self.assertEqual(backend.loads, 2)
+
+    def test_convert_and_case(self):
+        provider = CurrencyRateProvider(backend=CountingRateBackend(EXCHANGE_RATES))
+
+        self.assertEqual(provider.convert(2, 'USD', 'T'), Decimal(80000))
+        self.assertIs(
+            provider.get_case('R', 'expense__'),
+            provider.get_case('R', 'expense__'),
+            msg="A case should be built once per rate version and join path"
+        )
+        with self.assertRaises(ValueError):
+            provider.normalize_currency('EUR')
+
+    def test_database_backend(self):
+        now = timezone.now()
+        ExchangeRate.objects.create(base_currency='USD', quote_currency='R',
+                                    rate=450000, effective_date=now - timedelta(days=1))
+        ExchangeRate.objects.create(base_currency='USD', quote_currency='R',
+                                    rate=500000, effective_date=now - timedelta(hours=1))
+        ExchangeRate.objects.create(base_currency='USD', quote_currency='R',
+                                    rate=900000, effective_date=now + timedelta(days=1))
+        provider = CurrencyRateProvider(backend=DatabaseRateBackend())
+
+        actual = provider.get_rate('USD', 'R')
+        self.assertEqual(
+            actual,
+            Decimal(500000),
+            msg=f"Latest effective rate is `{actual}` but expected is `500000`"
+        )
+        # pairs missing from the table come from the file rates
+        self.assertEqual(provider.get_rate('T', 'R'), Decimal(10))
+
+    def test_database_backend_inverse_pairs(self):
+        now = timezone.now()
+        ExchangeRate.objects.create(base_currency='USD', quote_currency='R',
+                                    rate=500000, effective_date=now - timedelta(hours=1))
+        ExchangeRate.objects.create(base_currency='T', quote_currency='R',
+                                    rate=12, effective_date=now - timedelta(hours=1))
+        ExchangeRate.objects.create(base_currency='R', quote_currency='T',
+                                    rate=Decimal('0.08'), effective_date=now - timedelta(hours=1))
+        provider = CurrencyRateProvider(backend=DatabaseRateBackend())
+
+        actual = provider.get_rate('R', 'USD')
+        self.assertEqual(
+            actual,
+            1 / Decimal(500000),
+            msg=f"Inverse of a table rate is `{actual}` but should not be the file rate"
+        )
+        # both directions in the table are kept as they are
+        self.assertEqual(provider.get_rate('T', 'R'), Decimal(12))
+        self.assertEqual(provider.get_rate('R', 'T'), Decimal('0.08'))
+
+    def test_invalidate_on_commit(self):
+        version = rate_provider.get_version()
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            ExchangeRate.objects.create(base_currency='USD', quote_currency='T',
+                                        rate=41000)
+        self.assertGreater(rate_provider.get_version(), version)
+        self.assertIn(
+            rate_provider.invalidate,
+            callbacks,
+            msg="Rates cached again before the commit should be invalidated on commit"
+        )
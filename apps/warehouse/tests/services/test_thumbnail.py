@@ -0,0 +1,106 @@
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from PIL import Image
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from sorl.thumbnail import default
+from sorl.thumbnail.images import ImageFile
+
+from painless.utils.decorators import disable_logging
+
+from warehouse.repository.generator_layer import WarehouseDataGenerator
+from warehouse.services.thumbnail import thumbnail_pipeline
+from warehouse.helper.enums import ImageStatus
+from warehouse.models import (
+    Product,
+    ProductGallery
+)
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def make_picture(name='picture.png'):
+    buffer = BytesIO()
+    Image.new('RGB', (800, 960)).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+@override_settings(LANGUAGE_CODE='en',
+                   MEDIA_ROOT=MEDIA_ROOT,
+                   THUMBNAIL_PREGENERATE_ASYNC=False)
+class ThumbnailPipelineTest(TestCase):
+    """
+        Test uploading a gallery picture generates every configured
+        thumbnail once the upload commits.
+    """
+    @classmethod
+    @disable_logging
+    def setUpClass(cls) -> None:
+        super(ThumbnailPipelineTest, cls).setUpClass()
+
+        # Warehouse Data Generator
+        warehouse_dgl = WarehouseDataGenerator()
+        brands = warehouse_dgl.create_brands(2)
+        categories = warehouse_dgl.create_categories(5)
+        tags = warehouse_dgl.create_tags(2)
+        warehouse_dgl.create_products(brands, categories, tags, 3)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super(ThumbnailPipelineTest, cls).tearDownClass()
+
+    def setUp(self):
+        self.product = Product.objects.first()
+
+    def create_gallery(self):
+        return ProductGallery.objects.create(product=self.product,
+                                             picture=make_picture(),
+                                             alternate_text='picture',
+                                             image_status=ImageStatus.Other,
+                                             is_default=False)
+
+    def test_upload_generates_configured_geometries(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            gallery = self.create_gallery()
+
+        thumbnails = default.kvstore.get_thumbnails(ImageFile(gallery.picture.name))
+        actual = sorted(f'{thumbnail.x}x{thumbnail.y}' for thumbnail in thumbnails)
+        expected = sorted(spec['geometry'] for spec in settings.THUMBNAIL_PREGENERATE)
+        self.assertListEqual(
+            actual,
+            expected,
+            msg=f"Actual thumbnails are `{actual}` but expected geometries are `{expected}`"
+        )
+        for thumbnail in thumbnails:
+            self.assertTrue(
+                thumbnail.exists(),
+                msg=f"Thumbnail `{thumbnail.name}` is recorded but not stored"
+            )
+
+    def test_generation_waits_for_commit(self):
+        with mock.patch.object(thumbnail_pipeline, 'enqueue') as enqueue:
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                gallery = self.create_gallery()
+            enqueue.assert_not_called()
+
+            for callback in callbacks:
+                callback()
+        enqueue.assert_called_once_with(gallery.picture.name)
+
+    def test_save_without_upload_does_not_enqueue(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            gallery = self.create_gallery()
+
+        with mock.patch.object(thumbnail_pipeline, 'enqueue') as enqueue:
+            with self.captureOnCommitCallbacks(execute=True):
+                gallery.alternate_text = 'another picture'
+                gallery.save()
+        enqueue.assert_not_called()
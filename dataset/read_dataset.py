@@ -1,21 +1,162 @@
+import hashlib
+import json
 import os
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 path = os.path.normpath(f'{Path(__file__).parent}/ecommerce_dataset.xlsx')
+cache_path = os.path.normpath(f'{Path(__file__).parent}/.cache')
+
+try:
+    import pyarrow  # noqa: F401
+    CACHE_FORMAT = 'parquet'
+except ImportError:
+    CACHE_FORMAT = 'pickle'
+
+
+class DatasetCache:
+    """
+    Converted copy of the workbook, one file per sheet.
+
+    Sheets are stored as Parquet when pyarrow is installed, read memory
+    mapped, and pickled otherwise or when a sheet has mixed type columns
+    Parquet can not hold. The cache is keyed by the sha256 of the workbook;
+    the hash is only recomputed when its mtime or size change.
+    """
+    MANIFEST = 'manifest.json'
+
+    def __init__(self, workbook_path, directory):
+        self.workbook_path = workbook_path
+        self.directory = directory
+        self._manifest = None
+
+    def get_stat(self):
+        stat = os.stat(self.workbook_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def get_workbook_hash(self):
+        digest = hashlib.sha256()
+        with open(self.workbook_path, 'rb') as workbook:
+            for chunk in iter(lambda: workbook.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def read_manifest(self):
+        try:
+            with open(os.path.join(self.directory, self.MANIFEST)) as manifest_file:
+                return json.load(manifest_file)
+        except (OSError, ValueError):
+            return None
+
+    def get_manifest(self):
+        """
+        The manifest of a cache matching the workbook, converted first if
+        the workbook changed since the last conversion.
+        """
+        mtime, size = self.get_stat()
+        manifest = self._manifest or self.read_manifest()
+        if manifest is not None and (manifest['mtime'], manifest['size']) == (mtime, size):
+            self._manifest = manifest
+            return manifest
+
+        sha256 = self.get_workbook_hash()
+        if manifest is not None and manifest['sha256'] == sha256:
+            manifest.update(mtime=mtime, size=size)
+        else:
+            manifest = self.convert(sha256)
+            manifest.update(mtime=mtime, size=size)
+        self.write(self.MANIFEST, lambda file_path: Path(file_path).write_text(json.dumps(manifest)))
+        self._manifest = manifest
+        return manifest
+
+    def write(self, name, writer):
+        os.makedirs(self.directory, exist_ok=True)
+        file_path = os.path.join(self.directory, name)
+        temporary_path = f'{file_path}.{os.getpid()}.tmp'
+        writer(temporary_path)
+        os.replace(temporary_path, file_path)
+
+    def convert(self, sha256):
+        """reads every sheet of the workbook at once and stores each one."""
+        sheets = pd.read_excel(self.workbook_path, sheet_name=None)
+        files = dict()
+        for index, (sheet_name, df) in enumerate(sheets.items()):
+            name = f'{sha256[:16]}-{index}'
+            if CACHE_FORMAT == 'parquet':
+                try:
+                    self.write(f'{name}.parquet', df.to_parquet)
+                    files[sheet_name] = f'{name}.parquet'
+                    continue
+                except (TypeError, ValueError, pyarrow.lib.ArrowException):
+                    pass
+            self.write(f'{name}.pickle', df.to_pickle)
+            files[sheet_name] = f'{name}.pickle'
+        return {'sha256': sha256, 'sheets': list(sheets), 'files': files}
+
+    def get_sheet_names(self):
+        return self.get_manifest()['sheets']
+
+    def read_sheet(self, sheet_name):
+        name = self.get_manifest()['files'][sheet_name]
+        file_path = os.path.join(self.directory, name)
+        if name.endswith('.parquet'):
+            return pd.read_parquet(file_path, memory_map=True)
+        return pd.read_pickle(file_path)
+
+
+def clean_column(column):
+    """
+    Column wise version of the per cell conversion: strings lose `\u200c`
+    and surrounding spaces, the `'None'` string becomes None and any other
+    value is coerced to int.
+    """
+    # object columns, or `str` ones on newer pandas, may hold strings
+    if not pd.api.types.is_string_dtype(column.dtype):
+        return column.astype('int64').tolist()
+
+    # a chunk of a mixed column may hold no string, `.str` rejects it
+    is_string = column.map(lambda value: isinstance(value, str)).to_numpy(dtype=bool)
+    values = np.empty(len(column), dtype=object)
+    values[is_string] = column[is_string].str.replace('\u200c', '', regex=False) \
+        .str.strip().to_numpy()
+    values[~is_string] = column[~is_string].astype('int64').tolist()
+    values[(column == 'None').to_numpy()] = None
+    return values.tolist()
+
+
+def clean_frame(df):
+    """records of the frame with every column cleaned by `clean_column`."""
+    columns = {name: clean_column(df[name]) for name in df.columns}
+    header = list(df.columns.values)
+    return [dict(zip(header, row)) for row in zip(*(columns[name] for name in header))]
 
 
 class ReadDataset:
+    cache = DatasetCache(path, cache_path)
+
+    @staticmethod
+    def read_sheet(sheet_name):
+        """the rows of the sheet up to the number of rows having an `id`."""
+        df = ReadDataset.cache.read_sheet(sheet_name)
+        count_not_null_rows = int(df['id'].notnull().sum())
+        return df.iloc[:count_not_null_rows]
+
+    @staticmethod
+    def iter_excel_file(sheet_name, chunk_size=1000):
+        """
+        Yields the records of `read_excel_file` one by one, cleaning
+        `chunk_size` rows at a time.
+        """
+        df = ReadDataset.read_sheet(sheet_name)
+        for start in range(0, len(df), chunk_size):
+            yield from clean_frame(df.iloc[start:start + chunk_size])
+
     @staticmethod
     def read_excel_file(sheet_name):
-        df = pd.read_excel(path, sheet_name=sheet_name)
-        count_not_null_rows = len(df[df['id'].notnull()])
-        header = list(df.columns.values)
-        return [dict(zip(header, [int(data) if not isinstance(data, str)
-                                  else data.replace('\u200c', '').strip() if data != 'None' else None
-                                  for data in df.iloc[row]])) for row in range(count_not_null_rows)]
+        return clean_frame(ReadDataset.read_sheet(sheet_name))
 
     @staticmethod
     def get_sheet_names():
-        return pd.ExcelFile(path).sheet_names
+        return ReadDataset.cache.get_sheet_names()
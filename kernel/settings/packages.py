@@ -57,6 +57,8 @@ INSTALLED_APPS = DEFAULT_APPS + LOCAL_APPS + THIRD_PARTY_PACKAGES
 # ############################### #
 # To add documentation support in Django admin
 MIDDLEWARE.append('django.contrib.admindocs.middleware.XViewMiddleware')
+# Samples the SQL of requests, see `SQL PROFILING`
+MIDDLEWARE.insert(0, 'painless.middleware.profiling.SQLProfilingMiddleware')
 
 # ############################### #
 #             MESSAGE             #
@@ -91,6 +93,8 @@ LANGUAGES = (
 # ############################### #
 MPTT_ADMIN_LEVEL_INDENT = 20
 MPTT_ADMIN_LEVEL_INDENT = 20
+# Seconds between two checks of the shared category tree version
+CATEGORY_TREE_VERSION_CHECK_INTERVAL = config('CATEGORY_TREE_VERSION_CHECK_INTERVAL', default=1, cast=float)
 
 # ############################### #
 #           THUMBNAIL             #
@@ -103,6 +107,18 @@ if config('DEBUG', default=False, cast=bool):
     THUMBNAIL_DEBUG = True
 else:
     THUMBNAIL_DEBUG = False
+# Thumbnails generated when a gallery picture is uploaded
+THUMBNAIL_PREGENERATE = [
+    {'geometry': '400x480', 'crop': 'center'},
+    {'geometry': '200x240', 'crop': 'center'},
+    {'geometry': '100x120', 'crop': 'center'},
+]
+THUMBNAIL_PREGENERATE_ASYNC = config('THUMBNAIL_PREGENERATE_ASYNC', default=True, cast=bool)
+THUMBNAIL_PREGENERATE_WORKERS = config('THUMBNAIL_PREGENERATE_WORKERS', default=2, cast=int)
+# Bytes read at most to find the dimensions of an uploaded picture
+IMAGE_HEADER_MAX_BYTES = config('IMAGE_HEADER_MAX_BYTES', default=256 * 1024, cast=int)
+# Seconds the parsed header of a picture is memoized
+IMAGE_HEADER_TIMEOUT = config('IMAGE_HEADER_TIMEOUT', default=7 * 24 * 3600, cast=int)
 
 # ############################### #
 #         Django MONEY            #
@@ -126,6 +142,68 @@ CURRENCIES = (
     'T',
     'USD'
 )
+# Currency all `ExpensePrice` prices are converted to
+BASE_CURRENCY = 'R'
+# Where `CurrencyRateProvider` reads rates from, the file is optional
+CURRENCY_RATE_BACKEND = config('CURRENCY_RATE_BACKEND', default='warehouse.services.currency.DatabaseRateBackend')
+CURRENCY_RATE_FILE = config('CURRENCY_RATE_FILE', default=None)
+# Seconds a loaded rate matrix is used before it is read again
+CURRENCY_RATE_TTL = config('CURRENCY_RATE_TTL', default=300, cast=int)
+# ############################### #
+#         PRODUCT LISTING         #
+# ############################### #
+# Read listing pages from the denormalized `ProductListing` table
+PRODUCT_LISTING_READ_MODEL = config('PRODUCT_LISTING_READ_MODEL', default=False, cast=bool)
+# Seconds the picture paths of a product are cached
+IMAGE_MANIFEST_TIMEOUT = config('IMAGE_MANIFEST_TIMEOUT', default=86400, cast=int)
+
+# ############################### #
+#         API RESULT CACHE        #
+# ############################### #
+# Seconds a cached list payload is fresh, then how long it may still be served while rebuilt
+API_RESULT_CACHE_TIMEOUT = config('API_RESULT_CACHE_TIMEOUT', default=60, cast=int)
+API_RESULT_CACHE_STALE_TIMEOUT = config('API_RESULT_CACHE_STALE_TIMEOUT', default=300, cast=int)
+# Seconds the per user order status counters are cached
+ORDER_STATUS_COUNT_TIMEOUT = config('ORDER_STATUS_COUNT_TIMEOUT', default=3600, cast=int)
+# Seconds the lines and totals of a cart are cached, a cart change invalidates them
+CART_SNAPSHOT_TIMEOUT = config('CART_SNAPSHOT_TIMEOUT', default=3600, cast=int)
+# Distinct packs an anonymous visitor may keep in the session cart
+SESSION_CART_MAX_LINES = config('SESSION_CART_MAX_LINES', default=100, cast=int)
+
+# ############################### #
+#       STOCK RESERVATION         #
+# ############################### #
+# Seconds the stock of an unpaid order is held while the customer is on the bank gateway
+STOCK_RESERVATION_TTL = config('STOCK_RESERVATION_TTL', default=900, cast=int)
+# Seconds an order stays `expiring` after its holds expired before it is cancelled
+STOCK_RESERVATION_CANCEL_AFTER = config('STOCK_RESERVATION_CANCEL_AFTER', default=3600, cast=int)
+# Holds deleted per transaction by `sweep_stock_reservations`
+STOCK_RESERVATION_SWEEP_BATCH_SIZE = config('STOCK_RESERVATION_SWEEP_BATCH_SIZE', default=1000, cast=int)
+
+# ############################### #
+#           SALES FACTS           #
+# ############################### #
+# Orders in these statuses are not counted as sales by `SalesFact`
+SALES_FACT_EXCLUDED_STATUSES = ['cancelled', 'expiring']
+
+# ############################### #
+#          SQL PROFILING          #
+# ############################### #
+# Ratio of the requests whose queries are profiled, 0.01 samples 1%, 0 disables it
+SQL_PROFILING_SAMPLE_RATE = config('SQL_PROFILING_SAMPLE_RATE', default=0.0, cast=float)
+# Times one query shape may run in a request before it is reported as N+1
+SQL_PROFILING_REPEAT_THRESHOLD = config('SQL_PROFILING_REPEAT_THRESHOLD', default=5, cast=int)
+# JSON lines file the request summaries are appended to, besides the logs
+SQL_PROFILING_FILE = config('SQL_PROFILING_FILE', default=None)
+
+# ############################### #
+#           BENCHMARKS            #
+# ############################### #
+# Allowed growth of a benchmark over its baseline, 0.5 means 50% slower or bigger
+BENCHMARK_REGRESSION_THRESHOLD = config('BENCHMARK_REGRESSION_THRESHOLD', default=0.5, cast=float)
+# Seconds below which timings are not compared, they are mostly noise
+BENCHMARK_MIN_DURATION = config('BENCHMARK_MIN_DURATION', default=0.005, cast=float)
+
 # ############################### #
 #         AUTHENTICATION          #
 # ############################### #
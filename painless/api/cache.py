@@ -0,0 +1,120 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from rest_framework.response import Response
+
+GENERATION_KEY = 'api:result-cache:generation:{label}'
+
+
+def get_generations(labels):
+    """
+    Current generation of each model label, `1` for the never bumped ones.
+    """
+    keys = [GENERATION_KEY.format(label=label.lower()) for label in labels]
+    generations = cache.get_many(keys)
+    return tuple(generations.get(key, 1) for key in keys)
+
+
+def bump_generation(label):
+    """
+    Invalidates every cached result depending on the model `label`, e.g.
+    `warehouse.Product`, once the current transaction commits.
+    """
+    key = GENERATION_KEY.format(label=label.lower())
+
+    def bump():
+        cache.add(key, 1, timeout=None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 2, timeout=None)
+
+    transaction.on_commit(bump)
+
+
+class ResultCacheMixin:
+    """
+    Caches the serialized payload of list actions.
+
+    The key is built from the view, the action and every query parameter, so
+    filters, search, ordering and pagination each get their own entry. Each
+    entry records the generations of `result_cache_models`; an entry is fresh
+    while its generations are current and it is younger than
+    `API_RESULT_CACHE_TIMEOUT`.
+
+    A stale entry is served as is while one request, holding a short lock,
+    rebuilds it (stale-while-revalidate). Entries are dropped
+    `API_RESULT_CACHE_STALE_TIMEOUT` seconds after they go stale by age.
+    """
+    result_cache_models = ()
+    result_cache_vary_on_user = False
+    result_cache_lock_timeout = 30
+
+    def get_result_cache_key(self, request):
+        params = sorted(request.query_params.lists())
+        identity = [
+            f'{type(self).__module__}.{type(self).__qualname__}',
+            str(self.action),
+            repr(params),
+        ]
+        if self.result_cache_vary_on_user:
+            identity.append(str(request.user.pk))
+        digest = hashlib.md5('|'.join(identity).encode('utf-8')).hexdigest()
+        return f'api:result-cache:{digest}'
+
+    def get_cached_payload(self, request, build_payload):
+        """
+        Returns the cached payload of the request, `build_payload` is called
+        on a miss or by the request revalidating a stale entry.
+        """
+        key = self.get_result_cache_key(request)
+        lock_key = f'{key}:lock'
+        generations = get_generations(self.result_cache_models)
+        entry = cache.get(key)
+        now = time.time()
+
+        if entry is not None:
+            if entry['generations'] == generations and entry['fresh_until'] > now:
+                return entry['payload']
+            if not cache.add(lock_key, 1, timeout=self.result_cache_lock_timeout):
+                return entry['payload']
+
+        try:
+            payload = build_payload()
+            cache.set(
+                key,
+                {
+                    'payload': payload,
+                    'generations': generations,
+                    'fresh_until': now + settings.API_RESULT_CACHE_TIMEOUT,
+                },
+                timeout=settings.API_RESULT_CACHE_TIMEOUT
+                + settings.API_RESULT_CACHE_STALE_TIMEOUT
+            )
+        finally:
+            if entry is not None:
+                cache.delete(lock_key)
+        return payload
+
+    def cached_list(self, request, queryset):
+        """
+        Paginates and serializes `queryset` like `ListModelMixin.list`,
+        through the result cache.
+        """
+        def build_payload():
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data).data
+            serializer = self.get_serializer(queryset, many=True)
+            return serializer.data
+
+        return Response(self.get_cached_payload(request, build_payload))
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.cached_list(request, queryset)
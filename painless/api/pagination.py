@@ -0,0 +1,185 @@
+import base64
+import binascii
+import datetime
+import json
+from collections import OrderedDict
+from functools import reduce
+from urllib import parse
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import (
+    remove_query_param,
+    replace_query_param
+)
+
+
+class CursorJSONEncoder(DjangoJSONEncoder):
+    """
+    Keeps the microseconds of datetimes and times, `DjangoJSONEncoder`
+    cuts them to milliseconds and the seek would skip or repeat rows.
+    """
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over any ordering, annotated keys included.
+
+    Instead of `OFFSET`, every page is fetched with a `WHERE` on the ordering
+    keys of the last row seen, so the cost of a page does not depend on how
+    deep it is. `id` is always appended to the ordering as tie-breaker, which
+    makes the ordering total.
+
+    The ordering is taken from the queryset, i.e. after `OrderingFilter`,
+    then from `ordering` of the view and at last from `ordering` of the
+    paginator. Ordering keys must not be null.
+
+    Cursors are opaque, url-safe base64 encoded JSON holding the ordering,
+    the key values of the boundary row and the direction. A cursor issued
+    for another ordering is rejected.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering = ('-created',)
+    tie_breaker = 'id'
+    invalid_cursor_message = _('Invalid cursor')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset, view)
+
+        cursor = self.decode_cursor(request)
+        self.is_reversed = cursor is not None and cursor['reverse']
+
+        ordering = self.ordering
+        if self.is_reversed:
+            ordering = [self.reverse_key(key) for key in ordering]
+        queryset = queryset.order_by(*ordering)
+        if cursor is not None:
+            queryset = queryset.filter(self.get_seek_condition(ordering, cursor['values']))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.is_reversed:
+            results.reverse()
+
+        self.page = results
+        if self.is_reversed:
+            self.has_next = cursor is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, queryset, view):
+        """
+        Ordering keys of the page with the tie-breaker appended.
+        """
+        ordering = list(queryset.query.order_by) \
+            or list(getattr(view, 'ordering', None) or self.ordering)
+        ordering = [key for key in ordering if isinstance(key, str) and key != '?']
+        if not any(key.lstrip('-') in (self.tie_breaker, 'pk') for key in ordering):
+            ordering.append(self.tie_breaker)
+        return ordering
+
+    @staticmethod
+    def reverse_key(key):
+        return key[1:] if key.startswith('-') else f'-{key}'
+
+    @staticmethod
+    def get_seek_condition(ordering, values):
+        """
+        Rows strictly after `values` in `ordering`:
+        (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ... with `<` for descending keys.
+        """
+        conditions = list()
+        for position, key in enumerate(ordering):
+            field = key.lstrip('-')
+            lookup = 'lt' if key.startswith('-') else 'gt'
+            condition = Q(**{f'{field}__{lookup}': values[position]})
+            for previous_key, value in zip(ordering[:position], values):
+                condition &= Q(**{previous_key.lstrip('-'): value})
+            conditions.append(condition)
+        return reduce(lambda left, right: left | right, conditions)
+
+    @staticmethod
+    def get_key_value(instance, key):
+        value = reduce(getattr, key.lstrip('-').split('__'), instance)
+        return getattr(value, 'amount', value)
+
+    def encode_cursor(self, instance, reverse):
+        cursor = {
+            'o': self.ordering,
+            'v': [self.get_key_value(instance, key) for key in self.ordering],
+            'r': reverse,
+        }
+        encoded = json.dumps(cursor, cls=CursorJSONEncoder, separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(encoded.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(
+                parse.unquote(encoded).encode('ascii')).decode('utf-8'))
+            ordering, values, reverse = cursor['o'], cursor['v'], bool(cursor['r'])
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if ordering != self.ordering or len(values) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return {'values': values, 'reverse': reverse}
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
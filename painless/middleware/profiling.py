@@ -0,0 +1,153 @@
+import json
+import logging
+import random
+import re
+import time
+import traceback
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+VALUES_LIST = re.compile(r'\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)')
+WHITESPACE = re.compile(r'\s+')
+IGNORED_FRAMES = ('/django/', '/site-packages/', '/painless/middleware/')
+
+
+def normalize_sql(sql):
+    """
+    Shape of a statement: literals become `?` and lists of placeholders,
+    e.g. `IN (%s, %s, %s)`, collapse so statements differing only in their
+    values group together.
+    """
+    sql = STRING_LITERAL.sub('?', sql)
+    sql = NUMBER_LITERAL.sub('?', sql)
+    sql = VALUES_LIST.sub('(...)', sql)
+    return WHITESPACE.sub(' ', sql).strip()
+
+
+def get_origin():
+    """`file:line in function` of the innermost project frame."""
+    for frame in reversed(traceback.extract_stack()):
+        if frame.filename.startswith(str(settings.BASE_DIR)) \
+                and not any(part in frame.filename for part in IGNORED_FRAMES):
+            return f'{frame.filename[len(str(settings.BASE_DIR)) + 1:]}:{frame.lineno} in {frame.name}'
+    return None
+
+
+class QueryProfile:
+    """
+    Execute wrapper recording every query of a connection with its
+    duration and project origin, grouped by shape.
+    """
+    def __init__(self, repeat_threshold=None):
+        if repeat_threshold is None:
+            repeat_threshold = settings.SQL_PROFILING_REPEAT_THRESHOLD
+        self.repeat_threshold = repeat_threshold
+        self.shapes = defaultdict(lambda: {'count': 0, 'time': 0.0, 'origins': defaultdict(int)})
+        self.count = 0
+        self.time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            shape = self.shapes[normalize_sql(sql)]
+            shape['count'] += 1
+            shape['time'] += duration
+            shape['origins'][get_origin()] += 1
+            self.count += 1
+            self.time += duration
+
+    def get_repeated_shapes(self):
+        """shapes run at least `repeat_threshold` times, likely N+1, most first."""
+        repeated = [
+            {'sql': sql,
+             'count': shape['count'],
+             'time': round(shape['time'], 6),
+             'origins': dict(sorted(shape['origins'].items(),
+                                    key=lambda item: item[1], reverse=True))}
+            for sql, shape in self.shapes.items()
+            if shape['count'] >= self.repeat_threshold
+        ]
+        return sorted(repeated, key=lambda item: item['count'], reverse=True)
+
+    def get_summary(self, **extra):
+        return {
+            **extra,
+            'queries': self.count,
+            'shapes': len(self.shapes),
+            'sql_time': round(self.time, 6),
+            'repeated': self.get_repeated_shapes(),
+        }
+
+
+@contextmanager
+def profile_queries(repeat_threshold=None):
+    """
+    Records the queries of every database connection inside the block,
+    e.g. in a shell or a test:
+
+        with profile_queries() as profile:
+            Order.dal.get_order_related()
+        profile.get_summary()
+    """
+    profile = QueryProfile(repeat_threshold)
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(profile))
+        yield profile
+
+
+def write_summary(summary):
+    """logs the summary and appends it as a JSON line to `SQL_PROFILING_FILE`."""
+    if summary['repeated']:
+        logger.warning(
+            f"{summary['endpoint']}: {summary['queries']} queries, "
+            f"{len(summary['repeated'])} repeated shapes, "
+            f"the most run {summary['repeated'][0]['count']} times from "
+            f"{next(iter(summary['repeated'][0]['origins']))}")
+    else:
+        logger.info(f"{summary['endpoint']}: {summary['queries']} queries "
+                    f"in {summary['sql_time'] * 1000:.1f}ms")
+    if settings.SQL_PROFILING_FILE:
+        with open(settings.SQL_PROFILING_FILE, 'a') as profile_file:
+            profile_file.write(json.dumps(summary, default=str) + '\n')
+
+
+class SQLProfilingMiddleware:
+    """
+    Profiles the SQL of `SQL_PROFILING_SAMPLE_RATE` of the requests, e.g.
+    `0.01` for 1%, and exports a per endpoint summary through
+    `write_summary`. Unsampled requests only cost one random draw.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.SQL_PROFILING_SAMPLE_RATE
+
+    def __call__(self, request):
+        if not self.sample_rate or random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        with profile_queries() as profile:
+            response = self.get_response(request)
+        match = getattr(request, 'resolver_match', None)
+        summary = profile.get_summary(
+            endpoint=f'{request.method} {match.route if match else request.path}',
+            view=match.view_name if match else None,
+            status=response.status_code,
+            duration=round(time.perf_counter() - start, 6),
+        )
+        try:
+            write_summary(summary)
+        except OSError:
+            logger.exception('SQL profile could not be written.')
+        return response
@@ -1,11 +1,121 @@
+import hashlib
+from collections import namedtuple
+
+from PIL import ImageFile
+
+from django.conf import settings
+from django.core.cache import cache
 from django.utils.deconstruct import deconstructible
 from django.core.exceptions import ValidationError
 from django.core.validators import BaseValidator
-from django.core.files.images import get_image_dimensions
 from django.utils.translation import gettext_lazy as _
 
 from painless.helper.typing import Byte
 
+ImageHeader = namedtuple('ImageHeader', ['width', 'height', 'format', 'size'])
+
+IMAGE_HEADER_KEY = 'painless:image-header:{digest}'
+CHUNK_SIZE = 8 * 1024
+
+
+def get_storage_signature(value):
+    """
+    Size and, when the storage reports it, modification time of a committed
+    picture, so a file overwritten under the same name gets a new identity.
+    """
+    storage = value.storage
+    size = storage.size(value.name)
+    try:
+        modified_time = storage.get_modified_time(value.name).isoformat()
+    except (NotImplementedError, OSError):
+        modified_time = ''
+    return f'{size}:{modified_time}'
+
+
+def get_image_digest(value):
+    """
+    Identity of the picture used to memoize its header.
+
+    A picture already committed to the storage is identified by its name,
+    size and modification time, so re-validating an unchanged picture does
+    not read it again. A new upload is identified by the sha256 of its
+    content.
+    """
+    if getattr(value, '_committed', False) and value.name:
+        signature = get_storage_signature(value)
+        return hashlib.sha256(
+            f'name:{value.name}:{signature}'.encode('utf-8')
+        ).hexdigest()
+
+    digest = hashlib.sha256()
+    file = value.file
+    position = file.tell() if hasattr(file, 'tell') else None
+    file.seek(0)
+    for chunk in iter(lambda: file.read(CHUNK_SIZE), b''):
+        digest.update(chunk)
+    if position is not None:
+        file.seek(position)
+    return digest.hexdigest()
+
+
+def read_image_header(file, size=None):
+    """
+    Parses the width, height and format of the image from its first bytes.
+
+    The file is fed to PIL's incremental parser `CHUNK_SIZE` bytes at a time
+    and reading stops as soon as the header is parsed or
+    `IMAGE_HEADER_MAX_BYTES` are read, so the pixel data is never loaded.
+    Returns None when no header is found within the limit.
+    """
+    position = file.tell() if hasattr(file, 'tell') else None
+    file.seek(0)
+    parser = ImageFile.Parser()
+    read = 0
+    try:
+        while read < settings.IMAGE_HEADER_MAX_BYTES:
+            chunk = file.read(min(CHUNK_SIZE, settings.IMAGE_HEADER_MAX_BYTES - read))
+            if not chunk:
+                break
+            read += len(chunk)
+            try:
+                parser.feed(chunk)
+            except (OSError, SyntaxError, ValueError):
+                return None
+            if parser.image is not None:
+                width, height = parser.image.size
+                return ImageHeader(width, height, parser.image.format, size)
+        return None
+    finally:
+        try:
+            parser.close()
+        except Exception:
+            pass
+        if position is not None:
+            file.seek(position)
+
+
+def get_image_header(value):
+    """
+    Header of the picture, memoized in the cache per `get_image_digest`.
+    """
+    key = IMAGE_HEADER_KEY.format(digest=get_image_digest(value))
+    header = cache.get(key)
+    if header is not None:
+        return ImageHeader(*header)
+
+    file = value.file
+    header = read_image_header(file, size=value.size)
+    if header is not None:
+        cache.set(key, tuple(header), timeout=settings.IMAGE_HEADER_TIMEOUT)
+    return header
+
+
+def get_image_header_or_raise(value):
+    header = get_image_header(value)
+    if header is None:
+        raise ValidationError(_("Upload a valid image."))
+    return header
+
 
 @deconstructible
 class DimensionValidator(BaseValidator):
@@ -17,10 +127,42 @@ class DimensionValidator(BaseValidator):
 
     def __call__(self,
                  value):
-        pic = value.file.open()
-        width, height = get_image_dimensions(pic)
+        header = get_image_header_or_raise(value)
+        width, height = header.width, header.height
         if not (width == self.width and height == self.height):
             raise ValidationError(
                 _(f"Expected dimension is: [{self.width}w, "
                   f"{self.height}h] "
                   f"but actual is: [{width}w, {height}h]"))
+
+
+@deconstructible
+class SquareDimensionValidator(BaseValidator):
+    def __init__(self):
+        super().__init__(None)
+
+    def __call__(self,
+                 value):
+        header = get_image_header_or_raise(value)
+        width, height = header.width, header.height
+        if width != height:
+            raise ValidationError(
+                _(f"Expected a square picture "
+                  f"but actual is: [{width}w, {height}h]"))
+
+
+@deconstructible
+class ImageSizeValidator(BaseValidator):
+    def __init__(self,
+                 size: Byte):
+        super().__init__(size)
+        self.size = size
+
+    def __call__(self,
+                 value):
+        # An upload reports its own size, a committed picture asks the storage
+        size = value.size
+        if size > self.size:
+            raise ValidationError(
+                _(f"Expected size is at most: {self.size} bytes "
+                  f"but actual is: {size} bytes"))
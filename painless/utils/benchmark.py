@@ -0,0 +1,162 @@
+import json
+import os
+import time
+import tracemalloc
+from types import GeneratorType
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import QuerySet
+from django.test.utils import CaptureQueriesContext
+
+
+def evaluate(result):
+    """forces a lazy result, querysets are fetched with their prefetches."""
+    if isinstance(result, (QuerySet, GeneratorType)):
+        return list(result)
+    if isinstance(result, (list, tuple)):
+        return [evaluate(item) for item in result]
+    return result
+
+
+def measure(function, *args, **kwargs):
+    """
+    Runs `function` and evaluates its result once.
+
+    Returns `queries` (count), `sql_time` and `python_time` in seconds and
+    `peak_memory` in bytes allocated by Python while running.
+    """
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            evaluate(function(*args, **kwargs))
+            total_time = time.perf_counter() - start
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    sql_time = sum(float(query['time']) for query in queries.captured_queries)
+    return {
+        'queries': len(queries),
+        'sql_time': sql_time,
+        'python_time': max(total_time - sql_time, 0.0),
+        'peak_memory': peak_memory,
+    }
+
+
+class BenchmarkBaseline:
+    """
+    Measurements of a benchmark suite kept in a JSON file.
+
+    A measurement regresses when it runs more queries than its baseline, or
+    when a time or the peak memory grows more than
+    `BENCHMARK_REGRESSION_THRESHOLD` (a ratio) over the baseline. Times
+    below `BENCHMARK_MIN_DURATION` seconds are too noisy to compare.
+    Measurements are only recorded, new or replaced, when
+    `BENCHMARK_UPDATE_BASELINE` environment variable is set; otherwise a
+    benchmark missing from the file can not be compared.
+    """
+    TIMES = ('sql_time', 'python_time')
+
+    def __init__(self, path):
+        self.path = path
+        self.is_changed = False
+        self.update = bool(os.environ.get('BENCHMARK_UPDATE_BASELINE'))
+        self.threshold = settings.BENCHMARK_REGRESSION_THRESHOLD
+        self.min_duration = settings.BENCHMARK_MIN_DURATION
+        try:
+            with open(path) as baseline_file:
+                self.baseline = json.load(baseline_file)
+        except FileNotFoundError:
+            self.baseline = dict()
+
+    def is_comparable(self, name):
+        """whether `name` is measured, against its baseline or to record it."""
+        return self.update or name in self.baseline
+
+    def get_missing(self, names):
+        """names without a baseline, none while recording."""
+        if self.update:
+            return set()
+        return set(names) - set(self.baseline)
+
+    def get_regressions(self, name, result):
+        """descriptions of the regressions of `result`, recorded if updating."""
+        if self.update:
+            self.baseline[name] = result
+            self.is_changed = True
+            return []
+
+        expected = self.baseline[name]
+
+        regressions = list()
+        if result['queries'] > expected['queries']:
+            regressions.append(f"queries: {result['queries']} > {expected['queries']}")
+        limit = 1 + self.threshold
+        for key in self.TIMES:
+            allowed = max(expected[key] * limit, self.min_duration)
+            if result[key] > allowed:
+                regressions.append(f"{key}: {result[key]:.4f}s > {allowed:.4f}s")
+        if result['peak_memory'] > expected['peak_memory'] * limit:
+            regressions.append(f"peak_memory: {result['peak_memory']} > "
+                               f"{int(expected['peak_memory'] * limit)} bytes")
+        return regressions
+
+    def save(self):
+        if not self.is_changed:
+            return
+        with open(self.path, 'w') as baseline_file:
+            json.dump(self.baseline, baseline_file, indent=2, sort_keys=True)
+        self.is_changed = False
+
+
+class QuerysetBenchmarkMixin:
+    """
+    TestCase mixin measuring queryset methods against `baseline_path`.
+
+    Subclasses set `baseline_path` and `queryset_classes`, the classes
+    whose public methods must all be benchmarked.
+    """
+    baseline_path = None
+    queryset_classes = ()
+    rounds = 3
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.baseline = BenchmarkBaseline(cls.baseline_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.baseline.save()
+        super().tearDownClass()
+
+    def benchmark(self, name, function, *args, **kwargs):
+        """
+        Measures `function` `rounds` times, keeps the fastest round and
+        fails on a regression against the baseline. Skipped when the
+        baseline has no `name`, so a missing baseline never passes silently.
+        """
+        if not self.baseline.is_comparable(name):
+            self.skipTest(f"`{name}` has no baseline in {self.baseline.path}, "
+                          f"run with BENCHMARK_UPDATE_BASELINE=1 to record it")
+        evaluate(function(*args, **kwargs))
+        results = [measure(function, *args, **kwargs) for _ in range(self.rounds)]
+        result = min(results, key=lambda item: item['sql_time'] + item['python_time'])
+        regressions = self.baseline.get_regressions(name, result)
+        self.assertFalse(
+            regressions,
+            msg=f"`{name}` regressed: {', '.join(regressions)}"
+        )
+        return result
+
+    def get_public_methods(self):
+        """public methods defined by `queryset_classes` and their bases."""
+        methods = set()
+        for queryset_class in self.queryset_classes:
+            for klass in queryset_class.__mro__:
+                if klass is QuerySet or not issubclass(klass, QuerySet):
+                    continue
+                methods.update(name for name, value in vars(klass).items()
+                               if callable(value) and not name.startswith('_'))
+        return methods
@@ -0,0 +1,152 @@
+import io
+import json
+import uuid
+from datetime import (
+    date,
+    datetime
+)
+from decimal import Decimal
+
+from django.db import (
+    connections,
+    models
+)
+from django.utils import timezone
+
+
+def reserve_ids(model, count, using='default'):
+    """
+    Moves the id sequence of the model `count` values ahead and returns the
+    first reserved id, so rows written with COPY can carry their own ids.
+    """
+    table = model._meta.db_table
+    column = model._meta.pk.column
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT setval(pg_get_serial_sequence(%s, %s), "
+            "nextval(pg_get_serial_sequence(%s, %s)) + %s - 1)",
+            [table, column, table, column, count]
+        )
+        last_id = cursor.fetchone()[0]
+    return last_id - count + 1
+
+
+def to_copy_text(value):
+    """formats a database value for the text format of COPY."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (datetime, date)):
+        value = value.isoformat()
+    elif hasattr(value, 'adapted'):
+        value = json.dumps(value.adapted)
+    elif isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    return str(value) \
+        .replace('\\', '\\\\') \
+        .replace('\t', '\\t') \
+        .replace('\n', '\\n') \
+        .replace('\r', '\\r')
+
+
+class CopyWriter:
+    """
+    Streams rows of a model into PostgreSQL with `COPY ... FROM STDIN`,
+    `chunk_size` rows per statement.
+
+    Rows are dicts keyed by field `attname`, e.g. `product_id`. Every
+    concrete field missing from a row gets a value from
+    `get_default_value`, so callers only set the columns they care about.
+    """
+    def __init__(self, model, rng, chunk_size=50000, using='default'):
+        self.model = model
+        self.rng = rng
+        self.chunk_size = chunk_size
+        self.connection = connections[using]
+        self.fields = list(model._meta.concrete_fields)
+        self.related_ids = dict()
+        self.now = timezone.now()
+        self.buffer = io.StringIO()
+        self.pending = 0
+        self.total = 0
+        columns = ', '.join(self.connection.ops.quote_name(field.column)
+                            for field in self.fields)
+        self.sql = (f'COPY {self.connection.ops.quote_name(model._meta.db_table)} '
+                    f'({columns}) FROM STDIN')
+
+    def get_related_id(self, field):
+        related_model = field.related_model
+        if related_model not in self.related_ids:
+            self.related_ids[related_model] = list(
+                related_model._default_manager.values_list('pk', flat=True))
+        ids = self.related_ids[related_model]
+        if not ids:
+            raise ValueError(f'`{field}` requires existing `{related_model.__name__}` rows.')  # noqa
+        return self.rng.choice(ids)
+
+    def get_default_value(self, field, row):
+        """
+        A value valid for the field: its default, the current time for
+        `auto_now` fields, a value derived from the primary key for unique
+        fields and an existing row for required relations.
+        """
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+            return self.now
+        if field.has_default():
+            return field.get_default()
+        if field.is_relation:
+            return None if field.null else self.get_related_id(field)
+        if field.null:
+            return None
+        if field.choices:
+            return self.rng.choice(field.choices)[0]
+        pk = row.get(self.model._meta.pk.attname)
+        if isinstance(field, (models.CharField, models.TextField)):
+            value = f'{field.name}-{pk}' if field.unique else ''
+            return value[:field.max_length] if field.max_length else value
+        if isinstance(field, models.BooleanField):
+            return False
+        if isinstance(field, (models.IntegerField, models.FloatField)):
+            return pk if field.unique else 0
+        if isinstance(field, models.DecimalField):
+            return Decimal(0)
+        if isinstance(field, models.DateTimeField):
+            return self.now
+        if isinstance(field, models.DateField):
+            return self.now.date()
+        if isinstance(field, models.UUIDField):
+            return uuid.UUID(int=self.rng.getrandbits(128))
+        if isinstance(field, models.JSONField):
+            return dict()
+        raise ValueError(f'No default value for `{field}`, set it in the rows.')
+
+    def write(self, row):
+        values = list()
+        for field in self.fields:
+            if field.attname in row:
+                value = row[field.attname]
+            else:
+                value = self.get_default_value(field, row)
+            values.append(to_copy_text(field.get_db_prep_save(value, self.connection)))
+        self.buffer.write('\t'.join(values))
+        self.buffer.write('\n')
+        self.pending += 1
+        if self.pending >= self.chunk_size:
+            self.flush()
+
+    def write_many(self, rows):
+        for row in rows:
+            self.write(row)
+        self.flush()
+        return self.total
+
+    def flush(self):
+        if not self.pending:
+            return
+        self.buffer.seek(0)
+        with self.connection.cursor() as cursor:
+            cursor.copy_expert(self.sql, self.buffer)
+        self.total += self.pending
+        self.pending = 0
+        self.buffer = io.StringIO()
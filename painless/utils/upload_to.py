@@ -8,10 +8,14 @@ from datetime import (
 
 def category_dir_path(instance,
                       filename):
-    categories = instance.product.category.get_ancestors(include_self=True)
+    from warehouse.services.category_tree import get_category_tree
+
+    category_id = instance.product.category_id
+    # a category unknown to the snapshot is not in any directory
+    titles = get_category_tree().get_ancestor_titles(category_id) or []
     categories_path = "/".join(
-        [category.title[:5].strip() if len(category.title) > 5 else category.title.strip() for category in
-         categories])
+        [title[:5].strip() if len(title) > 5 else title.strip() for title in
+         titles])
     return "category/{}/prod-{}/{}".format(categories_path,
                                            instance.product.title[:55].strip() if
                                            len(instance.product.title) > 54 else instance.product.title.strip(),